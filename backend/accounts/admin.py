@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
-from .models import User, UserActivity, UserSession
+from .models import User, UserActivity, UserActivityDaily, UserSession
 
 
 @admin.register(User)
@@ -47,6 +47,21 @@ class UserActivityAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(UserActivityDaily)
+class UserActivityDailyAdmin(admin.ModelAdmin):
+    list_display = ['date', 'user', 'action', 'count']
+    list_filter = ['action', 'date']
+    search_fields = ['user__email']
+    ordering = ['-date']
+    readonly_fields = ['date', 'user', 'action', 'count']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(UserSession)
 class UserSessionAdmin(admin.ModelAdmin):
     list_display = ['user', 'ip_address', 'is_active', 'created_at', 'last_activity']
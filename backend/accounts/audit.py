@@ -0,0 +1,190 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import close_old_connections
+from django.dispatch import receiver
+from django.utils import timezone
+
+logger = logging.getLogger('maria_havens_pos')
+
+DEFAULTS = {
+    'MODE': 'thread',        # 'thread' buffers and writes in the background, 'sync' writes inline
+    'MAX_QUEUE': 10000,      # events held in memory before the overflow policy kicks in
+    'BATCH_SIZE': 500,       # rows per bulk_create
+    'FLUSH_INTERVAL': 1.0,   # seconds between background flushes
+    'OVERFLOW': 'drop',      # 'drop' new events or 'block' the request for up to BLOCK_TIMEOUT
+    'BLOCK_TIMEOUT': 0.5,
+}
+
+
+class AuditWriter:
+    """
+    Buffered writer for audit rows (UserActivity, UserSession, ...).
+
+    Requests hand over unsaved model instances and return immediately; a
+    daemon thread drains the bounded queue every ``flush_interval`` seconds
+    and writes each model's rows with one ``bulk_create``. When the queue is
+    full the overflow policy either drops the event (counted in
+    ``dropped``) or blocks the caller briefly. Whatever is left is flushed
+    at interpreter exit.
+    """
+
+    def __init__(self, mode='thread', max_queue=10000, batch_size=500, flush_interval=1.0,
+                 overflow='drop', block_timeout=0.5):
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+
+    def log(self, instance):
+        """Queue ``instance`` for insertion; returns False if it was dropped"""
+        if self.mode == 'sync':
+            instance.save()
+            self.written += 1
+            return True
+
+        self._ensure_started()
+        try:
+            if self.overflow == 'block':
+                self._queue.put(instance, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(instance)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning('Audit log queue full, %s event(s) dropped so far', self.dropped)
+            return False
+        return True
+
+    def flush(self):
+        """Write everything queued so far; returns the number of rows written"""
+        with self._flush_lock:
+            total = 0
+            while True:
+                batch = self._drain(self.batch_size)
+                if not batch:
+                    return total
+                total += self._write(batch)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+        self.flush()
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        by_model = defaultdict(list)
+        for instance in batch:
+            by_model[type(instance)].append(instance)
+        written = 0
+        for model, instances in by_model.items():
+            try:
+                model.objects.bulk_create(instances, batch_size=self.batch_size)
+                written += len(instances)
+            except Exception:
+                logger.exception('Could not write %s audit row(s) for %s', len(instances), model.__name__)
+                with self._lock:
+                    self.failed += len(instances)
+        with self._lock:
+            self.written += written
+        return written
+
+    def _ensure_started(self):
+        # Restart the thread in a forked worker process (gunicorn --preload)
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                config = {**DEFAULTS, **getattr(settings, 'AUDIT_LOG', {})}
+                _writer = AuditWriter(
+                    mode=config['MODE'],
+                    max_queue=config['MAX_QUEUE'],
+                    batch_size=config['BATCH_SIZE'],
+                    flush_interval=config['FLUSH_INTERVAL'],
+                    overflow=config['OVERFLOW'],
+                    block_timeout=config['BLOCK_TIMEOUT'],
+                )
+                atexit.register(_writer.stop)
+    return _writer
+
+
+@receiver(setting_changed)
+def reset_writer(setting, **kwargs):
+    """Build a new writer after AUDIT_LOG changes, e.g. under override_settings"""
+    global _writer
+    if setting == 'AUDIT_LOG':
+        with _writer_lock:
+            if _writer is not None:
+                _writer.stop()
+            _writer = None
+
+
+def record(instance):
+    """Hand an unsaved audit row to the writer"""
+    return get_writer().log(instance)
+
+
+def log_activity(user, action, description='', ip_address=None, metadata=None):
+    """Record a UserActivity without putting an INSERT on the request path"""
+    from .models import UserActivity
+
+    return record(UserActivity(
+        user=user,
+        action=action,
+        description=description,
+        ip_address=ip_address or '127.0.0.1',
+        metadata=metadata or {},
+        timestamp=timezone.now(),
+    ))
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_CACHE_TIMEOUT = 5 * 60
+
+
+def user_cache_key(user_id):
+    return f'accounts:user:{user_id}'
+
+
+def _cached_fields(UserModel):
+    return [field for field in UserModel._meta.concrete_fields if field.attname != 'password']
+
+
+class CachedUserBackend(ModelBackend):
+    """
+    ModelBackend that keeps the signed-in user's row in the cache.
+
+    Every authenticated request resolves ``request.user`` through
+    ``get_user``; with the cache that is no longer a query per request.
+    The password hash is not cached: the entry holds the other columns and
+    the session auth hash derived from it, and the password stays deferred
+    on the rebuilt user. The entry is dropped whenever the user is saved or
+    deleted, so this backend is only installed when the cache is shared
+    between workers (see AUTHENTICATION_BACKENDS in settings).
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        entry = cache.get(key)
+        if entry is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, self._to_entry(user), USER_CACHE_TIMEOUT)
+            return user
+        user = self._from_entry(entry)
+        return user if self.user_can_authenticate(user) else None
+
+    def _to_entry(self, user):
+        fields = _cached_fields(type(user))
+        return {
+            'values': [field.get_prep_value(field.value_from_object(user)) for field in fields],
+            'session_auth_hash': user.get_session_auth_hash(),
+        }
+
+    def _from_entry(self, entry):
+        UserModel = get_user_model()
+        names = [field.attname for field in _cached_fields(UserModel)]
+        user = UserModel.from_db(UserModel._default_manager.db, names, entry['values'])
+        user.cached_session_auth_hash = entry['session_auth_hash']
+        return user
+
+
+def invalidate_user(user_id):
+    cache.delete(user_cache_key(user_id))
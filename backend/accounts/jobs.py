@@ -0,0 +1,17 @@
+from django.core.mail import send_mail
+
+from jobqueue.queue import register
+from .models import User
+
+
+@register('accounts.send_password_reset')
+def send_password_reset(payload):
+    user = User.objects.get(id=payload['user_id'])
+    send_mail(
+        'Reset your Maria Havens POS password',
+        f'Hello {user.get_full_name() or user.username},\n\n'
+        f'Use the link below within the next hour to choose a new password:\n{payload["reset_url"]}\n\n'
+        'If you did not ask for this, you can ignore this email.',
+        None,
+        [user.email]
+    )
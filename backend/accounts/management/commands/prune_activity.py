@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from accounts.retention import prune_activity, prune_sessions
+
+
+class Command(BaseCommand):
+    help = 'Roll up old user activity into daily counts and delete stale sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Keep individual activity rows for this many days (default: ACTIVITY_RETENTION_DAYS)'
+        )
+        parser.add_argument(
+            '--session-days',
+            type=int,
+            help='Delete sessions not seen for this many days (default: SESSION_RETENTION_DAYS)'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows deleted per query')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be pruned')
+
+    def handle(self, *args, **options):
+        activity = prune_activity(
+            days=options['days'], batch_size=options['batch_size'], dry_run=options['dry_run']
+        )
+        sessions = prune_sessions(
+            days=options['session_days'], batch_size=options['batch_size'], dry_run=options['dry_run']
+        )
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Activities rolled up: {activity['activities']} over {activity['days']} day(s); "
+            f"sessions removed: {sessions}"
+        ))
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.2 on 2026-10-19 02:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_activity_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserActivityDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('action', models.CharField(choices=[('login', 'Login'), ('logout', 'Logout'), ('order_created', 'Order Created'), ('order_updated', 'Order Updated'), ('menu_updated', 'Menu Updated'), ('reservation_created', 'Reservation Created'), ('payment_processed', 'Payment Processed'), ('report_generated', 'Report Generated')], max_length=50)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily User Activity',
+                'verbose_name_plural': 'Daily User Activities',
+                'db_table': 'accounts_user_activity_daily',
+                'ordering': ['-date', 'user', 'action'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='useractivity',
+            index=models.Index(fields=['user', '-timestamp'], name='activity_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='useractivity',
+            index=models.Index(fields=['-timestamp'], name='activity_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['user', 'is_active'], name='session_user_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['is_active', 'last_activity'], name='session_active_seen_idx'),
+        ),
+        migrations.AddField(
+            model_name='useractivitydaily',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activities', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='useractivitydaily',
+            unique_together={('date', 'user', 'action')},
+        ),
+    ]
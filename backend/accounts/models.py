@@ -46,6 +46,12 @@ class User(AbstractUser):
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}".strip() or self.username
     
+    def get_session_auth_hash(self):
+        # CachedUserBackend rebuilds users without loading the password hash
+        if 'password' in self.get_deferred_fields() and hasattr(self, 'cached_session_auth_hash'):
+            return self.cached_session_auth_hash
+        return super().get_session_auth_hash()
+
     def is_account_locked(self):
         if self.account_locked_until:
             return timezone.now() < self.account_locked_until
@@ -80,6 +86,10 @@ class UserSession(models.Model):
         db_table = 'accounts_user_session'
         verbose_name = 'User Session'
         verbose_name_plural = 'User Sessions'
+        indexes = [
+            models.Index(fields=['user', 'is_active'], name='session_user_active_idx'),
+            models.Index(fields=['is_active', 'last_activity'], name='session_active_seen_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.ip_address}"
@@ -101,7 +111,8 @@ class UserActivity(models.Model):
     action = models.CharField(max_length=50, choices=ACTION_CHOICES)
     description = models.TextField(blank=True)
     ip_address = models.GenericIPAddressField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when the audit writer gets to insert it
+    timestamp = models.DateTimeField(default=timezone.now)
     metadata = models.JSONField(default=dict, blank=True)
     
     class Meta:
@@ -109,6 +120,29 @@ class UserActivity(models.Model):
         verbose_name = 'User Activity'
         verbose_name_plural = 'User Activities'
         ordering = ['-timestamp']
+        indexes = [
+            # Feed per user and the global feed, both newest first
+            models.Index(fields=['user', '-timestamp'], name='activity_user_time_idx'),
+            models.Index(fields=['-timestamp'], name='activity_time_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.email} - {self.action} - {self.timestamp}"
+
+
+class UserActivityDaily(models.Model):
+    """Per user, per action daily counts of activity that has been pruned"""
+    date = models.DateField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_activities')
+    action = models.CharField(max_length=50, choices=UserActivity.ACTION_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'accounts_user_activity_daily'
+        verbose_name = 'Daily User Activity'
+        verbose_name_plural = 'Daily User Activities'
+        ordering = ['-date', 'user', 'action']
+        unique_together = ['date', 'user', 'action']
     
     def __str__(self):
-        return f"{self.user.email} - {self.action} - {self.timestamp}"
\ No newline at end of file
+        return f"{self.user.email} - {self.action} - {self.date}: {self.count}"
\ No newline at end of file
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import UserActivity, UserActivityDaily, UserSession
+
+DEFAULT_ACTIVITY_DAYS = 90
+DEFAULT_SESSION_DAYS = 30
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def _delete_in_batches(queryset, batch_size):
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += queryset.model.objects.filter(id__in=ids).delete()[0]
+
+
+def rollup_day(day, batch_size=5000, dry_run=False):
+    """
+    Fold one day of activity into ``UserActivityDaily`` and delete the rows.
+
+    Counts are added to any rollup already stored for the day, so re-running
+    after a partial failure never double counts: the day's rows and their
+    counts go in the same transaction. Returns the number of rows rolled up.
+    """
+    start = _day_start(day)
+    rows = UserActivity.objects.filter(timestamp__gte=start, timestamp__lt=start + timedelta(days=1))
+    counts = list(rows.values('user_id', 'action').annotate(total=Count('id')).order_by())
+    total = sum(item['total'] for item in counts)
+    if dry_run or not total:
+        return total
+
+    with transaction.atomic():
+        existing = {
+            (daily.user_id, daily.action): daily
+            for daily in UserActivityDaily.objects.select_for_update().filter(date=day)
+        }
+        created, updated = [], []
+        for item in counts:
+            daily = existing.get((item['user_id'], item['action']))
+            if daily is None:
+                created.append(UserActivityDaily(
+                    date=day, user_id=item['user_id'], action=item['action'], count=item['total']
+                ))
+            else:
+                daily.count += item['total']
+                updated.append(daily)
+        UserActivityDaily.objects.bulk_create(created, batch_size=batch_size)
+        UserActivityDaily.objects.bulk_update(updated, ['count'], batch_size=batch_size)
+        _delete_in_batches(rows, batch_size)
+    return total
+
+
+def prune_activity(days=None, batch_size=5000, dry_run=False):
+    """
+    Roll up activity older than ``days`` days into daily counts.
+
+    Works one day at a time from the oldest row, so each transaction stays
+    small however far behind the job is. Returns ``{'days': ..., 'activities': ...}``.
+    """
+    if days is None:
+        days = getattr(settings, 'ACTIVITY_RETENTION_DAYS', DEFAULT_ACTIVITY_DAYS)
+    cutoff = timezone.localdate() - timedelta(days=days)
+    oldest = UserActivity.objects.filter(timestamp__lt=_day_start(cutoff)).order_by('timestamp').first()
+
+    result = {'days': 0, 'activities': 0}
+    if oldest is None:
+        return result
+    day = timezone.localtime(oldest.timestamp).date()
+    while day < cutoff:
+        rolled_up = rollup_day(day, batch_size=batch_size, dry_run=dry_run)
+        if rolled_up:
+            result['days'] += 1
+            result['activities'] += rolled_up
+        day += timedelta(days=1)
+    return result
+
+
+def prune_sessions(days=None, batch_size=5000, dry_run=False):
+    """Delete sessions not seen for ``days`` days; returns how many"""
+    if days is None:
+        days = getattr(settings, 'SESSION_RETENTION_DAYS', DEFAULT_SESSION_DAYS)
+    cutoff = timezone.now() - timedelta(days=days)
+    removed = 0
+    # One query per is_active value so both use the (is_active, last_activity) index
+    for is_active in (False, True):
+        stale = UserSession.objects.filter(is_active=is_active, last_activity__lt=cutoff)
+        removed += stale.count() if dry_run else _delete_in_batches(stale, batch_size)
+    return removed
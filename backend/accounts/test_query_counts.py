@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from maria_havens_pos.testing import QueryScalingMixin
+from .models import UserActivity, UserSession
+
+User = get_user_model()
+
+
+class AccountQueryCountTestCase(QueryScalingMixin, TestCase):
+    """Account endpoints run the same number of queries for N and 10N rows"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='testpass123', role='manager'
+        )
+        self.client = self.api_client(self.manager)
+        self.seeded = 0
+
+    def seed_users(self, count):
+        for _ in range(count):
+            self.seeded += 1
+            user = User.objects.create_user(
+                username=f'waiter{self.seeded}', email=f'waiter{self.seeded}@example.com', role='waiter'
+            )
+            UserActivity.objects.create(user=user, action='login', ip_address='127.0.0.1')
+            UserSession.objects.create(user=user, session_key=f'session-{self.seeded}', ip_address='127.0.0.1')
+
+    def test_user_list(self):
+        """Test listing users"""
+        self.assertQueriesDoNotScale(self.client, '/api/accounts/users/', self.seed_users)
+
+    def test_user_retrieve(self):
+        """Test retrieving a user"""
+        self.assertQueriesDoNotScale(self.client, f'/api/accounts/users/{self.manager.id}/', self.seed_users)
+
+    def test_activity_feed(self):
+        """Test the activity feed"""
+        self.assertQueriesDoNotScale(self.client, '/api/accounts/activities/', self.seed_users)
+
+    def test_dashboard_stats(self):
+        """Test the dashboard statistics"""
+        self.assertQueriesDoNotScale(self.client, '/api/accounts/dashboard-stats/', self.seed_users)
+
+    def test_profile(self):
+        """Test the profile endpoint"""
+        self.assertQueriesDoNotScale(self.client, '/api/accounts/profile/', self.seed_users)
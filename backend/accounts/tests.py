@@ -0,0 +1,285 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from . import audit
+from .audit import AuditWriter
+from .backends import user_cache_key
+from .models import UserActivity, UserActivityDaily, UserSession
+
+User = get_user_model()
+
+
+class AuditWriterTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='manager',
+            email='manager@example.com',
+            password='testpass123',
+            role='manager'
+        )
+
+    def activity(self, action='login'):
+        return UserActivity(user=self.user, action=action, description='test', ip_address='127.0.0.1')
+
+    def test_mode_follows_settings(self):
+        """Test the suite runs the writer in sync mode and override_settings switches it"""
+        self.assertEqual(audit.get_writer().mode, 'sync')
+
+        with override_settings(AUDIT_LOG={**settings.AUDIT_LOG, 'MODE': 'thread', 'FLUSH_INTERVAL': 60}):
+            self.assertEqual(audit.get_writer().mode, 'thread')
+
+        self.assertEqual(audit.get_writer().mode, 'sync')
+
+    def test_thread_mode_buffers_until_flush(self):
+        """Test queued activities are written in one batch on flush"""
+        writer = AuditWriter(mode='thread', flush_interval=60)
+        for _ in range(5):
+            self.assertTrue(writer.log(self.activity()))
+
+        self.assertEqual(UserActivity.objects.count(), 0)
+        self.assertEqual(writer.pending(), 5)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(writer.flush(), 5)
+        self.assertEqual(UserActivity.objects.count(), 5)
+        writer.stop()
+
+    def test_full_queue_drops_events(self):
+        """Test the drop policy counts events that did not fit"""
+        writer = AuditWriter(mode='thread', max_queue=2, flush_interval=60)
+        results = [writer.log(self.activity()) for _ in range(4)]
+
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual(writer.dropped, 2)
+        writer.stop()
+        self.assertEqual(UserActivity.objects.count(), 2)
+
+    def test_sync_mode_writes_inline(self):
+        """Test sync mode saves the row immediately"""
+        writer = AuditWriter(mode='sync')
+        writer.log(self.activity('logout'))
+
+        self.assertTrue(UserActivity.objects.filter(action='logout').exists())
+        self.assertEqual(writer.pending(), 0)
+
+    def test_view_activity_goes_through_writer(self):
+        """Test audited endpoints log through the configured writer"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.post('/api/menu/categories/', {'name': 'Desserts'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(audit.get_writer().mode, 'sync')
+        activity = UserActivity.objects.get(user=self.user)
+        self.assertEqual(activity.action, 'menu_updated')
+        self.assertIsNotNone(activity.timestamp)
+
+
+class ActivityRetentionTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='manager',
+            email='manager@example.com',
+            password='testpass123',
+            role='manager'
+        )
+        self.now = timezone.now()
+
+    def add_activity(self, days_ago, action='login', count=1):
+        UserActivity.objects.bulk_create([
+            UserActivity(
+                user=self.user,
+                action=action,
+                ip_address='127.0.0.1',
+                timestamp=self.now - timedelta(days=days_ago)
+            )
+            for _ in range(count)
+        ])
+
+    def prune(self, *args):
+        call_command('prune_activity', *args, stdout=StringIO())
+
+    def test_old_activity_is_rolled_up(self):
+        """Test activity past retention becomes daily counts and is deleted"""
+        self.add_activity(120, count=3)
+        self.add_activity(120, action='logout')
+        self.add_activity(100)
+        self.add_activity(1, count=2)
+
+        self.prune('--days', '90')
+
+        self.assertEqual(UserActivity.objects.count(), 2)
+        daily = {
+            (row.date, row.action): row.count for row in UserActivityDaily.objects.all()
+        }
+        old_day = timezone.localdate(self.now - timedelta(days=120))
+        self.assertEqual(daily[(old_day, 'login')], 3)
+        self.assertEqual(daily[(old_day, 'logout')], 1)
+        self.assertEqual(sum(daily.values()), 5)
+
+    def test_rerun_adds_to_existing_rollup(self):
+        """Test pruning again only adds newly expired rows"""
+        self.add_activity(120, count=2)
+        self.prune('--days', '90')
+        self.prune('--days', '90')
+        self.add_activity(120)
+        self.prune('--days', '90')
+
+        self.assertEqual(UserActivityDaily.objects.get().count, 3)
+        self.assertEqual(UserActivity.objects.count(), 0)
+
+    def test_dry_run_changes_nothing(self):
+        """Test dry run leaves activity and sessions alone"""
+        self.add_activity(120)
+        self.prune('--days', '90', '--dry-run')
+
+        self.assertEqual(UserActivity.objects.count(), 1)
+        self.assertFalse(UserActivityDaily.objects.exists())
+
+    def test_stale_sessions_are_deleted(self):
+        """Test sessions idle past retention are removed"""
+        for key, is_active in [('old-active', True), ('old-closed', False), ('recent', True)]:
+            UserSession.objects.create(
+                user=self.user, session_key=key, ip_address='127.0.0.1', user_agent='test', is_active=is_active
+            )
+        UserSession.objects.filter(session_key__startswith='old').update(
+            last_activity=self.now - timedelta(days=40)
+        )
+
+        self.prune('--session-days', '30')
+
+        self.assertEqual(list(UserSession.objects.values_list('session_key', flat=True)), ['recent'])
+
+    def test_activity_feed_query_count(self):
+        """Test the activity feed does not query users per row"""
+        for index in range(5):
+            other = User.objects.create_user(
+                username=f'waiter{index}', email=f'waiter{index}@example.com', password='testpass123'
+            )
+            UserActivity.objects.create(user=other, action='login', ip_address='127.0.0.1')
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        # Pagination count plus one joined page query, regardless of authors
+        with self.assertNumQueries(2):
+            response = client.get('/api/accounts/activities/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class LoginTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='waiter',
+            email='waiter@example.com',
+            password='testpass123',
+            first_name='Amos',
+            last_name='Otieno',
+            role='waiter'
+        )
+
+    def login(self):
+        return self.client.post(
+            '/api/accounts/login/',
+            {'email': 'waiter@example.com', 'password': 'testpass123'},
+            format='json',
+            HTTP_X_FORWARDED_FOR='10.0.0.7'
+        )
+
+    def test_login_checks_password_once(self):
+        """Test a login costs a single password hash"""
+        check_password = User.check_password
+        with mock.patch.object(User, 'check_password', autospec=True, side_effect=check_password) as checked:
+            response = self.login()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(checked.call_count, 1)
+
+    def test_login_records_session_and_activity(self):
+        """Test login writes the session and activity through the audit writer"""
+        response = self.login()
+
+        session = UserSession.objects.get(user=self.user)
+        self.assertEqual(session.session_key, response.data['session_key'])
+        self.assertEqual(session.ip_address, '10.0.0.7')
+        activity = UserActivity.objects.get(user=self.user, action='login')
+        self.assertEqual(activity.ip_address, '10.0.0.7')
+
+    def test_invalid_password_rejected(self):
+        """Test login with a wrong password fails"""
+        response = self.client.post(
+            '/api/accounts/login/',
+            {'email': 'waiter@example.com', 'password': 'wrong'},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(UserSession.objects.exists())
+
+    def test_logout_right_after_login_ends_session(self):
+        """Test the session row exists as soon as login returns"""
+        self.login()
+        response = self.client.post('/api/accounts/logout/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(UserSession.objects.get(user=self.user).is_active)
+
+    @override_settings(AUTHENTICATION_BACKENDS=['accounts.backends.CachedUserBackend'])
+    def test_signed_in_user_is_cached(self):
+        """Test authenticated requests load the user from the cache"""
+        self.login()
+        self.client.get('/api/accounts/profile/')
+
+        # Only the session row is read once the user is cached
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/accounts/profile/')
+
+        self.assertEqual(response.data['email'], 'waiter@example.com')
+
+    @override_settings(AUTHENTICATION_BACKENDS=['accounts.backends.CachedUserBackend'])
+    def test_cached_user_has_no_password_hash(self):
+        """Test the cache entry leaves out the password hash"""
+        self.login()
+        self.client.get('/api/accounts/profile/')
+
+        entry = cache.get(user_cache_key(self.user.pk))
+        self.assertNotIn(self.user.password, entry['values'])
+        self.assertEqual(entry['session_auth_hash'], self.user.get_session_auth_hash())
+
+    @override_settings(AUTHENTICATION_BACKENDS=['accounts.backends.CachedUserBackend'])
+    def test_password_change_ends_cached_session(self):
+        """Test a password change signs out sessions served from the cache"""
+        self.login()
+        self.client.get('/api/accounts/profile/')
+
+        self.user.set_password('newpass456')
+        self.user.save()
+        response = self.client.get('/api/accounts/profile/')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(AUTHENTICATION_BACKENDS=['accounts.backends.CachedUserBackend'])
+    def test_cached_user_invalidated_on_save(self):
+        """Test a role change is visible on the next request"""
+        self.login()
+        self.client.get('/api/accounts/profile/')
+
+        self.user.role = 'manager'
+        self.user.save()
+        response = self.client.get('/api/accounts/profile/')
+
+        self.assertEqual(response.data['role'], 'manager')
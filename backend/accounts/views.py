@@ -2,7 +2,7 @@ from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.contrib.auth import login, logout, authenticate
+from django.contrib.auth import login, logout
 from django.utils import timezone
 from django.core.mail import send_mail
 from django.conf import settings
@@ -10,6 +10,8 @@ from django.template.loader import render_to_string
 import uuid
 from datetime import timedelta
 
+from jobqueue.queue import enqueue
+from .audit import log_activity
 from .models import User, UserActivity, UserSession
 from .serializers import (
     UserSerializer, UserCreateSerializer,
@@ -21,40 +23,37 @@ from .serializers import (
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def login_view(request):
-    serializer = LoginSerializer(data=request.data)
+    serializer = LoginSerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
-        email = serializer.validated_data['email']
-        password = serializer.validated_data['password']
+        # The serializer already checked the password; don't hash it twice
+        user = serializer.validated_data['user']
+        login(request, user)
         
-        user = authenticate(request, username=email, password=password)
-        if user:
-            login(request, user)
-            
-            # Create user session
-            session_key = str(uuid.uuid4())
-            UserSession.objects.create(
-                user=user,
-                session_key=session_key,
-                ip_address=get_client_ip(request),
-                user_agent=request.META.get('HTTP_USER_AGENT', ''),
-            )
-            
-            # Log activity
-            UserActivity.objects.create(
-                user=user,
-                action='login',
-                description=f'User logged in from {get_client_ip(request)}',
-                ip_address=get_client_ip(request),
-                metadata={'user_agent': request.META.get('HTTP_USER_AGENT', '')}
-            )
-            
-            return Response({
-                'message': 'Login successful',
-                'user': UserSerializer(user).data,
-                'session_key': session_key
-            })
-        else:
-            return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+        ip_address = get_client_ip(request)
+        user_agent = request.META.get('HTTP_USER_AGENT', '')
+        
+        # The session row is written inline so an immediate logout finds it;
+        # the activity row goes through the audit writer
+        session_key = str(uuid.uuid4())
+        UserSession.objects.create(
+            user=user,
+            session_key=session_key,
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+        log_activity(
+            user=user,
+            action='login',
+            description=f'User logged in from {ip_address}',
+            ip_address=ip_address,
+            metadata={'user_agent': user_agent}
+        )
+        
+        return Response({
+            'message': 'Login successful',
+            'user': UserSerializer(user).data,
+            'session_key': session_key
+        })
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -67,7 +66,7 @@ def logout_view(request):
         UserSession.objects.filter(user=request.user, is_active=True).update(is_active=False)
         
         # Log activity
-        UserActivity.objects.create(
+        log_activity(
             user=request.user,
             action='logout',
             description='User logged out',
@@ -102,7 +101,7 @@ class UserListCreateView(generics.ListCreateAPIView):
         user = serializer.save()
         
         # Log activity
-        UserActivity.objects.create(
+        log_activity(
             user=self.request.user,
             action='user_created',
             description=f'Created user: {user.get_full_name()}',
@@ -143,7 +142,7 @@ class ChangePasswordView(generics.GenericAPIView):
             UserSession.objects.filter(user=user).update(is_active=False)
             
             # Log activity
-            UserActivity.objects.create(
+            log_activity(
                 user=user,
                 action='password_changed',
                 description='User changed password',
@@ -161,8 +160,8 @@ class UserActivityListView(generics.ListAPIView):
     def get_queryset(self):
         # Admin/managers can see all activities, others only their own
         if self.request.user.can_access_admin():
-            return UserActivity.objects.all().order_by('-timestamp')[:100]
-        return UserActivity.objects.filter(user=self.request.user).order_by('-timestamp')[:50]
+            return UserActivity.objects.select_related('user').order_by('-timestamp')[:100]
+        return UserActivity.objects.filter(user=self.request.user).select_related('user').order_by('-timestamp')[:50]
 
 
 @api_view(['GET'])
@@ -187,11 +186,12 @@ def forgot_password_view(request):
             user.password_reset_expires = timezone.now() + timedelta(hours=1)
             user.save()
             
-            # Send email (implement actual email sending)
+            # Sent by the job worker so the request does not wait on SMTP
             reset_url = f"http://localhost:3000/reset-password?token={reset_token}"
+            enqueue('accounts.send_password_reset', {'user_id': user.id, 'reset_url': reset_url})
             
             # Log activity
-            UserActivity.objects.create(
+            log_activity(
                 user=user,
                 action='password_reset_requested',
                 description='Password reset requested',
@@ -216,7 +216,7 @@ def dashboard_stats(request):
         'total_users': User.objects.count(),
         'active_users': User.objects.filter(status='active').count(),
         'recent_activities': UserActivitySerializer(
-            UserActivity.objects.all()[:10], many=True
+            UserActivity.objects.select_related('user')[:10], many=True
         ).data,
         'active_sessions': UserSession.objects.filter(is_active=True).count(),
     }
@@ -0,0 +1,61 @@
+"""
+Micro-benchmarks for the backend.
+
+Each module exposes ``run(**options) -> dict`` and can be executed directly,
+e.g. ``python benchmarks/audit_log.py`` from the backend directory. They run
+against a throwaway test database, never the real one. Reports can be saved
+and diffed between commits with ``benchmarks/compare.py``.
+"""
+import os
+import statistics
+import sys
+from contextlib import contextmanager
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'maria_havens_pos.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database(name=None):
+    """
+    Create the test database, yield, and drop it again.
+
+    ``name`` overrides the test database name, e.g. a file path so SQLite
+    runs on disk (with real locking) rather than in memory.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    if name is not None:
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = name
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def summarize(samples):
+    """Latency summary in milliseconds for a list of durations in seconds"""
+    ordered = sorted(samples)
+
+    def pct(p):
+        return round(1000 * ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 3)
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(1000 * statistics.mean(ordered), 3),
+        'p50_ms': pct(50),
+        'p95_ms': pct(95),
+        'p99_ms': pct(99),
+        'max_ms': round(1000 * ordered[-1], 3),
+    }
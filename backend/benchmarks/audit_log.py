@@ -0,0 +1,64 @@
+"""
+Latency of audited writes with inline vs background audit logging.
+
+Creates menu categories through the API (each logs a UserActivity) with the
+audit writer in 'sync' mode (INSERT on the request path) and in 'thread'
+mode (buffered, bulk_create in the background).
+
+    python benchmarks/audit_log.py --requests 500
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import setup_django, summarize, test_database
+
+
+def _run_mode(mode, requests, client, label=None):
+    from accounts import audit
+    from accounts.models import UserActivity
+
+    audit._writer = audit.AuditWriter(mode=mode, flush_interval=0.2)
+    before = UserActivity.objects.count()
+    samples = []
+    for i in range(requests):
+        started = time.perf_counter()
+        response = client.post('/api/menu/categories/', {'name': f'{label or mode} category {i}'}, format='json')
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 201, response.content
+    audit._writer.stop()
+    result = summarize(samples)
+    result['activities_written'] = UserActivity.objects.count() - before
+    result['dropped'] = audit._writer.dropped
+    return result
+
+
+def run(requests=300):
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+
+    with test_database():
+        user = get_user_model().objects.create_user(
+            username='bench', email='bench@example.com', password='bench-pass-123', role='manager'
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        _run_mode('sync', 20, client, label='warm-up')
+        return {mode: _run_mode(mode, requests, client) for mode in ('sync', 'thread')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+    print(json.dumps(run(requests=args.requests), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Compare two benchmark reports, e.g. from before and after a change.
+
+Works on any report with latency summaries (``*_ms`` keys) nested under
+case names; results present in only one report are listed separately.
+Exits with status 1 when a p50 got slower by more than ``--threshold``
+percent, so it can gate CI.
+
+    python benchmarks/compare.py before.json after.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+
+def _summaries(report, path=()):
+    """Yield ``(path, summary)`` for every latency summary in a report"""
+    if isinstance(report, dict):
+        if 'p50_ms' in report:
+            yield path, report
+            return
+        for key, value in report.items():
+            if key != 'meta':
+                yield from _summaries(value, path + (str(key),))
+
+
+def compare(old, new, metric='p50_ms', threshold=10.0):
+    old_summaries = dict(_summaries(old.get('results', old)))
+    new_summaries = dict(_summaries(new.get('results', new)))
+    rows, regressions = [], []
+    for path in sorted(old_summaries.keys() & new_summaries.keys()):
+        before, after = old_summaries[path][metric], new_summaries[path][metric]
+        change = round(100 * (after - before) / before, 1) if before else None
+        row = {'case': ' / '.join(path), 'old': before, 'new': after, 'change_pct': change}
+        rows.append(row)
+        if change is not None and change > threshold:
+            regressions.append(row)
+    return {
+        'metric': metric,
+        'threshold_pct': threshold,
+        'old_commit': old.get('meta', {}).get('commit'),
+        'new_commit': new.get('meta', {}).get('commit'),
+        'rows': rows,
+        'regressions': regressions,
+        'only_old': [' / '.join(path) for path in sorted(old_summaries.keys() - new_summaries.keys())],
+        'only_new': [' / '.join(path) for path in sorted(new_summaries.keys() - old_summaries.keys())],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--metric', default='p50_ms', help='Summary field to compare, e.g. p95_ms')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Percent slowdown counted as a regression')
+    parser.add_argument('--json', action='store_true', help='Print the comparison as JSON')
+    args = parser.parse_args()
+
+    with open(args.old) as old, open(args.new) as new:
+        result = compare(json.load(old), json.load(new), args.metric, args.threshold)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['metric']}: {result['old_commit']} -> {result['new_commit']}")
+        width = max((len(row['case']) for row in result['rows']), default=0)
+        for row in result['rows']:
+            change = 'n/a' if row['change_pct'] is None else f"{row['change_pct']:+.1f}%"
+            flag = '  REGRESSION' if row in result['regressions'] else ''
+            print(f"{row['case']:<{width}}  {row['old']:>10.3f}  {row['new']:>10.3f}  {change:>8}{flag}")
+        for label in ('only_old', 'only_new'):
+            for case in result[label]:
+                print(f'{case}  ({label.replace("_", " ")})')
+    sys.exit(1 if result['regressions'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+Serializer, model and availability hot paths at several data sizes.
+
+For each size the test database is flushed and refilled by the load-data
+generator with that many menu items, customers, rooms, orders and
+reservations, and each case is timed ``--repeat`` times. Order-level cases are timed per
+number of items on the order instead. Caches are cleared before every
+call, so the numbers are for a cold cache.
+
+    python benchmarks/hot_paths.py --sizes 10,100,1000 --output before.json
+    python benchmarks/compare.py before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import BACKEND_DIR, setup_django, summarize, test_database
+
+# calculate_discount takes well under a microsecond, so it is timed in loops
+DISCOUNT_CALLS = 1000
+
+
+def _time(fn, repeat):
+    from django.core.cache import cache
+
+    samples = []
+    for _ in range(repeat):
+        cache.clear()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _counts(size):
+    return {
+        'users': 10,
+        'menu_items': size,
+        'tables': max(10, size // 10),
+        'customers': size,
+        'rooms': size,
+        'orders': size,
+        'reservations': size,
+        'days': 30,
+    }
+
+
+def serializer_cases(size, repeat):
+    """Serializing ``size`` rows from the querysets the list and detail views use"""
+    from django.db.models import Count
+    from hotels.models import Room
+    from hotels.serializers import RoomSerializer, room_prefetches
+    from menu.models import MenuItem
+    from menu.serializers import MenuItemSerializer, menu_item_prefetches
+    from orders.models import Order
+    from orders.serializers import OrderSummarySerializer
+    from reservations.models import Reservation
+    from reservations.serializers import ReservationSerializer
+
+    orders = Order.objects.select_related('table').annotate(items_count=Count('items'))[:size]
+    menu_items = MenuItem.objects.prefetch_related(*menu_item_prefetches())[:size]
+    rooms = Room.objects.prefetch_related(*room_prefetches())[:size]
+    reservations = Reservation.objects.select_related(
+        'customer', 'table', 'created_by', 'host'
+    ).prefetch_related('notes__created_by', 'history__performed_by')[:size]
+
+    return {
+        'order_summary_serializer': _time(lambda: OrderSummarySerializer(orders.all(), many=True).data, repeat),
+        'menu_item_serializer': _time(lambda: MenuItemSerializer(menu_items.all(), many=True).data, repeat),
+        'room_serializer': _time(lambda: RoomSerializer(rooms.all(), many=True).data, repeat),
+        'reservation_serializer': _time(lambda: ReservationSerializer(reservations.all(), many=True).data, repeat),
+    }
+
+
+def availability_cases(client, repeat):
+    from django.utils import timezone
+
+    today = timezone.now().date()
+    paths = {
+        'tables_available': '/api/orders/tables/available/',
+        'reservation_availability': f'/api/reservations/reservations/availability/?date={today}&time=19:00&party_size=2',
+        'reservation_availability_slots': f'/api/reservations/reservations/availability/?date={today}',
+        'reservation_availability_grid': '/api/reservations/reservations/availability_grid/?days=7',
+        'rooms_available': f'/api/hotels/rooms/available/?check_in={today}&check_out={today + timedelta(days=2)}',
+        'room_type_availability_grid': '/api/hotels/room-types/availability_grid/?days=14',
+    }
+
+    def get(path):
+        response = client.get(path)
+        assert response.status_code == 200, response.content
+
+    return {name: _time(lambda path=path: get(path), repeat) for name, path in paths.items()}
+
+
+def order_cases(item_counts, repeat, user):
+    """``OrderSerializer.create`` and ``Order.calculate_total`` for orders of each size"""
+    from menu.models import MenuItem, MenuItemAddOn
+    from orders.models import Order, Table
+    from orders.serializers import OrderSerializer
+
+    table = Table.objects.first()
+    menu_items = list(MenuItem.objects.values_list('id', 'price')[:max(item_counts)])
+    addon = MenuItemAddOn.objects.create(name='Kachumbari', price=Decimal('100.00'))
+
+    def validated_data(count):
+        return {
+            'order_type': 'dine_in',
+            'table_id': table.id,
+            'server': user,
+            'items': [
+                {
+                    'menu_item_id': menu_item_id, 'quantity': 1, 'unit_price': price,
+                    'addons': [{'addon_id': addon.id, 'unit_price': addon.price}],
+                }
+                for menu_item_id, price in (menu_items[n % len(menu_items)] for n in range(count))
+            ],
+        }
+
+    results = {'order_serializer_create': {}, 'order_calculate_total': {}}
+    for count in item_counts:
+        results['order_serializer_create'][f'items={count}'] = _time(
+            lambda: OrderSerializer().create(validated_data(count)), repeat
+        )
+        order = OrderSerializer().create(validated_data(count))
+        results['order_calculate_total'][f'items={count}'] = _time(
+            lambda: Order.objects.get(pk=order.pk).calculate_total(), repeat
+        )
+    return results
+
+
+def discount_cases(repeat):
+    from menu.models import MenuDiscount
+
+    discounts = {
+        'percentage': MenuDiscount(discount_type='percentage', value=Decimal('15.00')),
+        'percentage_capped': MenuDiscount(
+            discount_type='percentage', value=Decimal('15.00'), max_discount_amount=Decimal('500.00')
+        ),
+        'fixed': MenuDiscount(discount_type='fixed', value=Decimal('200.00')),
+    }
+    amounts = [Decimal(amount) for amount in range(150, 150 + DISCOUNT_CALLS * 7, 7)]
+
+    def apply(discount):
+        for amount in amounts:
+            discount.calculate_discount(amount)
+
+    return {
+        f'{name} x{DISCOUNT_CALLS}': _time(lambda discount=discount: apply(discount), repeat)
+        for name, discount in discounts.items()
+    }
+
+
+def run(sizes=(10, 100, 1000), item_counts=(1, 5, 25), repeat=20, seed=0):
+    setup_django()
+    import django
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from rest_framework.test import APIClient
+    from accounts import audit
+    from maria_havens_pos.sample_data import Generator
+
+    results = {}
+
+    def record(case, variant, summary):
+        results.setdefault(case, {})[variant] = summary
+
+    with test_database():
+        try:
+            for size in sizes:
+                call_command('flush', interactive=False, verbosity=0)
+                Generator(_counts(size), seed=seed).run()
+                user = get_user_model().objects.create_user(
+                    username='bench', email='bench@example.com', password='bench-pass-123', role='manager'
+                )
+                client = APIClient()
+                client.force_authenticate(user=user)
+
+                for case, summary in serializer_cases(size, repeat).items():
+                    record(case, f'rows={size}', summary)
+                for case, summary in availability_cases(client, repeat).items():
+                    record(case, f'rows={size}', summary)
+                if size == sizes[0]:
+                    results.update(order_cases(item_counts, repeat, user))
+        finally:
+            audit.get_writer().stop()
+
+    results['menu_discount_calculate_discount'] = discount_cases(repeat)
+    return {
+        'meta': {
+            'commit': _commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+            'sizes': list(sizes),
+            'item_counts': list(item_counts),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def _ints(value):
+    return tuple(int(part) for part in value.split(',') if part)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=_ints, default=(10, 100, 1000), help='Comma-separated row counts')
+    parser.add_argument('--items', type=_ints, default=(1, 5, 25), help='Comma-separated items per order')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed calls per case')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the report to this file as well as stdout')
+    args = parser.parse_args()
+    report = json.dumps(
+        run(sizes=args.sizes, item_counts=args.items, repeat=args.repeat, seed=args.seed), indent=2, sort_keys=True
+    )
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(report + '\n')
+    print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Rendering and parsing JSON: DRF's stdlib classes vs the orjson ones.
+
+Serializes ``--rows`` orders (with their items) and menu items once, then
+times turning that data into a response body with ``JSONRenderer`` and
+``FastJSONRenderer``, and parsing the body back with ``JSONParser`` and
+``FastJSONParser``. Serializer time is left out; it is the same for both.
+
+    python benchmarks/json_rendering.py --rows 1000
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import setup_django, summarize, test_database
+
+
+def _payloads(rows):
+    from menu.models import MenuItem
+    from menu.serializers import MenuItemSerializer, menu_item_prefetches
+    from orders.models import Order
+    from orders.serializers import OrderSerializer
+
+    orders = Order.objects.select_related('table', 'customer', 'server').prefetch_related(
+        'items__menu_item', 'items__addons__addon'
+    )[:rows]
+    menu_items = MenuItem.objects.prefetch_related(*menu_item_prefetches())[:rows]
+    return {
+        'orders': OrderSerializer(orders, many=True).data,
+        'menu_items': MenuItemSerializer(menu_items, many=True).data,
+    }
+
+
+def _time(fn, repeat):
+    samples, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples), result
+
+
+def run(rows=1000, repeat=20, seed=0):
+    setup_django()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from accounts import audit
+    from maria_havens_pos.parsers import FastJSONParser
+    from maria_havens_pos.renderers import FastJSONRenderer, orjson
+    from maria_havens_pos.sample_data import Generator
+
+    with test_database():
+        try:
+            Generator({
+                'users': 10, 'menu_items': rows, 'tables': 60, 'customers': max(100, rows // 10),
+                'rooms': 10, 'orders': rows, 'reservations': 10, 'days': 30,
+            }, seed=seed).run()
+            payloads = _payloads(rows)
+        finally:
+            audit.get_writer().stop()
+
+    results = {'orjson': orjson is not None and orjson.__version__}
+    for name, data in payloads.items():
+        stdlib, body = _time(lambda: JSONRenderer().render(data), repeat)
+        fast, fast_body = _time(lambda: FastJSONRenderer().render(data), repeat)
+        assert fast_body == body, f'{name}: rendered output differs'
+        parse, parsed = _time(lambda: JSONParser().parse(io.BytesIO(body)), repeat)
+        fast_parse, fast_parsed = _time(lambda: FastJSONParser().parse(io.BytesIO(body)), repeat)
+        assert fast_parsed == parsed, f'{name}: parsed output differs'
+        results[name] = {
+            'rows': len(data),
+            'bytes': len(body),
+            'render': {'json_renderer': stdlib, 'fast_json_renderer': fast},
+            'parse': {'json_parser': parse, 'fast_json_parser': fast_parse},
+            'render_speedup': round(stdlib['p50_ms'] / fast['p50_ms'], 2),
+            'parse_speedup': round(parse['p50_ms'] / fast_parse['p50_ms'], 2),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(run(rows=args.rows, repeat=args.repeat, seed=args.seed), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Per-row cost of list serializers: ModelSerializer vs values() rendering.
+
+Renders ``--rows`` orders, menu items, room bookings and reservations with
+the summary ``ModelSerializer`` each list endpoint used to use and with its
+``ValuesSerializer``, from the same queryset. Times include fetching the
+rows, since that is part of what ``values()`` saves.
+
+    python benchmarks/list_serializers.py --rows 10000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import setup_django, summarize, test_database
+
+
+def _cases(rows):
+    from django.db.models import Count
+    from hotels.models import RoomBooking
+    from hotels.serializers import RoomBookingSummarySerializer, RoomBookingSummaryValuesSerializer
+    from menu.models import MenuItem
+    from menu.serializers import MenuItemListSerializer, MenuItemListValuesSerializer
+    from orders.models import Order
+    from orders.serializers import OrderSummarySerializer, OrderSummaryValuesSerializer
+    from reservations.models import Reservation
+    from reservations.serializers import ReservationSummarySerializer, ReservationSummaryValuesSerializer
+
+    # The list querysets of the corresponding viewsets
+    return {
+        'order_summary': (
+            Order.objects.select_related('table').annotate(items_count=Count('items')).order_by('-created_at')[:rows],
+            OrderSummarySerializer, OrderSummaryValuesSerializer,
+        ),
+        'menu_item_list': (
+            MenuItem.objects.select_related('category').order_by('category', 'sort_order', 'name')[:rows],
+            MenuItemListSerializer, MenuItemListValuesSerializer,
+        ),
+        'room_booking_summary': (
+            RoomBooking.objects.select_related('customer', 'room').order_by('-created_at')[:rows],
+            RoomBookingSummarySerializer, RoomBookingSummaryValuesSerializer,
+        ),
+        'reservation_summary': (
+            Reservation.objects.select_related('customer', 'table').order_by('date', 'time')[:rows],
+            ReservationSummarySerializer, ReservationSummaryValuesSerializer,
+        ),
+    }
+
+
+def _time(fn, repeat):
+    samples, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples), result
+
+
+def run(rows=10000, repeat=5, seed=0):
+    setup_django()
+    from accounts import audit
+    from maria_havens_pos.sample_data import Generator
+
+    with test_database():
+        try:
+            Generator({
+                'users': 10, 'menu_items': rows, 'tables': 60, 'customers': max(100, rows // 10),
+                'rooms': max(5, rows // 150), 'orders': rows, 'reservations': rows, 'days': 730,
+            }, seed=seed).run()
+
+            results = {}
+            for name, (queryset, serializer_class, values_serializer_class) in _cases(rows).items():
+                model, model_data = _time(lambda: serializer_class(queryset.all(), many=True).data, repeat)
+                values, values_data = _time(
+                    lambda: values_serializer_class(queryset.values(*values_serializer_class.lookups())).data, repeat
+                )
+                assert values_data == model_data, f'{name}: values serializer output differs'
+                count = len(values_data)
+                results[name] = {
+                    'rows': count,
+                    'model_serializer': model,
+                    'values_serializer': values,
+                    'model_us_per_row': round(1000 * model['p50_ms'] / count, 2),
+                    'values_us_per_row': round(1000 * values['p50_ms'] / count, 2),
+                    'speedup': round(model['p50_ms'] / values['p50_ms'], 2),
+                }
+            return results
+        finally:
+            audit.get_writer().stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(run(rows=args.rows, repeat=args.repeat, seed=args.seed), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,351 @@
+"""
+Dinner-rush load test against the API.
+
+Virtual staff log in and loop through the weighted scenario for their
+role: waiters browse the menu, check tables, place and confirm orders and
+follow them up; the kitchen works the display queue; managers watch
+reservations, rooms and the floor. Each virtual user waits a random think
+time between steps, and users join gradually over ``--ramp-up`` seconds so
+load builds the way a dinner service does. The report gives p50/p95/p99
+latency and error counts per endpoint.
+
+Against a running server, with data from ``generate_load_data``
+(``--staff`` must match its ``--users``, 60 by default; with more virtual
+users than staff accounts, accounts are shared):
+
+    python manage.py generate_load_data --scale 0.1
+    python benchmarks/load_runner.py --base-url http://localhost:8000 --users 100 --duration 120
+
+Without ``--base-url`` it generates a small dataset in a throwaway
+database and drives the app in-process through the Django test client:
+
+    python benchmarks/load_runner.py --users 10 --duration 20 --scale 0.002
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import date
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import setup_django, summarize, test_database
+
+
+class HttpTransport:
+    """One logged-in session against a running server"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+    def request(self, method, path, data=None):
+        headers = {'Accept': 'application/json'}
+        body = None
+        if data is not None:
+            body = json.dumps(data).encode()
+            headers['Content-Type'] = 'application/json'
+        token = next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), None)
+        if token:
+            headers['X-CSRFToken'] = token
+            headers['Referer'] = self.base_url + '/'
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                return response.status, _json(response.read())
+        except urllib.error.HTTPError as exc:
+            return exc.code, _json(exc.read())
+
+
+class ClientTransport:
+    """One logged-in session through the Django test client, in this process"""
+
+    def __init__(self):
+        from django.test import Client
+
+        self.client = Client()
+
+    def request(self, method, path, data=None):
+        kwargs = {'content_type': 'application/json', 'data': json.dumps(data)} if data is not None else {}
+        response = getattr(self.client, method.lower())(path, **kwargs)
+        return response.status_code, _json(response.content)
+
+
+def _json(content):
+    try:
+        return json.loads(content) if content else None
+    except ValueError:
+        return None
+
+
+def _results(body):
+    if isinstance(body, dict):
+        return body.get('results') or []
+    return body or []
+
+
+class VirtualUser:
+    """A member of staff working through the scenario with their own session"""
+
+    def __init__(self, transport, rng):
+        self.transport = transport
+        self.random = rng
+        self.menu_items = []
+        self.menu_pages = 1
+        self.tables = []
+        self.orders = []          # ids of orders this user placed
+        self.pending = []         # ... of which not yet confirmed
+        self.tickets = []         # kitchen display ids seen on the last queue read
+        self.samples = []         # (endpoint, seconds, status) for every request made
+
+    def call(self, label, method, path, data=None):
+        started = time.perf_counter()
+        try:
+            status, body = self.transport.request(method, path, data)
+        except Exception as exc:  # connection refused, timeout: count it and carry on
+            status, body = 0, {'error': str(exc)}
+        self.samples.append((label, time.perf_counter() - started, status))
+        return status, body
+
+    def login(self, email, password):
+        """Log in and return the user's role"""
+        status, body = self.call('POST /api/accounts/login/', 'POST', '/api/accounts/login/',
+                                 {'email': email, 'password': password})
+        if status == 200 and isinstance(body, dict):
+            return body['user']['role']
+
+    def browse_menu(self):
+        page = self.random.randint(1, self.menu_pages)
+        _, body = self.call('GET /api/menu/items/', 'GET', f'/api/menu/items/?pos=true&page={page}')
+        if isinstance(body, dict) and body.get('results'):
+            self.menu_pages = max(1, min(20, -(-body['count'] // len(body['results']))))
+            self.menu_items = body['results']
+
+    def categories(self):
+        self.call('GET /api/menu/categories/', 'GET', '/api/menu/categories/')
+
+    def available_tables(self):
+        _, body = self.call('GET /api/orders/tables/available/', 'GET', '/api/orders/tables/available/')
+        tables = [table for table in _results(body) if isinstance(table, dict)]
+        if tables:
+            self.tables = tables
+
+    def place_order(self):
+        """Open an order and ring the items in one by one, as the POS screen does"""
+        if not self.menu_items:
+            return self.browse_menu()
+        order = {'order_type': 'dine_in'}
+        if self.tables:
+            order['table_id'] = self.random.choice(self.tables)['id']
+        else:
+            order['order_type'] = 'takeaway'
+        status, body = self.call('POST /api/orders/orders/', 'POST', '/api/orders/orders/', order)
+        if status != 201 or not isinstance(body, dict):
+            return
+        for item in self.random.sample(self.menu_items, min(len(self.menu_items), self.random.randint(1, 4))):
+            self.call('POST /api/orders/order-items/', 'POST', '/api/orders/order-items/', {
+                'order': body['id'], 'menu_item_id': item['id'], 'quantity': self.random.choice([1, 1, 2]),
+            })
+        self.orders = (self.orders + [body['id']])[-20:]
+        self.pending.append(body['id'])
+
+    def confirm_order(self):
+        if not self.pending:
+            return self.place_order()
+        order_id = self.pending.pop(0)
+        self.call('POST /api/orders/orders/<pk>/confirm/', 'POST', f'/api/orders/orders/{order_id}/confirm/')
+
+    def order_detail(self):
+        if not self.orders:
+            return self.active_orders()
+        order_id = self.random.choice(self.orders)
+        self.call('GET /api/orders/orders/<pk>/', 'GET', f'/api/orders/orders/{order_id}/')
+
+    def active_orders(self):
+        self.call('GET /api/orders/orders/active/', 'GET', '/api/orders/orders/active/')
+
+    def kitchen_queue(self):
+        _, body = self.call('GET /api/orders/kitchen-display/', 'GET', '/api/orders/kitchen-display/')
+        self.tickets = [ticket['id'] for ticket in _results(body) if isinstance(ticket, dict)]
+
+    def work_ticket(self):
+        if not self.tickets:
+            return self.kitchen_queue()
+        ticket = self.tickets.pop(self.random.randrange(len(self.tickets)))
+        step = self.random.choice(['start', 'complete'])
+        self.call(f'POST /api/orders/kitchen-display/<pk>/{step}/', 'POST',
+                  f'/api/orders/kitchen-display/{ticket}/{step}/')
+
+    def reservations(self):
+        self.call('GET /api/reservations/reservations/', 'GET',
+                  f'/api/reservations/reservations/?date={date.today().isoformat()}')
+
+    def room_types(self):
+        self.call('GET /api/hotels/room-types/', 'GET', '/api/hotels/room-types/')
+
+
+# (weight, step) per role: roughly what a busy evening looks like from the server's side
+DINNER_RUSH = {
+    'waiter': [
+        (20, VirtualUser.browse_menu),
+        (5, VirtualUser.categories),
+        (12, VirtualUser.available_tables),
+        (18, VirtualUser.place_order),
+        (14, VirtualUser.confirm_order),
+        (10, VirtualUser.order_detail),
+        (8, VirtualUser.active_orders),
+    ],
+    'kitchen': [
+        (10, VirtualUser.kitchen_queue),
+        (15, VirtualUser.work_ticket),
+        (3, VirtualUser.active_orders),
+    ],
+    'manager': [
+        (6, VirtualUser.reservations),
+        (4, VirtualUser.room_types),
+        (6, VirtualUser.active_orders),
+        (3, VirtualUser.available_tables),
+        (3, VirtualUser.kitchen_queue),
+    ],
+}
+
+
+def _virtual_user(index, make_transport, credentials, options, deadline, samples, lock):
+    rng = random.Random(options['seed'] + index)
+    time.sleep(options['ramp_up'] * index / max(1, options['users']))
+    user = VirtualUser(make_transport(), rng)
+    email, password = credentials[index % len(credentials)]
+
+    scenario = DINNER_RUSH.get(user.login(email, password), DINNER_RUSH['waiter'])
+    weights = [weight for weight, _ in scenario]
+    steps = [step for _, step in scenario]
+    while time.monotonic() < deadline:
+        rng.choices(steps, weights=weights)[0](user)
+        if options['think_time']:
+            time.sleep(rng.expovariate(1 / options['think_time']))
+    with lock:
+        samples.extend(user.samples)
+
+
+def _drive(make_transport, credentials, users, duration, ramp_up, think_time, seed):
+    options = {'users': users, 'ramp_up': ramp_up, 'think_time': think_time, 'seed': seed}
+    samples, lock = [], threading.Lock()
+    started = time.monotonic()
+    deadline = started + ramp_up + duration
+    threads = [
+        threading.Thread(
+            target=_virtual_user,
+            args=(index, make_transport, credentials, options, deadline, samples, lock)
+        )
+        for index in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    by_endpoint = {}
+    for label, seconds, status in samples:
+        by_endpoint.setdefault(label, []).append((seconds, status))
+    endpoints = {}
+    for label, results in sorted(by_endpoint.items()):
+        endpoints[label] = summarize([seconds for seconds, _ in results])
+        endpoints[label]['errors'] = sum(1 for _, status in results if not 200 <= status < 300)
+    return {
+        'users': users,
+        'seconds': round(elapsed, 1),
+        'requests': len(samples),
+        'requests_per_second': round(len(samples) / elapsed, 1),
+        'errors': sum(entry['errors'] for entry in endpoints.values()),
+        'overall': summarize([seconds for _, seconds, _ in samples]),
+        'endpoints': endpoints,
+    }
+
+
+def _staff_credentials():
+    from django.contrib.auth import get_user_model
+    from maria_havens_pos.sample_data import EMAIL_DOMAIN, PASSWORD
+
+    emails = (
+        get_user_model().objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').order_by('id').values_list('email', flat=True)
+    )
+    return [(email, PASSWORD) for email in emails]
+
+
+def run(users=10, duration=20, ramp_up=5, think_time=0.2, base_url=None, scale=0.002, email=None,
+        password=None, seed=0, staff=None):
+    """
+    Replay the dinner rush and return the latency report.
+
+    With ``base_url`` every user logs in as ``email``/``password``, or by
+    default as one of the ``staff`` generated ``ldstaff<n>`` accounts
+    (shared round-robin when there are more users than accounts);
+    otherwise a ``scale``-sized dataset is generated in a throwaway on-disk
+    database and used in-process.
+    """
+    if base_url:
+        if not email:
+            setup_django()
+            from maria_havens_pos.sample_data import DEFAULT_COUNTS, EMAIL_DOMAIN, PASSWORD
+
+            staff = staff or DEFAULT_COUNTS['users']
+            credentials = [(f'ldstaff{index}@{EMAIL_DOMAIN}', PASSWORD) for index in range(staff)]
+        else:
+            credentials = [(email, password)]
+        return _drive(lambda: HttpTransport(base_url), credentials, users, duration, ramp_up, think_time, seed)
+
+    setup_django()
+    from django.conf import settings
+    from accounts import audit
+    from maria_havens_pos.sample_data import DEFAULT_COUNTS, Generator
+
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+    with tempfile.TemporaryDirectory() as directory:
+        with test_database(os.path.join(directory, 'load.sqlite3')):
+            counts = {name: max(1, int(total * scale)) for name, total in DEFAULT_COUNTS.items() if name != 'days'}
+            counts['users'] = max(DEFAULT_COUNTS['users'], users)
+            counts['tables'] = max(counts['tables'], 20)
+            Generator(counts=counts, seed=seed).run()
+            credentials = _staff_credentials()
+            try:
+                report = _drive(ClientTransport, credentials, users, duration, ramp_up, think_time, seed)
+            finally:
+                audit.get_writer().stop()  # flush login records before the database goes
+            report['dataset'] = counts
+            return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', help='Server to load, e.g. http://localhost:8000 (default: in-process)')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent virtual staff')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds at full load after ramp-up')
+    parser.add_argument('--ramp-up', type=float, default=5, help='Seconds over which users join')
+    parser.add_argument('--think-time', type=float, default=0.2, help='Mean seconds between a user\'s requests')
+    parser.add_argument('--scale', type=float, default=0.002, help='Dataset size for the in-process run')
+    parser.add_argument('--email', help='Log every user in with this account instead of the ldstaff ones')
+    parser.add_argument('--password')
+    parser.add_argument('--staff', type=int,
+                        help='Staff accounts generate_load_data created (its --users, default 60)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    report = run(
+        users=args.users, duration=args.duration, ramp_up=args.ramp_up, think_time=args.think_time,
+        base_url=args.base_url, scale=args.scale, email=args.email, password=args.password, seed=args.seed,
+        staff=args.staff,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
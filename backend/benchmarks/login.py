@@ -0,0 +1,74 @@
+"""
+Shift-change login throughput.
+
+Logs ``--users`` staff members in one after another (fresh client each,
+as at the start of a shift) and then has each of them load their profile,
+which resolves ``request.user`` through the cached auth backend.
+
+    python benchmarks/login.py --users 60
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import setup_django, summarize, test_database
+
+PASSWORD = 'shift-change-123'
+
+
+def run(users=60):
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+    from accounts import audit
+
+    User = get_user_model()
+    with test_database():
+        for index in range(users):
+            User.objects.create_user(
+                username=f'staff{index}', email=f'staff{index}@example.com', password=PASSWORD, role='waiter'
+            )
+
+        clients, logins = [], []
+        started = time.perf_counter()
+        for index in range(users):
+            client = APIClient()
+            begin = time.perf_counter()
+            response = client.post(
+                '/api/accounts/login/',
+                {'email': f'staff{index}@example.com', 'password': PASSWORD},
+                format='json'
+            )
+            logins.append(time.perf_counter() - begin)
+            assert response.status_code == 200, response.content
+            clients.append(client)
+        elapsed = time.perf_counter() - started
+
+        requests = []
+        for client in clients * 5:
+            begin = time.perf_counter()
+            client.get('/api/accounts/profile/')
+            requests.append(time.perf_counter() - begin)
+        audit.get_writer().stop()
+
+        return {
+            'logins_per_second': round(users / elapsed, 2),
+            'login': summarize(logins),
+            'authenticated_request': summarize(requests),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=60)
+    args = parser.parse_args()
+    print(json.dumps(run(users=args.users), indent=2))
+
+
+if __name__ == '__main__':
+    main()
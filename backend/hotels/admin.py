@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import RoomType, Room, RoomBooking, RoomService, RoomMaintenance
+from .models import RoomType, Room, RoomBooking, RoomService, RoomMaintenance, FolioEntry
 
 
 @admin.register(RoomType)
@@ -53,6 +53,19 @@ class RoomServiceInline(admin.TabularInline):
     readonly_fields = ['requested_by', 'created_at', 'completed_at']
 
 
+class FolioEntryInline(admin.TabularInline):
+    model = FolioEntry
+    fk_name = 'booking'
+    extra = 0
+    can_delete = False
+    fields = ['source', 'description', 'amount', 'order', 'service', 'posted_by', 'posted_at']
+    readonly_fields = fields
+    
+    def has_add_permission(self, request, obj=None):
+        # Charges go through hotels.folio so running totals stay in step
+        return False
+
+
 @admin.register(RoomBooking)
 class RoomBookingAdmin(admin.ModelAdmin):
     list_display = [
@@ -65,11 +78,11 @@ class RoomBookingAdmin(admin.ModelAdmin):
         'customer__phone', 'room__number'
     ]
     readonly_fields = [
-        'booking_number', 'nights', 'total_room_charges', 'total_amount',
-        'created_by', 'checked_in_by', 'checked_out_by', 'created_at',
+        'booking_number', 'nights', 'total_room_charges', 'additional_charges',
+        'total_amount', 'created_by', 'checked_in_by', 'checked_out_by', 'created_at',
         'updated_at', 'checked_in_at', 'checked_out_at'
     ]
-    inlines = [RoomServiceInline]
+    inlines = [RoomServiceInline, FolioEntryInline]
     ordering = ['-created_at']
     date_hierarchy = 'check_in_date'
     
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class HotelsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'hotels'
\ No newline at end of file
+    name = 'hotels'
+
+    def ready(self):
+        from . import signals  # noqa: F401
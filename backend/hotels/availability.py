@@ -0,0 +1,92 @@
+import time as time_module
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+
+from .models import Room, RoomBooking, RoomMaintenance, RoomType
+from .planner import BLOCKING_BOOKING_STATUSES, OPEN_MAINTENANCE_STATUSES
+
+CACHE_TIMEOUT = 10 * 60
+VERSION_KEY = 'hotels:availability:version'
+
+
+def _nights(first, last, start_date, days):
+    """Bitmask of the nights from ``first`` up to (not including) ``last``"""
+    begin = max((first - start_date).days, 0)
+    end = min((last - start_date).days, days)
+    return ((1 << (end - begin)) - 1) << begin if end > begin else 0
+
+
+def booked_nights(start_date, days):
+    """
+    ``{room_id: bitmask}`` of nights taken by bookings or open maintenance.
+
+    Bit ``n`` stands for the night of ``start_date + n``. Two queries cover
+    the whole property for the whole range.
+    """
+    end_date = start_date + timedelta(days=days)
+    busy = defaultdict(int)
+    for room_id, check_in, check_out in RoomBooking.objects.filter(
+        status__in=BLOCKING_BOOKING_STATUSES,
+        check_in_date__lt=end_date,
+        check_out_date__gt=start_date
+    ).values_list('room_id', 'check_in_date', 'check_out_date'):
+        busy[room_id] |= _nights(check_in, check_out, start_date, days)
+
+    for room_id, day in RoomMaintenance.objects.filter(
+        status__in=OPEN_MAINTENANCE_STATUSES,
+        scheduled_date__gte=start_date,
+        scheduled_date__lt=end_date
+    ).values_list('room_id', 'scheduled_date'):
+        busy[room_id] |= _nights(day, day + timedelta(days=1), start_date, days)
+    return busy
+
+
+def room_type_grid(start_date, days):
+    """
+    Free rooms per room type for each night from ``start_date``.
+
+    Returns ``[{'id', 'name', 'base_price', 'total_rooms', 'available'}]``
+    where ``available[n]`` counts the rooms free on night ``n``. Results are
+    cached until a booking, room or maintenance job changes.
+    """
+    key = f'hotels:availability:{_version()}:{start_date.isoformat()}:{days}'
+    grid = cache.get(key)
+    if grid is not None:
+        return grid
+
+    busy = booked_nights(start_date, days)
+    rooms_by_type = defaultdict(list)
+    for room_id, room_type_id in Room.objects.filter(is_active=True).exclude(
+        status='out_of_order'
+    ).values_list('id', 'room_type_id'):
+        rooms_by_type[room_type_id].append(busy.get(room_id, 0))
+
+    grid = []
+    for room_type_id, name, base_price in RoomType.objects.filter(is_active=True).order_by(
+        'name'
+    ).values_list('id', 'name', 'base_price'):
+        masks = rooms_by_type.get(room_type_id, [])
+        grid.append({
+            'id': room_type_id,
+            'name': name,
+            'base_price': base_price,
+            'total_rooms': len(masks),
+            'available': [sum(1 for mask in masks if not mask >> night & 1) for night in range(days)],
+        })
+    cache.set(key, grid, CACHE_TIMEOUT)
+    return grid
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = time_module.time_ns()
+        cache.add(VERSION_KEY, version, None)
+        version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalidate():
+    cache.set(VERSION_KEY, time_module.time_ns(), None)
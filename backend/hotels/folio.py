@@ -0,0 +1,86 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from orders.models import Order
+from reservations import stats
+from .models import FolioEntry, RoomBooking
+
+OPEN_FOLIO_STATUSES = ['confirmed', 'checked_in']
+
+
+class FolioError(Exception):
+    """Raised when a charge cannot be posted to a booking"""
+
+
+def post_charge(booking, amount, description, source='adjustment', order=None, service=None, user=None):
+    """
+    Post a line item to ``booking``'s folio.
+
+    The booking's ``additional_charges`` and ``total_amount`` are running
+    totals bumped with F() in the same transaction, so the check-out total
+    is always a single-row read and concurrent postings never overwrite
+    each other.
+    """
+    amount = Decimal(amount)
+    if booking.status not in OPEN_FOLIO_STATUSES:
+        raise FolioError('Charges can only be posted to confirmed or checked-in bookings.')
+
+    try:
+        with transaction.atomic():
+            entry = FolioEntry.objects.create(
+                booking=booking,
+                source=source,
+                description=description,
+                amount=amount,
+                order=order,
+                service=service,
+                posted_by=user
+            )
+            RoomBooking.objects.filter(id=booking.id).update(
+                additional_charges=F('additional_charges') + amount,
+                total_amount=F('total_amount') + amount,
+                updated_at=timezone.now()
+            )
+    except IntegrityError:
+        raise FolioError('This charge has already been posted.')
+    return entry
+
+
+def post_order(booking, order, user=None):
+    """Charge a restaurant order to the guest's room"""
+    if order.status == 'cancelled':
+        raise FolioError('Cancelled orders cannot be charged to a room.')
+    if order.payments.filter(status='completed').exists():
+        raise FolioError('This order has already been paid.')
+    with transaction.atomic():
+        entry = post_charge(
+            booking,
+            order.total_amount,
+            f'Restaurant order {order.order_number}',
+            source='restaurant',
+            order=order,
+            user=user
+        )
+        # The order is now part of the stay's total, which counts at check-out
+        if order.status == 'completed':
+            stats.record_spend(order.customer_id, -order.total_amount)
+        if not order.customer_id:
+            Order.objects.filter(id=order.id).update(customer=booking.customer_id)
+    return entry
+
+
+def post_service(service, user=None):
+    """Charge a completed room service to its booking (no-op for free services)"""
+    if service.charge <= 0:
+        return None
+    return post_charge(
+        service.booking,
+        service.charge,
+        f'{service.get_service_type_display()}: {service.description[:200]}',
+        source='room_service',
+        service=service,
+        user=user
+    )
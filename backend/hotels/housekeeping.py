@@ -0,0 +1,200 @@
+import heapq
+import itertools
+import threading
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Room, RoomBooking
+
+# An unfinished claim (app closed, attendant gone home) is handed out again after this
+CLAIM_TIMEOUT = timedelta(minutes=45)
+
+
+class HousekeepingQueue:
+    """
+    Per-floor priority queue of rooms waiting to be cleaned.
+
+    A room is queued while its status is 'cleaning'. Rooms with a guest
+    arriving today come first, VIP arrivals ahead of the rest, then the
+    longest-waiting room. Each floor is a binary heap; removed or re-ranked
+    entries are invalidated in place and skipped when popped, so push,
+    remove and pop are all O(log n).
+
+    The queue lives in process memory. It is loaded from the database on
+    first use (and again after midnight, when arrival priorities change) and
+    kept current by the signals in ``hotels.signals``.
+
+    Claims are stored on the room with a conditional UPDATE, so two
+    processes never hand out the same room. A claimed room is held back
+    from this process's heap until its claim expires after
+    ``CLAIM_TIMEOUT``; if it is still waiting to be cleaned by then, it is
+    queued again.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._floors = {}
+            self._entries = {}
+            self._held = {}
+            self._counter = itertools.count()
+            self._loaded_for = None
+
+    @property
+    def is_loaded(self):
+        return self._loaded_for == timezone.now().date()
+
+    def _ensure_loaded(self):
+        if self.is_loaded:
+            return
+        self.reset()
+        rooms = list(
+            Room.objects.filter(status='cleaning', is_active=True)
+            .values_list('id', 'floor', 'updated_at', 'cleaning_claimed_at')
+        )
+        arrivals = self._arrivals([room_id for room_id, _, _, _ in rooms])
+        expired = timezone.now() - CLAIM_TIMEOUT
+        for room_id, floor, queued_at, claimed_at in rooms:
+            self._push(room_id, floor, queued_at, arrivals.get(room_id))
+            if claimed_at is not None and claimed_at > expired:
+                # Claimed by an attendant through another process
+                entry = self._entries.pop(room_id)
+                self._held[room_id] = (list(entry), claimed_at)
+                entry[2] = None
+        self._loaded_for = timezone.now().date()
+
+    def _arrivals(self, room_ids):
+        """Map room id -> is_vip for rooms with a guest arriving today"""
+        if not room_ids:
+            return {}
+        arrivals = {}
+        rows = RoomBooking.objects.filter(
+            room_id__in=room_ids,
+            check_in_date=timezone.now().date(),
+            status__in=['pending', 'confirmed']
+        ).values_list('room_id', 'customer__is_vip')
+        for room_id, is_vip in rows:
+            arrivals[room_id] = arrivals.get(room_id, False) or is_vip
+        return arrivals
+
+    def _push(self, room_id, floor, queued_at, vip_arrival):
+        self._remove(room_id)
+        arrival = vip_arrival is not None
+        key = (not arrival, not vip_arrival, queued_at.timestamp())
+        entry = [key, next(self._counter), room_id, floor, arrival, bool(vip_arrival), queued_at]
+        self._entries[room_id] = entry
+        heapq.heappush(self._floors.setdefault(floor, []), entry)
+        self._held.pop(room_id, None)
+
+    def _remove(self, room_id):
+        entry = self._entries.pop(room_id, None)
+        if entry is not None:
+            entry[2] = None
+
+    def sync_rooms(self, room_ids):
+        """Re-read the given rooms and queue, re-rank or drop them"""
+        with self._lock:
+            if not self.is_loaded:
+                return
+            rooms = list(
+                Room.objects.filter(id__in=room_ids)
+                .values_list('id', 'floor', 'status', 'is_active', 'updated_at')
+            )
+            dirty = [room_id for room_id, _, room_status, is_active, _ in rooms
+                     if room_status == 'cleaning' and is_active]
+            arrivals = self._arrivals(dirty)
+            for room_id, floor, room_status, is_active, updated_at in rooms:
+                if room_status == 'cleaning' and is_active:
+                    if room_id in self._held:
+                        continue
+                    entry = self._entries.get(room_id)
+                    queued_at = entry[6] if entry else updated_at
+                    self._push(room_id, floor, queued_at, arrivals.get(room_id))
+                else:
+                    self._remove(room_id)
+                    self._held.pop(room_id, None)
+
+    def next_task(self, floor=None, user=None):
+        """
+        Claim the highest priority room for ``user``, optionally on one floor.
+
+        Returns ``(room_id, arrival_today, vip_arrival)`` or ``None``.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._release_expired()
+            while True:
+                entry = self._pop(floor)
+                if entry is None:
+                    return None
+                _, _, room_id, _, arrival, vip_arrival, _ = entry
+                if self._claim(entry, user):
+                    return room_id, arrival, vip_arrival
+
+    def _pop(self, floor):
+        floors = [floor] if floor is not None else list(self._floors)
+        best = None
+        for candidate in floors:
+            heap = self._floors.get(candidate)
+            while heap and heap[0][2] is None:
+                heapq.heappop(heap)
+            if heap and (best is None or heap[0] < self._floors[best][0]):
+                best = candidate
+        if best is None:
+            return None
+        entry = heapq.heappop(self._floors[best])
+        del self._entries[entry[2]]
+        return entry
+
+    def _claim(self, entry, user):
+        """Claim the room in the database; hold or drop the entry if someone else has it"""
+        room_id = entry[2]
+        now = timezone.now()
+        claimed = Room.objects.filter(
+            Q(cleaning_claimed_at__isnull=True) | Q(cleaning_claimed_at__lte=now - CLAIM_TIMEOUT),
+            id=room_id, status='cleaning', is_active=True
+        ).update(cleaning_claimed_by=user, cleaning_claimed_at=now)
+        if claimed:
+            self._held[room_id] = (entry, now)
+            return True
+
+        # Claimed in another process, or cleaned since it was queued
+        claimed_at = Room.objects.filter(
+            id=room_id, status='cleaning', is_active=True
+        ).values_list('cleaning_claimed_at', flat=True).first()
+        if claimed_at is not None:
+            self._held[room_id] = (entry, claimed_at)
+        return False
+
+    def _release_expired(self):
+        expired = timezone.now() - CLAIM_TIMEOUT
+        for room_id, (entry, claimed_at) in list(self._held.items()):
+            if claimed_at <= expired:
+                _, _, _, floor, arrival, vip_arrival, queued_at = entry
+                self._push(room_id, floor, queued_at, vip_arrival if arrival else None)
+
+    def snapshot(self, floor=None):
+        """Queued rooms in priority order (for display, not the hot path)"""
+        with self._lock:
+            self._ensure_loaded()
+            entries = [
+                entry for entry in self._entries.values()
+                if floor is None or entry[3] == floor
+            ]
+            return [
+                {
+                    'room_id': room_id,
+                    'floor': entry_floor,
+                    'arrival_today': arrival,
+                    'vip_arrival': vip_arrival,
+                }
+                for _, _, room_id, entry_floor, arrival, vip_arrival, _ in sorted(entries)
+            ]
+
+
+queue = HousekeepingQueue()
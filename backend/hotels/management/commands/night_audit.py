@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hotels.services import run_night_audit
+
+
+class Command(BaseCommand):
+    help = 'Run the night audit: check out overdue departures and mark no-shows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Business date to close (YYYY-MM-DD). Defaults to today.'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing anything'
+        )
+
+    def handle(self, *args, **options):
+        business_date = None
+        if options['date']:
+            try:
+                business_date = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('Invalid date format, expected YYYY-MM-DD')
+
+        summary = run_night_audit(business_date, dry_run=options['dry_run'])
+        prefix = '[dry run] ' if options['dry_run'] else ''
+
+        self.stdout.write(f"{prefix}Night audit for {summary['business_date']}")
+        self.stdout.write(f"{prefix}Checked out: {len(summary['checked_out'])}")
+        self.stdout.write(f"{prefix}No-shows: {len(summary['no_shows'])}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Arrivals expected tomorrow: {summary['arrivals_tomorrow']}")
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.2 on 2026-10-19 01:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='roommaintenance',
+            index=models.Index(fields=['status', 'scheduled_date'], name='hotels_room_status_54372f_idx'),
+        ),
+    ]
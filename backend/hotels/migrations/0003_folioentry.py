@@ -0,0 +1,36 @@
+# Generated by Django 5.0.2 on 2026-10-19 01:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0002_maintenance_status_date_index'),
+        ('orders', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FolioEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('restaurant', 'Restaurant'), ('room_service', 'Room Service'), ('adjustment', 'Adjustment')], default='adjustment', max_length=20)),
+                ('description', models.CharField(max_length=255)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('posted_at', models.DateTimeField(auto_now_add=True)),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='folio_entries', to='hotels.roombooking')),
+                ('order', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='folio_entry', to='orders.order')),
+                ('posted_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='posted_folio_entries', to=settings.AUTH_USER_MODEL)),
+                ('service', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='folio_entry', to='hotels.roomservice')),
+            ],
+            options={
+                'verbose_name': 'Folio Entry',
+                'verbose_name_plural': 'Folio Entries',
+                'ordering': ['posted_at'],
+            },
+        ),
+    ]
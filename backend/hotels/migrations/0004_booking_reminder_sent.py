@@ -0,0 +1,25 @@
+# Generated by Django 5.0.2 on 2026-10-19 02:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0003_folioentry'),
+        ('reservations', '0003_reservation_reminder_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='roombooking',
+            name='reminder_sent',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='roombooking',
+            index=models.Index(fields=['check_in_date', 'reminder_sent'], name='hotels_room_check_i_eed24d_idx'),
+        ),
+    ]
@@ -56,6 +56,12 @@ class Room(models.Model):
     last_cleaned = models.DateTimeField(null=True, blank=True)
     last_maintenance = models.DateTimeField(null=True, blank=True)
     
+    # Attendant cleaning the room, claimed through the housekeeping queue
+    cleaning_claimed_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='claimed_rooms'
+    )
+    cleaning_claimed_at = models.DateTimeField(null=True, blank=True)
+    
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -123,6 +129,7 @@ class RoomBooking(models.Model):
     # Status and Source
     status = models.CharField(max_length=20, choices=BOOKING_STATUS_CHOICES, default='pending')
     source = models.CharField(max_length=20, choices=BOOKING_SOURCE_CHOICES, default='walk_in')
+    reminder_sent = models.BooleanField(default=False)
     
     # Special Requests
     special_requests = models.TextField(blank=True)
@@ -141,6 +148,9 @@ class RoomBooking(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['check_in_date', 'reminder_sent']),
+        ]
     
     def __str__(self):
         return f"{self.booking_number} - {self.customer.full_name}"
@@ -148,7 +158,7 @@ class RoomBooking(models.Model):
     def save(self, *args, **kwargs):
         if not self.booking_number:
             # Generate booking number: HTL-YYYYMMDD-XXXXX
-            from django.utils.text import get_random_string
+            from django.utils.crypto import get_random_string
             date_part = timezone.now().strftime('%Y%m%d')
             random_part = get_random_string(5, '0123456789')
             self.booking_number = f'HTL-{date_part}-{random_part}'
@@ -258,6 +268,37 @@ class RoomMaintenance(models.Model):
     
     class Meta:
         ordering = ['-priority', 'scheduled_date']
+        indexes = [
+            models.Index(fields=['status', 'scheduled_date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.maintenance_type} - Room {self.room.number}"
+
+
+class FolioEntry(models.Model):
+    SOURCE_CHOICES = [
+        ('restaurant', 'Restaurant'),
+        ('room_service', 'Room Service'),
+        ('adjustment', 'Adjustment'),
+    ]
+    
+    booking = models.ForeignKey(RoomBooking, on_delete=models.CASCADE, related_name='folio_entries')
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='adjustment')
+    description = models.CharField(max_length=255)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    
+    # Where the charge came from; each order or service can be posted only once
+    order = models.OneToOneField('orders.Order', on_delete=models.SET_NULL, null=True, blank=True, related_name='folio_entry')
+    service = models.OneToOneField(RoomService, on_delete=models.SET_NULL, null=True, blank=True, related_name='folio_entry')
+    
+    posted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='posted_folio_entries')
+    posted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['posted_at']
+        verbose_name = 'Folio Entry'
+        verbose_name_plural = 'Folio Entries'
     
     def __str__(self):
-        return f"{self.maintenance_type} - Room {self.room.number}"
\ No newline at end of file
+        return f"{self.booking.booking_number} - {self.description} ({self.amount})"
\ No newline at end of file
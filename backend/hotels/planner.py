@@ -0,0 +1,113 @@
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from .models import RoomBooking, RoomMaintenance
+
+BLOCKING_BOOKING_STATUSES = ['pending', 'confirmed', 'checked_in']
+OPEN_MAINTENANCE_STATUSES = ['scheduled', 'in_progress']
+
+
+def _occupied_nights(room_ids, start_date, end_date):
+    """Merged, sorted (check_in, check_out) intervals per room from one query"""
+    rows = RoomBooking.objects.filter(
+        room_id__in=room_ids,
+        status__in=BLOCKING_BOOKING_STATUSES,
+        check_in_date__lte=end_date,
+        check_out_date__gt=start_date
+    ).order_by('room_id', 'check_in_date').values_list('room_id', 'check_in_date', 'check_out_date')
+
+    intervals = defaultdict(list)
+    for room_id, check_in, check_out in rows:
+        merged = intervals[room_id]
+        if merged and check_in <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], check_out))
+        else:
+            merged.append((check_in, check_out))
+    return intervals
+
+
+def _is_booked(intervals, starts, day):
+    # The room is busy on ``day`` if a stay covers that night
+    index = bisect_right(starts, day) - 1
+    return index >= 0 and day < intervals[index][1]
+
+
+def _candidate_days(desired, flex_days):
+    yield desired
+    for shift in range(1, flex_days + 1):
+        yield desired + timedelta(days=shift)
+        yield desired - timedelta(days=shift)
+
+
+def plan_preventive_maintenance(rooms, start_date, end_date, interval_days, flex_days=3,
+                                max_per_day=None, **job_fields):
+    """
+    Plan recurring preventive jobs for ``rooms`` between two dates.
+
+    Each room gets a job every ``interval_days``; rooms are staggered across
+    the interval so the whole property is not taken out on one day. A job
+    that lands on a booked night, an existing open job or a full day
+    (``max_per_day``) is moved to the nearest free day within ``flex_days``.
+
+    Bookings and existing jobs are read with one query each and every room
+    is placed in a single pass, so a quarter for a whole property is one
+    call. Returns ``(jobs, unscheduled)``: unsaved ``RoomMaintenance``
+    objects and ``(room, desired_date)`` pairs that found no free day.
+    """
+    rooms = list(rooms)
+    room_ids = [room.id for room in rooms]
+    window_start = start_date - timedelta(days=flex_days)
+    window_end = end_date + timedelta(days=flex_days)
+
+    occupied = _occupied_nights(room_ids, window_start, window_end)
+    room_id_set = set(room_ids)
+    existing = set()
+    per_day = Counter()
+    for room_id, day in RoomMaintenance.objects.filter(
+        status__in=OPEN_MAINTENANCE_STATUSES,
+        scheduled_date__range=(window_start, window_end)
+    ).values_list('room_id', 'scheduled_date'):
+        per_day[day] += 1
+        if room_id in room_id_set:
+            existing.add((room_id, day))
+
+    jobs = []
+    unscheduled = []
+    for position, room in enumerate(rooms):
+        intervals = occupied.get(room.id, [])
+        starts = [check_in for check_in, _ in intervals]
+        desired = start_date + timedelta(days=position * interval_days // max(len(rooms), 1))
+
+        while desired <= end_date:
+            for day in _candidate_days(desired, flex_days):
+                if not start_date <= day <= end_date:
+                    continue
+                if (room.id, day) in existing or _is_booked(intervals, starts, day):
+                    continue
+                if max_per_day and per_day[day] >= max_per_day:
+                    continue
+                existing.add((room.id, day))
+                per_day[day] += 1
+                jobs.append(RoomMaintenance(
+                    room=room,
+                    maintenance_type='preventive',
+                    scheduled_date=day,
+                    **job_fields
+                ))
+                break
+            else:
+                unscheduled.append((room, desired))
+            desired += timedelta(days=interval_days)
+
+    return jobs, unscheduled
+
+
+def schedule_preventive_maintenance(rooms, start_date, end_date, interval_days, **options):
+    """Plan preventive jobs and insert them with ``bulk_create``"""
+    from .availability import invalidate
+
+    jobs, unscheduled = plan_preventive_maintenance(rooms, start_date, end_date, interval_days, **options)
+    RoomMaintenance.objects.bulk_create(jobs, batch_size=500)
+    invalidate()  # bulk_create skips post_save
+    return jobs, unscheduled
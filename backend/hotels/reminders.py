@@ -0,0 +1,27 @@
+from django.core.mail import EmailMessage
+
+from reservations.reminders import send_in_chunks
+from .models import RoomBooking
+
+ARRIVAL_SUBJECT = 'We look forward to welcoming you to Maria Havens'
+ARRIVAL_BODY = (
+    'Dear {customer__first_name} {customer__last_name},\n\n'
+    'Your {room__room_type__name} room is booked from {check_in_date:%A %d %B} '
+    'to {check_out_date:%A %d %B} (booking {booking_number}).\n'
+    'Check-in opens at 14:00. Reply to this email if you need an airport pickup or an early arrival.\n\n'
+    'Maria Havens'
+)
+
+
+def render_arrival_reminder(row):
+    return EmailMessage(ARRIVAL_SUBJECT, ARRIVAL_BODY.format(**row), to=[row['customer__email']])
+
+
+def send_arrival_reminders(day, **options):
+    """Remind confirmed guests arriving on ``day`` who have not been reminded yet"""
+    due = RoomBooking.objects.filter(check_in_date=day, reminder_sent=False, status='confirmed')
+    fields = [
+        'booking_number', 'check_in_date', 'check_out_date', 'room__room_type__name',
+        'customer__first_name', 'customer__last_name', 'customer__email'
+    ]
+    return send_in_chunks(due, fields, render_arrival_reminder, **options)
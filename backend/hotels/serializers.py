@@ -1,13 +1,43 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import RoomType, Room, RoomBooking, RoomService, RoomMaintenance
-from reservations.serializers import CustomerSerializer
+from django.db.models import Count, Prefetch, Q
+from django.utils import timezone
+from decimal import Decimal
+from .models import RoomType, Room, RoomBooking, RoomService, RoomMaintenance, FolioEntry
+from maria_havens_pos.values_serializers import ValuesSerializer
+from reservations.serializers import CustomerSerializer, full_name
 
 User = get_user_model()
 
 
+def room_type_queryset():
+    """Room types annotated with the counts ``RoomTypeSerializer`` shows"""
+    return RoomType.objects.annotate(
+        room_count=Count('rooms', distinct=True),
+        available_room_count=Count(
+            'rooms', filter=Q(rooms__status='available', rooms__is_active=True), distinct=True
+        ),
+    )
+
+
+def room_prefetches(prefix=''):
+    """
+    ``prefetch_related`` lookups that let ``RoomSerializer`` render the rooms
+    reached through ``prefix`` (e.g. ``'room__'``) without a query per room:
+    the annotated room type and only today's booking rather than all of them.
+    """
+    today = timezone.now().date()
+    current = RoomBooking.objects.filter(
+        status__in=['confirmed', 'checked_in'], check_in_date__lte=today, check_out_date__gte=today
+    ).select_related('customer')
+    return [
+        Prefetch(prefix + 'room_type', queryset=room_type_queryset()),
+        Prefetch(prefix + 'bookings', queryset=current, to_attr='current_bookings'),
+    ]
+
+
 class RoomTypeSerializer(serializers.ModelSerializer):
-    room_count = serializers.IntegerField(source='rooms.count', read_only=True)
+    room_count = serializers.SerializerMethodField()
     available_rooms = serializers.SerializerMethodField()
     
     class Meta:
@@ -20,8 +50,15 @@ class RoomTypeSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at']
     
+    def get_room_count(self, obj):
+        count = getattr(obj, 'room_count', None)  # annotated by room_type_queryset()
+        return obj.rooms.count() if count is None else count
+    
     def get_available_rooms(self, obj):
-        return obj.rooms.filter(status='available', is_active=True).count()
+        count = getattr(obj, 'available_room_count', None)
+        if count is None:
+            count = obj.rooms.filter(status='available', is_active=True).count()
+        return count
 
 
 class RoomSerializer(serializers.ModelSerializer):
@@ -41,7 +78,10 @@ class RoomSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
     
     def get_current_booking(self, obj):
-        current = obj.current_booking
+        if hasattr(obj, 'current_bookings'):  # prefetched by room_prefetches()
+            current = obj.current_bookings[0] if obj.current_bookings else None
+        else:
+            current = obj.current_booking
         if current:
             return {
                 'id': current.id,
@@ -69,6 +109,19 @@ class RoomServiceSerializer(serializers.ModelSerializer):
         read_only_fields = ['requested_by', 'created_at', 'completed_at']
 
 
+class FolioEntrySerializer(serializers.ModelSerializer):
+    posted_by = serializers.StringRelatedField(read_only=True)
+    order_number = serializers.CharField(source='order.order_number', read_only=True)
+    
+    class Meta:
+        model = FolioEntry
+        fields = [
+            'id', 'source', 'description', 'amount', 'order', 'order_number',
+            'service', 'posted_by', 'posted_at'
+        ]
+        read_only_fields = fields
+
+
 class RoomMaintenanceSerializer(serializers.ModelSerializer):
     room = RoomSerializer(read_only=True)
     room_id = serializers.IntegerField(write_only=True)
@@ -86,6 +139,36 @@ class RoomMaintenanceSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_by', 'created_at', 'started_at', 'completed_at']
 
 
+class FolioChargeSerializer(serializers.Serializer):
+    """Input for posting a manual charge to a folio"""
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    description = serializers.CharField(max_length=255)
+
+
+class PreventiveMaintenancePlanSerializer(serializers.Serializer):
+    """Input for planning a batch of recurring preventive maintenance jobs"""
+    room_type_id = serializers.IntegerField(required=False)
+    room_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    interval_days = serializers.IntegerField(min_value=1)
+    flex_days = serializers.IntegerField(min_value=0, default=3)
+    max_per_day = serializers.IntegerField(min_value=1, required=False)
+    title = serializers.CharField(max_length=200)
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+    estimated_duration = serializers.IntegerField(min_value=1, default=2)
+    estimated_cost = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    priority = serializers.IntegerField(min_value=1, max_value=5, default=1)
+    dry_run = serializers.BooleanField(default=False)
+    
+    def validate(self, attrs):
+        if attrs['end_date'] < attrs['start_date']:
+            raise serializers.ValidationError('end_date must not be before start_date.')
+        if not attrs.get('room_type_id') and not attrs.get('room_ids'):
+            raise serializers.ValidationError('Provide room_type_id or room_ids.')
+        return attrs
+
+
 class RoomBookingSerializer(serializers.ModelSerializer):
     customer = CustomerSerializer(read_only=True)
     customer_id = serializers.IntegerField(write_only=True)
@@ -103,15 +186,15 @@ class RoomBookingSerializer(serializers.ModelSerializer):
             'id', 'booking_number', 'customer', 'customer_id', 'room', 'room_id',
             'check_in_date', 'check_out_date', 'nights', 'adults', 'children',
             'room_rate', 'total_room_charges', 'tax_amount', 'additional_charges',
-            'discount_amount', 'total_amount', 'status', 'source',
+            'discount_amount', 'total_amount', 'status', 'source', 'reminder_sent',
             'special_requests', 'arrival_time', 'created_by', 'checked_in_by',
             'checked_out_by', 'services', 'is_current', 'created_at',
             'updated_at', 'checked_in_at', 'checked_out_at'
         ]
         read_only_fields = [
-            'booking_number', 'nights', 'total_room_charges', 'total_amount',
-            'created_by', 'checked_in_by', 'checked_out_by', 'created_at',
-            'updated_at', 'checked_in_at', 'checked_out_at'
+            'booking_number', 'nights', 'total_room_charges', 'additional_charges',
+            'total_amount', 'reminder_sent', 'created_by', 'checked_in_by', 'checked_out_by',
+            'created_at', 'updated_at', 'checked_in_at', 'checked_out_at'
         ]
     
     def create(self, validated_data):
@@ -136,4 +219,10 @@ class RoomBookingSummarySerializer(serializers.ModelSerializer):
             'id', 'booking_number', 'customer_name', 'room_number',
             'check_in_date', 'check_out_date', 'nights', 'status',
             'total_amount', 'created_at'
-        ]
\ No newline at end of file
+        ]
+
+
+class RoomBookingSummaryValuesSerializer(ValuesSerializer):
+    """``RoomBookingSummarySerializer`` output built from ``values()`` rows"""
+    serializer_class = RoomBookingSummarySerializer
+    computed = {'customer_name': (('customer__first_name', 'customer__last_name'), full_name)}
\ No newline at end of file
@@ -0,0 +1,161 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.utils import timezone
+from datetime import timedelta
+
+from maria_havens_pos.caching import invalidate_namespace
+from . import availability
+from .housekeeping import queue as housekeeping_queue
+from .models import Room, RoomBooking
+from reservations.models import Customer
+
+
+def _per_customer(booking_ids, aggregate):
+    """Correlated subquery yielding ``aggregate`` over ``booking_ids`` for each customer"""
+    return Subquery(
+        RoomBooking.objects.filter(id__in=booking_ids, customer=OuterRef('pk'))
+        .order_by()
+        .values('customer')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+
+
+def _lock_bookings(booking_ids, status):
+    return list(
+        RoomBooking.objects.select_for_update()
+        .filter(id__in=booking_ids, status=status)
+        .values_list('id', 'room_id')
+    )
+
+
+def _sync_housekeeping(room_ids):
+    # Bulk UPDATEs bypass post_save, so tell the housekeeping queue and the
+    # availability grid directly
+    if housekeeping_queue.is_loaded:
+        transaction.on_commit(lambda: housekeeping_queue.sync_rooms(room_ids))
+    availability.invalidate()
+    transaction.on_commit(availability.invalidate)
+    invalidate_namespace('room_types')
+    transaction.on_commit(lambda: invalidate_namespace('room_types'))
+
+
+def check_in_bookings(booking_ids, user=None):
+    """
+    Check in every confirmed booking in ``booking_ids``.
+
+    Bookings, rooms and customer stats are each written with a single UPDATE,
+    so a tour group costs the same number of queries as a single guest.
+    Returns the ids that were actually checked in.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = _lock_bookings(booking_ids, 'confirmed')
+        if not rows:
+            return []
+        ids = [booking_id for booking_id, _ in rows]
+        room_ids = {room_id for _, room_id in rows}
+
+        RoomBooking.objects.filter(id__in=ids).update(
+            status='checked_in', checked_in_at=now, checked_in_by=user, updated_at=now
+        )
+        # An occupied room is no longer being cleaned, so drop any housekeeping claim
+        Room.objects.filter(id__in=room_ids).update(
+            status='occupied', updated_at=now, cleaning_claimed_by=None, cleaning_claimed_at=None
+        )
+        _sync_housekeeping(room_ids)
+        Customer.objects.filter(hotel_bookings__id__in=ids).update(
+            total_visits=F('total_visits') + _per_customer(ids, Count('id')),
+            last_visit=now,
+            updated_at=now,
+        )
+    return ids
+
+
+def check_out_bookings(booking_ids, user=None):
+    """
+    Check out every checked-in booking in ``booking_ids``.
+
+    Rooms are released to housekeeping ('cleaning') and each customer's
+    ``total_spent`` is incremented in the database rather than in Python.
+    Returns the ids that were actually checked out.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = _lock_bookings(booking_ids, 'checked_in')
+        if not rows:
+            return []
+        ids = [booking_id for booking_id, _ in rows]
+        room_ids = {room_id for _, room_id in rows}
+
+        RoomBooking.objects.filter(id__in=ids).update(
+            status='checked_out', checked_out_at=now, checked_out_by=user, updated_at=now
+        )
+        # Each cleaning starts unclaimed
+        Room.objects.filter(id__in=room_ids).update(
+            status='cleaning', updated_at=now, cleaning_claimed_by=None, cleaning_claimed_at=None
+        )
+        _sync_housekeeping(room_ids)
+        Customer.objects.filter(hotel_bookings__id__in=ids).update(
+            total_spent=F('total_spent') + _per_customer(ids, Sum('total_amount')),
+            updated_at=now,
+        )
+    return ids
+
+
+def mark_no_shows(booking_ids):
+    """
+    Mark confirmed bookings in ``booking_ids`` as no-shows.
+
+    Their rooms go back to 'available' unless another guest is checked in.
+    Returns the ids that were marked.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = _lock_bookings(booking_ids, 'confirmed')
+        if not rows:
+            return []
+        ids = [booking_id for booking_id, _ in rows]
+        room_ids = {room_id for _, room_id in rows}
+
+        RoomBooking.objects.filter(id__in=ids).update(status='no_show', updated_at=now)
+        Room.objects.filter(id__in=room_ids, status='occupied').exclude(
+            bookings__status='checked_in'
+        ).update(status='available', updated_at=now)
+        _sync_housekeeping(room_ids)
+    return ids
+
+
+def run_night_audit(business_date=None, dry_run=False):
+    """
+    Close out ``business_date`` (defaults to today).
+
+    - guests still checked in past their check-out date are checked out
+    - confirmed arrivals that never checked in become no-shows
+
+    Everything happens inside one transaction. Returns a summary dict.
+    """
+    business_date = business_date or timezone.now().date()
+
+    with transaction.atomic():
+        departures = list(RoomBooking.objects.filter(
+            status='checked_in', check_out_date__lte=business_date
+        ).values_list('id', flat=True))
+        no_shows = list(RoomBooking.objects.filter(
+            status='confirmed', check_in_date__lte=business_date
+        ).values_list('id', flat=True))
+
+        if not dry_run:
+            departures = check_out_bookings(departures)
+            no_shows = mark_no_shows(no_shows)
+
+        arrivals_tomorrow = RoomBooking.objects.filter(
+            status='confirmed', check_in_date=business_date + timedelta(days=1)
+        ).count()
+
+    return {
+        'business_date': business_date,
+        'checked_out': departures,
+        'no_shows': no_shows,
+        'arrivals_tomorrow': arrivals_tomorrow,
+    }
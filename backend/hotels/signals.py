@@ -0,0 +1,45 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from maria_havens_pos.caching import invalidate_on
+from . import availability
+from .housekeeping import queue
+from .models import Room, RoomBooking, RoomMaintenance, RoomType
+
+
+@receiver(pre_save, sender=Room)
+def release_housekeeping_claim(sender, instance, **kwargs):
+    # A claim only lasts while the room is waiting to be cleaned
+    if instance.status != 'cleaning':
+        instance.cleaning_claimed_by = None
+        instance.cleaning_claimed_at = None
+
+
+@receiver(post_save, sender=Room)
+def sync_housekeeping_room(sender, instance, **kwargs):
+    if queue.is_loaded:
+        transaction.on_commit(lambda: queue.sync_rooms([instance.id]))
+
+
+@receiver(post_save, sender=RoomBooking)
+def sync_housekeeping_arrival(sender, instance, **kwargs):
+    # A new or changed arrival can re-rank the booked room
+    if queue.is_loaded:
+        transaction.on_commit(lambda: queue.sync_rooms([instance.room_id]))
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+@receiver(post_save, sender=RoomBooking)
+@receiver(post_delete, sender=RoomBooking)
+@receiver(post_save, sender=RoomMaintenance)
+@receiver(post_delete, sender=RoomMaintenance)
+@receiver(post_save, sender=RoomType)
+@receiver(post_delete, sender=RoomType)
+def invalidate_availability(sender, **kwargs):
+    availability.invalidate()
+
+
+# Room counts on cached room types change with the rooms themselves
+invalidate_on('room_types', RoomType, Room)
@@ -0,0 +1,141 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from maria_havens_pos.testing import QueryScalingMixin
+from reservations.models import Customer
+from .models import FolioEntry, Room, RoomBooking, RoomMaintenance, RoomService, RoomType
+
+User = get_user_model()
+
+
+class HotelQueryCountTestCase(QueryScalingMixin, TestCase):
+    """Hotel endpoints run the same number of queries for N and 10N rows"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='testpass123', role='manager'
+        )
+        self.client = self.api_client(self.manager)
+        self.today = timezone.now().date()
+        self.seeded = 0
+        self.customer = Customer.objects.create(
+            first_name='Amina', last_name='Otieno', email='amina@example.com', phone='0712345678'
+        )
+        self.room_type = RoomType.objects.create(name='Deluxe', base_price=Decimal('9500.00'), max_occupancy=2)
+        self.room = Room.objects.create(number='100', room_type=self.room_type, floor=1)
+        self.booking = self.book(self.room, status='checked_in')
+
+    def next_number(self):
+        self.seeded += 1
+        return self.seeded
+
+    def book(self, room, status='confirmed', check_in=None):
+        check_in = check_in or self.today
+        return RoomBooking.objects.create(
+            booking_number=f'BK{self.next_number():06d}',
+            customer=self.customer, room=room, check_in_date=check_in, check_out_date=check_in + timedelta(days=2),
+            nights=2, adults=1, room_rate=Decimal('9500.00'), total_room_charges=Decimal('19000.00'),
+            total_amount=Decimal('19000.00'), status=status, created_by=self.manager
+        )
+
+    def seed_room_types(self, count):
+        for _ in range(count):
+            room_type = RoomType.objects.create(
+                name=f'Type {self.next_number()}', base_price=Decimal('5000.00'), max_occupancy=2
+            )
+            Room.objects.create(number=f'T{self.seeded}', room_type=room_type, floor=2)
+
+    def seed_rooms(self, count):
+        """Rooms with a current guest, each of a room type with its own counts"""
+        for _ in range(count):
+            number = self.next_number()
+            room_type = RoomType.objects.create(name=f'Type {number}', base_price=Decimal('5000.00'), max_occupancy=2)
+            room = Room.objects.create(number=f'R{number}', room_type=room_type, floor=2)
+            self.book(room)
+
+    def seed_bookings(self, count):
+        for _ in range(count):
+            room = Room.objects.create(number=f'B{self.next_number()}', room_type=self.room_type, floor=3)
+            booking = self.book(room)
+            RoomService.objects.create(
+                booking=booking, service_type='room_service', description='Tea', assigned_to=self.manager
+            )
+
+    def seed_services(self, count):
+        for _ in range(count):
+            RoomService.objects.create(
+                booking=self.booking, service_type='room_service', description='Tea',
+                requested_by=self.manager, assigned_to=self.manager
+            )
+
+    def seed_maintenance(self, count):
+        for _ in range(count):
+            room = Room.objects.create(number=f'M{self.next_number()}', room_type=self.room_type, floor=4)
+            RoomMaintenance.objects.create(
+                room=room, maintenance_type='repair', title='Fix tap', description='Leaking',
+                scheduled_date=self.today - timedelta(days=1), estimated_duration=2,
+                assigned_to=self.manager, created_by=self.manager
+            )
+
+    def test_room_type_list(self):
+        """Test listing room types with their room counts"""
+        self.assertQueriesDoNotScale(self.client, '/api/hotels/room-types/', self.seed_room_types)
+
+    def test_available_room_types(self):
+        """Test the available room types action"""
+        self.assertQueriesDoNotScale(self.client, '/api/hotels/room-types/available/', self.seed_room_types)
+
+    def test_availability_grid(self):
+        """Test the room type availability grid"""
+        self.assertQueriesDoNotScale(self.client, '/api/hotels/room-types/availability_grid/', self.seed_rooms)
+
+    def test_room_list(self):
+        """Test listing rooms with their type and current booking"""
+        self.assertQueriesDoNotScale(self.client, '/api/hotels/rooms/', self.seed_rooms)
+
+    def test_available_rooms(self):
+        """Test the available rooms action"""
+        self.assertQueriesDoNotScale(self.client, '/api/hotels/rooms/available/', self.seed_rooms)
+
+    def test_occupancy_report(self):
+        """Test the occupancy report"""
+        self.assertQueriesDoNotScale(self.client, '/api/hotels/rooms/occupancy_report/', self.seed_rooms)
+
+    def test_booking_list(self):
+        """Test listing bookings"""
+        self.assertQueriesDoNotScale(self.client, '/api/hotels/bookings/', self.seed_bookings)
+
+    def test_booking_retrieve(self):
+        """Test retrieving a booking with many services"""
+        self.assertQueriesDoNotScale(self.client, f'/api/hotels/bookings/{self.booking.id}/', self.seed_services)
+
+    def test_arrivals_today(self):
+        """Test today's arrivals"""
+        self.assertQueriesDoNotScale(self.client, '/api/hotels/bookings/arrivals_today/', self.seed_bookings)
+
+    def test_folio(self):
+        """Test a folio with many entries"""
+        def seed(count):
+            for _ in range(count):
+                FolioEntry.objects.create(
+                    booking=self.booking, description='Minibar', amount=Decimal('300.00'), posted_by=self.manager
+                )
+
+        self.assertQueriesDoNotScale(self.client, f'/api/hotels/bookings/{self.booking.id}/folio/', seed)
+
+    def test_service_list(self):
+        """Test listing room service requests"""
+        self.assertQueriesDoNotScale(self.client, '/api/hotels/services/', self.seed_services)
+
+    def test_maintenance_list(self):
+        """Test listing maintenance jobs with their rooms"""
+        self.assertQueriesDoNotScale(self.client, '/api/hotels/maintenance/', self.seed_maintenance)
+
+    def test_overdue_maintenance(self):
+        """Test the overdue maintenance action"""
+        self.assertQueriesDoNotScale(self.client, '/api/hotels/maintenance/overdue/', self.seed_maintenance)
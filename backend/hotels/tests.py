@@ -0,0 +1,473 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from reservations.models import Customer
+from orders.models import Order, Payment
+from .models import FolioEntry, RoomType, Room, RoomBooking, RoomMaintenance, RoomService
+from . import housekeeping
+from .housekeeping import queue as housekeeping_queue
+
+User = get_user_model()
+
+
+class HotelTestMixin:
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='frontdesk',
+            email='frontdesk@example.com',
+            password='testpass123',
+            role='manager'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.room_type = RoomType.objects.create(
+            name='Standard',
+            base_price=Decimal('5000.00'),
+            max_occupancy=2
+        )
+        self.customer = Customer.objects.create(
+            first_name='Tour',
+            last_name='Leader',
+            email='tour@example.com',
+            phone='0712345678'
+        )
+        self.today = timezone.now().date()
+
+    def create_booking(self, number, status='confirmed', check_in=None, check_out=None, customer=None):
+        room = Room.objects.create(number=number, room_type=self.room_type, floor=1)
+        check_in = check_in or self.today
+        return RoomBooking.objects.create(
+            customer=customer or self.customer,
+            room=room,
+            check_in_date=check_in,
+            check_out_date=check_out or check_in + timedelta(days=2),
+            adults=2,
+            room_rate=Decimal('5000.00'),
+            total_room_charges=Decimal('0.00'),
+            total_amount=Decimal('0.00'),
+            status=status
+        )
+
+
+class BulkCheckInOutTestCase(HotelTestMixin, TestCase):
+    def test_bulk_check_in_group(self):
+        """Test checking in a group updates bookings, rooms and customer stats"""
+        bookings = [self.create_booking(str(100 + i)) for i in range(5)]
+        pending = self.create_booking('200', status='pending')
+
+        response = self.client.post(
+            '/api/hotels/bookings/bulk_check_in/',
+            {'booking_ids': [b.id for b in bookings] + [pending.id]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(response.data['checked_in']), sorted(b.id for b in bookings))
+        self.assertEqual(response.data['skipped'], [pending.id])
+
+        self.assertEqual(RoomBooking.objects.filter(status='checked_in').count(), 5)
+        self.assertEqual(Room.objects.filter(status='occupied').count(), 5)
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.total_visits, 5)
+        self.assertIsNotNone(self.customer.last_visit)
+
+    def test_bulk_check_out_adds_spend(self):
+        """Test checking out a group adds every booking total to the customer"""
+        bookings = [self.create_booking(str(100 + i), status='checked_in') for i in range(3)]
+
+        response = self.client.post(
+            '/api/hotels/bookings/bulk_check_out/',
+            {'booking_ids': [b.id for b in bookings]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['checked_out']), 3)
+        self.assertEqual(Room.objects.filter(status='cleaning').count(), 3)
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.total_spent, Decimal('30000.00'))  # 3 x 2 nights x 5000
+
+    def test_bulk_check_in_requires_ids(self):
+        """Test bulk check-in rejects a missing id list"""
+        response = self.client.post('/api/hotels/bookings/bulk_check_in/', {}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_single_check_in_rejects_wrong_status(self):
+        """Test checking in a pending booking fails"""
+        booking = self.create_booking('300', status='pending')
+
+        response = self.client.post(f'/api/hotels/bookings/{booking.id}/check_in/')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class NightAuditTestCase(HotelTestMixin, TestCase):
+    def test_night_audit(self):
+        """Test the night audit checks out departures and marks no-shows"""
+        yesterday = self.today - timedelta(days=1)
+        departure = self.create_booking('101', status='checked_in', check_in=yesterday - timedelta(days=1), check_out=self.today)
+        no_show = self.create_booking('102', check_in=self.today)
+        future = self.create_booking('103', check_in=self.today + timedelta(days=1))
+        staying = self.create_booking('104', status='checked_in', check_in=yesterday)
+
+        out = StringIO()
+        call_command('night_audit', stdout=out)
+
+        departure.refresh_from_db()
+        no_show.refresh_from_db()
+        future.refresh_from_db()
+        staying.refresh_from_db()
+        self.assertEqual(departure.status, 'checked_out')
+        self.assertEqual(no_show.status, 'no_show')
+        self.assertEqual(future.status, 'confirmed')
+        self.assertEqual(staying.status, 'checked_in')
+        self.assertIn('Arrivals expected tomorrow: 1', out.getvalue())
+
+    def test_night_audit_dry_run(self):
+        """Test a dry run leaves bookings untouched"""
+        booking = self.create_booking('101', check_in=self.today)
+
+        call_command('night_audit', '--dry-run', stdout=StringIO())
+
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, 'confirmed')
+
+
+class HousekeepingQueueTestCase(HotelTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        housekeeping_queue.reset()
+        self.vip = Customer.objects.create(
+            first_name='Very',
+            last_name='Important',
+            email='vip@example.com',
+            phone='0700000000',
+            is_vip=True
+        )
+
+    def tearDown(self):
+        housekeeping_queue.reset()
+
+    def dirty_room(self, number, floor=1):
+        return Room.objects.create(number=number, room_type=self.room_type, floor=floor, status='cleaning')
+
+    def test_arrivals_and_vips_first(self):
+        """Test rooms with VIP arrivals are cleaned before other arrivals and plain rooms"""
+        plain = self.dirty_room('101')
+        arrival = self.dirty_room('102')
+        vip_arrival = self.dirty_room('103')
+        for room, customer in [(arrival, self.customer), (vip_arrival, self.vip)]:
+            RoomBooking.objects.create(
+                customer=customer, room=room, check_in_date=self.today,
+                check_out_date=self.today + timedelta(days=1), adults=1,
+                room_rate=Decimal('5000.00'), total_room_charges=Decimal('0.00'),
+                total_amount=Decimal('0.00'), status='confirmed'
+            )
+
+        handed_out = []
+        for _ in range(3):
+            response = self.client.post('/api/hotels/rooms/next_housekeeping_task/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            handed_out.append(response.data['room']['id'])
+
+        self.assertEqual(handed_out, [vip_arrival.id, arrival.id, plain.id])
+        response = self.client.post('/api/hotels/rooms/next_housekeeping_task/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_queue_follows_room_status(self):
+        """Test the queue picks up check-outs and drops rooms cleaned elsewhere"""
+        first = self.dirty_room('201', floor=2)
+        housekeeping_queue.snapshot()  # load the queue
+
+        booking = self.create_booking('202', status='checked_in')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/hotels/bookings/{booking.id}/check_out/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/hotels/rooms/{first.id}/mark_cleaned/')
+
+        queued = [entry['room_id'] for entry in housekeeping_queue.snapshot()]
+        self.assertEqual(queued, [booking.room_id])
+
+    def test_floor_filter(self):
+        """Test attendants can ask for work on their own floor"""
+        self.dirty_room('101', floor=1)
+        upstairs = self.dirty_room('301', floor=3)
+
+        response = self.client.post('/api/hotels/rooms/next_housekeeping_task/', {'floor': 3}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['room']['id'], upstairs.id)
+
+    def test_claim_is_shared_between_processes(self):
+        """Test a room claimed in another process is not handed out until the claim expires"""
+        room = self.dirty_room('101')
+        self.assertEqual(housekeeping_queue.next_task(user=self.user)[0], room.id)
+
+        # A second process has its own queue, loaded from the database
+        other_process = housekeeping.HousekeepingQueue()
+        self.assertIsNone(other_process.next_task(user=self.user))
+
+        Room.objects.filter(id=room.id).update(
+            cleaning_claimed_at=timezone.now() - housekeeping.CLAIM_TIMEOUT - timedelta(minutes=1)
+        )
+        other_process.reset()
+        self.assertEqual(other_process.next_task(user=self.user)[0], room.id)
+
+    def test_unfinished_claim_expires(self):
+        """Test a room that was claimed but never cleaned is handed out again"""
+        room = self.dirty_room('101')
+        self.client.post('/api/hotels/rooms/next_housekeeping_task/')
+        room.refresh_from_db()
+        self.assertEqual(room.cleaning_claimed_by, self.user)
+
+        response = self.client.post('/api/hotels/rooms/next_housekeeping_task/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        with mock.patch.object(housekeeping, 'CLAIM_TIMEOUT', timedelta(0)):
+            response = self.client.post('/api/hotels/rooms/next_housekeeping_task/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['room']['id'], room.id)
+
+    def test_cleaning_releases_claim(self):
+        """Test marking a room cleaned clears its claim"""
+        room = self.dirty_room('101')
+        self.client.post('/api/hotels/rooms/next_housekeeping_task/')
+
+        self.client.post(f'/api/hotels/rooms/{room.id}/mark_cleaned/')
+
+        room.refresh_from_db()
+        self.assertIsNone(room.cleaning_claimed_by)
+        self.assertIsNone(room.cleaning_claimed_at)
+
+
+class PreventiveMaintenancePlannerTestCase(HotelTestMixin, TestCase):
+    def plan(self, **overrides):
+        data = {
+            'room_type_id': self.room_type.id,
+            'start_date': str(self.today),
+            'end_date': str(self.today + timedelta(days=89)),
+            'interval_days': 30,
+            'title': 'Quarterly AC service',
+        }
+        data.update(overrides)
+        return self.client.post('/api/hotels/maintenance/plan_preventive/', data, format='json')
+
+    def test_plan_quarter_for_all_rooms(self):
+        """Test a quarter of monthly jobs is created for every room in one call"""
+        for number in range(101, 111):
+            Room.objects.create(number=str(number), room_type=self.room_type, floor=1)
+
+        response = self.plan()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 30)
+        self.assertEqual(RoomMaintenance.objects.filter(maintenance_type='preventive').count(), 30)
+        # Staggered: ten rooms do not all go out on the first day
+        self.assertEqual(RoomMaintenance.objects.filter(scheduled_date=self.today).count(), 1)
+
+    def test_jobs_avoid_booked_nights(self):
+        """Test a job is moved off nights when the room is booked"""
+        booking = self.create_booking('101', check_in=self.today, check_out=self.today + timedelta(days=2))
+
+        response = self.plan(end_date=str(self.today + timedelta(days=5)), interval_days=30)
+
+        self.assertEqual(response.data['created'], 1)
+        job = RoomMaintenance.objects.get(room=booking.room)
+        self.assertEqual(job.scheduled_date, self.today + timedelta(days=2))
+
+    def test_max_per_day_and_dry_run(self):
+        """Test the daily cap spreads jobs and a dry run writes nothing"""
+        for number in range(101, 104):
+            Room.objects.create(number=str(number), room_type=self.room_type, floor=1)
+
+        response = self.plan(end_date=str(self.today), interval_days=1, flex_days=0, max_per_day=2, dry_run=True)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['jobs']), 2)
+        self.assertEqual(len(response.data['unscheduled']), 1)
+        self.assertFalse(RoomMaintenance.objects.exists())
+
+
+class FolioTestCase(HotelTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.booking = self.create_booking('101', status='checked_in')
+
+    def test_order_and_service_post_to_folio(self):
+        """Test restaurant orders and room services roll up into the booking total"""
+        order = Order.objects.create(customer_name='Tour Leader', total_amount=Decimal('1250.00'))
+        service = RoomService.objects.create(
+            booking=self.booking, service_type='laundry', description='Two shirts', charge=Decimal('300.00')
+        )
+
+        response = self.client.post(
+            f'/api/orders/orders/{order.id}/charge_to_room/', {'room_number': '101'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(f'/api/hotels/services/{service.id}/complete/')
+        self.assertNotIn('folio_error', response.data)
+
+        response = self.client.get(f'/api/hotels/bookings/{self.booking.id}/folio/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['additional_charges'], Decimal('1550.00'))
+        self.assertEqual(response.data['total_amount'], Decimal('11550.00'))
+        self.assertEqual([e['source'] for e in response.data['entries']], ['restaurant', 'room_service'])
+
+    def test_post_charge_validates_amount(self):
+        """Test manual charges must be a positive amount that fits the folio"""
+        url = f'/api/hotels/bookings/{self.booking.id}/post_charge/'
+        for amount in ['NaN', 'Infinity', '-50.00', '0', '123456789012.00', 'abc', None]:
+            response = self.client.post(url, {'amount': amount, 'description': 'Minibar'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, amount)
+            self.assertIn('amount', response.data)
+
+        response = self.client.post(url, {'amount': '200.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('description', response.data)
+        self.assertFalse(self.booking.folio_entries.exists())
+
+        response = self.client.post(url, {'amount': '200.00', 'description': 'Minibar'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_order_cannot_be_posted_twice(self):
+        """Test the same order is only charged once"""
+        order = Order.objects.create(customer_name='Tour Leader', total_amount=Decimal('500.00'))
+        url = f'/api/hotels/bookings/{self.booking.id}/post_order/'
+
+        first = self.client.post(url, {'order_id': order.id}, format='json')
+        second = self.client.post(url, {'order_id': order.id}, format='json')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.additional_charges, Decimal('500.00'))
+
+    def test_check_out_includes_folio(self):
+        """Test check-out adds folio charges to the customer's spend"""
+        self.client.post(
+            f'/api/hotels/bookings/{self.booking.id}/post_charge/',
+            {'amount': '200.00', 'description': 'Minibar'},
+            format='json'
+        )
+
+        self.client.post(f'/api/hotels/bookings/{self.booking.id}/check_out/')
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.total_spent, Decimal('10200.00'))
+
+    def test_charge_to_room_requires_staff(self):
+        """Test anonymous callers cannot charge an order to a room"""
+        order = Order.objects.create(customer_name='Walk In', total_amount=Decimal('500.00'))
+
+        response = APIClient().post(
+            f'/api/orders/orders/{order.id}/charge_to_room/', {'room_number': '101'}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(self.booking.folio_entries.exists())
+
+    def test_paid_order_not_charged_to_room(self):
+        """Test an order already paid by cash or card cannot also go on the folio"""
+        order = Order.objects.create(customer_name='Tour Leader', total_amount=Decimal('500.00'))
+        Payment.objects.create(order=order, amount=order.total_amount, payment_method='cash', status='completed')
+
+        response = self.client.post(
+            f'/api/orders/orders/{order.id}/charge_to_room/', {'room_number': '101'}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(self.booking.folio_entries.exists())
+
+    def test_charge_to_room_with_two_checked_in_bookings(self):
+        """Test the room number must identify a single checked-in booking"""
+        RoomBooking.objects.create(
+            customer=self.customer, room=self.booking.room, check_in_date=self.today,
+            check_out_date=self.today + timedelta(days=1), adults=1, room_rate=Decimal('5000.00'),
+            total_room_charges=Decimal('0.00'), total_amount=Decimal('0.00'), status='checked_in'
+        )
+        order = Order.objects.create(customer_name='Tour Leader', total_amount=Decimal('500.00'))
+
+        response = self.client.post(
+            f'/api/orders/orders/{order.id}/charge_to_room/', {'room_number': '101'}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(FolioEntry.objects.exists())
+
+    def test_completed_order_charged_to_room_counts_once(self):
+        """Test an order already counted as spend is moved onto the stay, not double counted"""
+        order = Order.objects.create(
+            customer=self.customer, status='served', total_amount=Decimal('700.00')
+        )
+        self.client.post(f'/api/orders/orders/{order.id}/complete/')
+        self.client.post(f'/api/orders/orders/{order.id}/charge_to_room/', {'room_number': '101'}, format='json')
+        self.client.post(f'/api/hotels/bookings/{self.booking.id}/check_out/')
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.total_spent, Decimal('10700.00'))
+
+
+class AvailabilityGridTestCase(HotelTestMixin, TestCase):
+    def test_room_type_grid(self):
+        """Test free rooms are counted per room type for every night"""
+        booking = self.create_booking('101', check_in=self.today + timedelta(days=1))
+        Room.objects.create(number='102', room_type=self.room_type, floor=1)
+        Room.objects.create(number='103', room_type=self.room_type, floor=1, status='out_of_order')
+
+        response = self.client.get('/api/hotels/room-types/availability_grid/', {
+            'start_date': self.today.isoformat(), 'days': 4
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        standard = response.data['room_types'][0]
+        self.assertEqual(standard['total_rooms'], 2)
+        self.assertEqual(standard['available'], [2, 1, 1, 2])
+
+        # Cancelling frees the nights again
+        booking.status = 'cancelled'
+        booking.save()
+        response = self.client.get('/api/hotels/room-types/availability_grid/', {
+            'start_date': self.today.isoformat(), 'days': 4
+        })
+        self.assertEqual(response.data['room_types'][0]['available'], [2, 2, 2, 2])
+
+    def test_grid_cache_headers(self):
+        """Test the grid carries an ETag and answers a matching request with 304"""
+        response = self.client.get('/api/hotels/room-types/availability_grid/')
+        self.assertIn('max-age=60', response['Cache-Control'])
+
+        response = self.client.get('/api/hotels/room-types/availability_grid/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        for days in ['400', '0', 'nan', 'inf']:
+            response = self.client.get('/api/hotels/room-types/availability_grid/', {'days': days})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, days)
+
+
+class ArrivalReminderTestCase(HotelTestMixin, TestCase):
+    def test_arrival_reminders(self):
+        """Test tomorrow's confirmed arrivals get one reminder each"""
+        tomorrow = self.today + timedelta(days=1)
+        arriving = self.create_booking('101', check_in=tomorrow)
+        self.create_booking('102', status='pending', check_in=tomorrow)
+        self.create_booking('103', check_in=self.today)
+
+        out = StringIO()
+        call_command('send_reminders', stdout=out)
+
+        self.assertIn('Arrival reminders for', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(arriving.booking_number, mail.outbox[0].body)
+        self.assertEqual(list(RoomBooking.objects.filter(reminder_sent=True)), [arriving])
@@ -10,5 +10,5 @@ router.register(r'services', views.RoomServiceViewSet)
 router.register(r'maintenance', views.RoomMaintenanceViewSet)
 
 urlpatterns = [
-    path('api/hotels/', include(router.urls)),
+    path('', include(router.urls)),
 ]
\ No newline at end of file
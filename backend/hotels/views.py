@@ -3,22 +3,31 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
-from django.db.models import Q, Count, Sum
+from django.db.models import Q, Count, Prefetch, Sum
 from django.shortcuts import get_object_or_404
 # from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from datetime import date, datetime, timedelta
 
 from .models import RoomType, Room, RoomBooking, RoomService, RoomMaintenance
+from orders.models import Order
 from .serializers import (
     RoomTypeSerializer, RoomSerializer, RoomBookingSerializer,
-    RoomBookingSummarySerializer, RoomServiceSerializer, RoomMaintenanceSerializer
+    RoomBookingSummarySerializer, RoomBookingSummaryValuesSerializer, RoomServiceSerializer, RoomMaintenanceSerializer,
+    PreventiveMaintenancePlanSerializer, FolioChargeSerializer, FolioEntrySerializer,
+    room_prefetches, room_type_queryset
 )
 from accounts.permissions import RoleBasedPermission
+from maria_havens_pos.caching import CachedViewSetMixin, cached_response
+from maria_havens_pos.values_serializers import ValuesListMixin
+from . import availability, folio, services
+from .planner import plan_preventive_maintenance, schedule_preventive_maintenance
+from .housekeeping import queue as housekeeping_queue
 
 
-class RoomTypeViewSet(viewsets.ModelViewSet):
-    queryset = RoomType.objects.annotate(room_count=Count('rooms'))
+class RoomTypeViewSet(CachedViewSetMixin, viewsets.ModelViewSet):
+    cache_namespace = 'room_types'
+    queryset = room_type_queryset()
     serializer_class = RoomTypeSerializer
     permission_classes = [IsAuthenticated, RoleBasedPermission]
     filter_backends = [SearchFilter, OrderingFilter]
@@ -37,10 +46,30 @@ class RoomTypeViewSet(viewsets.ModelViewSet):
         ).distinct()
         serializer = self.get_serializer(room_types, many=True)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def availability_grid(self, request):
+        """Free rooms per room type for each night in a range"""
+        try:
+            start_date = datetime.strptime(
+                request.query_params.get('start_date') or timezone.now().date().isoformat(), '%Y-%m-%d'
+            ).date()
+            days = int(request.query_params.get('days', 14))
+        except ValueError:
+            return Response({'error': 'Invalid date format'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not 1 <= days <= 90:
+            return Response({'error': 'days must be between 1 and 90'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return cached_response(request, {
+            'start_date': start_date.isoformat(),
+            'dates': [(start_date + timedelta(days=offset)).isoformat() for offset in range(days)],
+            'room_types': availability.room_type_grid(start_date, days)
+        })
 
 
 class RoomViewSet(viewsets.ModelViewSet):
-    queryset = Room.objects.select_related('room_type').prefetch_related('bookings')
+    queryset = Room.objects.select_related('room_type')
     serializer_class = RoomSerializer
     permission_classes = [IsAuthenticated, RoleBasedPermission]
     filter_backends = [SearchFilter, OrderingFilter]
@@ -49,6 +78,9 @@ class RoomViewSet(viewsets.ModelViewSet):
     ordering_fields = ['number', 'floor', 'room_type__name']
     ordering = ['number']
     
+    def get_queryset(self):
+        return Room.objects.prefetch_related(*room_prefetches())
+    
     @action(detail=True, methods=['post'])
     def set_status(self, request, pk=None):
         """Change room status"""
@@ -74,10 +106,41 @@ class RoomViewSet(viewsets.ModelViewSet):
         
         return Response({'status': 'Room marked as cleaned'})
     
+    @action(detail=False, methods=['get'])
+    def housekeeping_queue(self, request):
+        """Rooms waiting to be cleaned, highest priority first"""
+        floor = self._floor_param(request)
+        return Response(housekeeping_queue.snapshot(floor=floor))
+    
+    @action(detail=False, methods=['post'])
+    def next_housekeeping_task(self, request):
+        """Hand the next room to clean to an attendant (arrivals and VIPs first)"""
+        floor = self._floor_param(request)
+        
+        # The claim is taken in the database, so no other attendant gets this room
+        task = housekeeping_queue.next_task(floor=floor, user=request.user)
+        if task is None:
+            return Response({'status': 'no rooms waiting'}, status=status.HTTP_404_NOT_FOUND)
+        room_id, arrival_today, vip_arrival = task
+        room = self.get_queryset().get(id=room_id)
+        
+        return Response({
+            'room': self.get_serializer(room).data,
+            'arrival_today': arrival_today,
+            'vip_arrival': vip_arrival
+        })
+    
+    def _floor_param(self, request):
+        floor = request.query_params.get('floor', request.data.get('floor'))
+        try:
+            return int(floor) if floor not in (None, '') else None
+        except (TypeError, ValueError):
+            return None
+    
     @action(detail=False, methods=['get'])
     def available(self, request):
         """Get available rooms"""
-        rooms = self.queryset.filter(status='available', is_active=True)
+        rooms = self.get_queryset().filter(status='available', is_active=True)
         
         # Filter by date range if provided
         check_in = request.query_params.get('check_in')
@@ -120,7 +183,7 @@ class RoomViewSet(viewsets.ModelViewSet):
         })
 
 
-class RoomBookingViewSet(viewsets.ModelViewSet):
+class RoomBookingViewSet(ValuesListMixin, viewsets.ModelViewSet):
     queryset = RoomBooking.objects.select_related('customer', 'room', 'created_by').prefetch_related('services')
     permission_classes = [IsAuthenticated, RoleBasedPermission]
     filter_backends = [SearchFilter, OrderingFilter]
@@ -128,12 +191,24 @@ class RoomBookingViewSet(viewsets.ModelViewSet):
     search_fields = ['booking_number', 'customer__first_name', 'customer__last_name', 'customer__phone']
     ordering_fields = ['check_in_date', 'created_at', 'total_amount']
     ordering = ['-created_at']
+    values_serializer_class = RoomBookingSummaryValuesSerializer
     
     def get_serializer_class(self):
         if self.action == 'list':
             return RoomBookingSummarySerializer
         return RoomBookingSerializer
     
+    def get_queryset(self):
+        if self.action == 'list':
+            return RoomBooking.objects.select_related('customer', 'room')
+        # The full serializer nests the room and the service requests
+        return RoomBooking.objects.select_related(
+            'customer', 'room', 'created_by', 'checked_in_by', 'checked_out_by'
+        ).prefetch_related(
+            *room_prefetches('room__'),
+            Prefetch('services', queryset=RoomService.objects.select_related('requested_by', 'assigned_to')),
+        )
+    
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
     
@@ -144,8 +219,9 @@ class RoomBookingViewSet(viewsets.ModelViewSet):
         if booking.status == 'pending':
             booking.status = 'confirmed'
             booking.room.status = 'occupied'
-            booking.save()
-            booking.room.save()
+            # Only write status so folio totals posted meanwhile are not overwritten
+            booking.save(update_fields=['status', 'updated_at'])
+            booking.room.save(update_fields=['status', 'updated_at'])
             
             return Response({'status': 'booking confirmed'})
         return Response({'error': 'Booking cannot be confirmed'}, status=status.HTTP_400_BAD_REQUEST)
@@ -158,8 +234,8 @@ class RoomBookingViewSet(viewsets.ModelViewSet):
             booking.status = 'cancelled'
             if booking.room.status == 'occupied':
                 booking.room.status = 'available'
-                booking.room.save()
-            booking.save()
+                booking.room.save(update_fields=['status', 'updated_at'])
+            booking.save(update_fields=['status', 'updated_at'])
             
             return Response({'status': 'booking cancelled'})
         return Response({'error': 'Booking cannot be cancelled'}, status=status.HTTP_400_BAD_REQUEST)
@@ -168,20 +244,7 @@ class RoomBookingViewSet(viewsets.ModelViewSet):
     def check_in(self, request, pk=None):
         """Check in guest"""
         booking = self.get_object()
-        if booking.status == 'confirmed':
-            booking.status = 'checked_in'
-            booking.checked_in_at = timezone.now()
-            booking.checked_in_by = request.user
-            booking.room.status = 'occupied'
-            booking.save()
-            booking.room.save()
-            
-            # Update customer stats
-            customer = booking.customer
-            customer.total_visits += 1
-            customer.last_visit = timezone.now()
-            customer.save()
-            
+        if services.check_in_bookings([booking.id], user=request.user):
             return Response({'status': 'guest checked in'})
         return Response({'error': 'Cannot check in guest'}, status=status.HTTP_400_BAD_REQUEST)
     
@@ -189,32 +252,50 @@ class RoomBookingViewSet(viewsets.ModelViewSet):
     def check_out(self, request, pk=None):
         """Check out guest"""
         booking = self.get_object()
-        if booking.status == 'checked_in':
-            booking.status = 'checked_out'
-            booking.checked_out_at = timezone.now()
-            booking.checked_out_by = request.user
-            booking.room.status = 'cleaning'  # Room needs cleaning after checkout
-            booking.save()
-            booking.room.save()
-            
-            # Update customer spending
-            customer = booking.customer
-            customer.total_spent += booking.total_amount
-            customer.save()
-            
+        if services.check_out_bookings([booking.id], user=request.user):
             return Response({'status': 'guest checked out'})
         return Response({'error': 'Cannot check out guest'}, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['post'])
+    def bulk_check_in(self, request):
+        """Check in several bookings at once (e.g. a tour group)"""
+        booking_ids = self._booking_ids(request)
+        if booking_ids is None:
+            return Response({'error': 'booking_ids must be a list of ids'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        checked_in = services.check_in_bookings(booking_ids, user=request.user)
+        return Response({
+            'checked_in': checked_in,
+            'skipped': sorted(set(booking_ids) - set(checked_in))
+        })
+    
+    @action(detail=False, methods=['post'])
+    def bulk_check_out(self, request):
+        """Check out several bookings at once"""
+        booking_ids = self._booking_ids(request)
+        if booking_ids is None:
+            return Response({'error': 'booking_ids must be a list of ids'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        checked_out = services.check_out_bookings(booking_ids, user=request.user)
+        return Response({
+            'checked_out': checked_out,
+            'skipped': sorted(set(booking_ids) - set(checked_out))
+        })
+    
+    def _booking_ids(self, request):
+        booking_ids = request.data.get('booking_ids')
+        if not isinstance(booking_ids, list) or not booking_ids:
+            return None
+        try:
+            return [int(booking_id) for booking_id in booking_ids]
+        except (TypeError, ValueError):
+            return None
+    
     @action(detail=True, methods=['post'])
     def no_show(self, request, pk=None):
         """Mark booking as no show"""
         booking = self.get_object()
-        if booking.status == 'confirmed':
-            booking.status = 'no_show'
-            booking.room.status = 'available'
-            booking.save()
-            booking.room.save()
-            
+        if services.mark_no_shows([booking.id]):
             return Response({'status': 'marked as no show'})
         return Response({'error': 'Cannot mark as no show'}, status=status.HTTP_400_BAD_REQUEST)
     
@@ -222,7 +303,7 @@ class RoomBookingViewSet(viewsets.ModelViewSet):
     def arrivals_today(self, request):
         """Get today's arrivals"""
         today = timezone.now().date()
-        bookings = self.queryset.filter(
+        bookings = self.get_queryset().filter(
             check_in_date=today,
             status__in=['confirmed', 'checked_in']
         )
@@ -233,13 +314,58 @@ class RoomBookingViewSet(viewsets.ModelViewSet):
     def departures_today(self, request):
         """Get today's departures"""
         today = timezone.now().date()
-        bookings = self.queryset.filter(
+        bookings = self.get_queryset().filter(
             check_out_date=today,
             status='checked_in'
         )
         serializer = self.get_serializer(bookings, many=True)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get'])
+    def folio(self, request, pk=None):
+        """Guest folio: running totals plus the posted line items"""
+        booking = self.get_object()
+        entries = booking.folio_entries.select_related('order', 'posted_by')
+        return Response({
+            'booking_number': booking.booking_number,
+            'status': booking.status,
+            'room_charges': booking.total_room_charges,
+            'tax_amount': booking.tax_amount,
+            'additional_charges': booking.additional_charges,
+            'discount_amount': booking.discount_amount,
+            'total_amount': booking.total_amount,
+            'entries': FolioEntrySerializer(entries, many=True).data
+        })
+    
+    @action(detail=True, methods=['post'])
+    def post_charge(self, request, pk=None):
+        """Post a manual charge or adjustment to the folio"""
+        booking = self.get_object()
+        serializer = FolioChargeSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            entry = folio.post_charge(
+                booking, serializer.validated_data['amount'], serializer.validated_data['description'],
+                user=request.user
+            )
+        except folio.FolioError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(FolioEntrySerializer(entry).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'])
+    def post_order(self, request, pk=None):
+        """Charge a restaurant order to this booking"""
+        booking = self.get_object()
+        order = get_object_or_404(Order, id=request.data.get('order_id'))
+        
+        try:
+            entry = folio.post_order(booking, order, user=request.user)
+        except folio.FolioError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(FolioEntrySerializer(entry).data, status=status.HTTP_201_CREATED)
+    
     @action(detail=True, methods=['post'])
     def add_service(self, request, pk=None):
         """Add room service"""
@@ -294,6 +420,12 @@ class RoomServiceViewSet(viewsets.ModelViewSet):
         service.completed_at = timezone.now()
         service.save()
         
+        # Roll the charge onto the guest folio
+        try:
+            folio.post_service(service, user=request.user)
+        except folio.FolioError as e:
+            return Response({'status': 'service completed', 'folio_error': str(e)})
+        
         return Response({'status': 'service completed'})
 
 
@@ -307,6 +439,9 @@ class RoomMaintenanceViewSet(viewsets.ModelViewSet):
     ordering_fields = ['priority', 'scheduled_date', 'created_at']
     ordering = ['-priority', 'scheduled_date']
     
+    def get_queryset(self):
+        return self.queryset.prefetch_related(*room_prefetches('room__'))
+    
     def perform_create(self, serializer):
         maintenance = serializer.save(created_by=self.request.user)
         
@@ -349,9 +484,56 @@ class RoomMaintenanceViewSet(viewsets.ModelViewSet):
     def overdue(self, request):
         """Get overdue maintenance"""
         today = timezone.now().date()
-        overdue = self.queryset.filter(
+        overdue = self.get_queryset().filter(
             scheduled_date__lt=today,
             status__in=['scheduled', 'in_progress']
         )
         serializer = self.get_serializer(overdue, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'])
+    def plan_preventive(self, request):
+        """Plan (and unless dry_run, create) recurring preventive jobs in one batch"""
+        serializer = PreventiveMaintenancePlanSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = serializer.validated_data
+        
+        rooms = Room.objects.filter(is_active=True).order_by('floor', 'number')
+        if params.get('room_type_id'):
+            rooms = rooms.filter(room_type_id=params['room_type_id'])
+        if params.get('room_ids'):
+            rooms = rooms.filter(id__in=params['room_ids'])
+        
+        job_fields = {
+            'title': params['title'],
+            'description': params['description'],
+            'estimated_duration': params['estimated_duration'],
+            'priority': params['priority'],
+            'created_by': request.user,
+        }
+        if 'estimated_cost' in params:
+            job_fields['estimated_cost'] = params['estimated_cost']
+        
+        plan = plan_preventive_maintenance if params['dry_run'] else schedule_preventive_maintenance
+        jobs, unscheduled = plan(
+            rooms,
+            params['start_date'],
+            params['end_date'],
+            params['interval_days'],
+            flex_days=params['flex_days'],
+            max_per_day=params.get('max_per_day'),
+            **job_fields
+        )
+        
+        return Response({
+            'created': 0 if params['dry_run'] else len(jobs),
+            'jobs': [
+                {'room_id': job.room_id, 'room_number': job.room.number, 'scheduled_date': job.scheduled_date}
+                for job in jobs
+            ],
+            'unscheduled': [
+                {'room_id': room.id, 'room_number': room.number, 'desired_date': desired}
+                for room, desired in unscheduled
+            ]
+        }, status=status.HTTP_200_OK if params['dry_run'] else status.HTTP_201_CREATED)
\ No newline at end of file
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'job_type', 'status', 'attempts', 'run_after', 'created_at', 'finished_at']
+    list_filter = ['status', 'job_type']
+    search_fields = ['job_type', 'last_error']
+    readonly_fields = ['created_at', 'started_at', 'finished_at', 'locked_by']
+    ordering = ['-created_at']
+    actions = ['retry_jobs']
+    
+    def retry_jobs(self, request, queryset):
+        updated = queryset.filter(status='failed').update(status='queued', attempts=0, last_error='')
+        self.message_user(request, f'{updated} job(s) queued again.')
+    retry_jobs.short_description = 'Retry failed jobs'
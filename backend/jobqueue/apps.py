@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class JobqueueConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobqueue'
+
+    def ready(self):
+        # Handlers live in each app's jobs.py, like admin.py for the admin site
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('jobs')
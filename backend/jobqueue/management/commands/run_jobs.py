@@ -0,0 +1,36 @@
+import json
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from jobqueue.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (emails, notifications, reminders)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4, help='Worker threads per batch')
+        parser.add_argument('--batch-size', type=int, default=50, help='Jobs claimed per poll')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when idle')
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit')
+
+    def handle(self, *args, **options):
+        worker = Worker(threads=options['threads'], batch_size=options['batch_size'])
+
+        if options['once']:
+            worker.requeue_stale()
+            while worker.run_once():
+                pass
+        else:
+            stop_event = threading.Event()
+            signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+            self.stdout.write(f'Worker {worker.name} started')
+            try:
+                worker.run(poll_interval=options['poll_interval'], stop_event=stop_event)
+            except KeyboardInterrupt:
+                pass
+
+        for job_type, stats in sorted(worker.stats.summary().items()):
+            self.stdout.write(f'{job_type}: {json.dumps(stats)}')
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Job
+
+_handlers = {}
+
+
+class Handler:
+    __slots__ = ('func', 'batch', 'max_attempts')
+
+    def __init__(self, func, batch, max_attempts):
+        self.func = func
+        self.batch = batch
+        self.max_attempts = max_attempts
+
+
+def register(job_type, batch=False, max_attempts=5):
+    """
+    Register the function that runs ``job_type`` jobs.
+
+    A plain handler is called with one payload. With ``batch=True`` it gets
+    the payloads of every claimed job of that type at once, e.g. to send a
+    pile of emails over one SMTP connection.
+    """
+    def decorator(func):
+        _handlers[job_type] = Handler(func, batch, max_attempts)
+        return func
+    return decorator
+
+
+def get_handler(job_type):
+    return _handlers.get(job_type)
+
+
+def enqueue(job_type, payload=None, delay=None, max_attempts=None):
+    """
+    Queue a job and return it.
+
+    The row is written in the caller's transaction, so a job queued by a
+    request that later rolls back never runs.
+    """
+    handler = _handlers.get(job_type)
+    if handler is None:
+        raise KeyError(f'No handler registered for job type {job_type!r}')
+    return Job.objects.create(
+        job_type=job_type,
+        payload=payload or {},
+        run_after=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts or handler.max_attempts
+    )
@@ -0,0 +1,198 @@
+from django.test import TestCase, TransactionTestCase
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import time, timedelta
+from io import StringIO
+from unittest import mock
+import threading
+from reservations.models import Customer, Reservation
+from .models import Job
+from .queue import enqueue, register
+from .worker import Worker, backoff
+
+User = get_user_model()
+
+calls = []
+
+
+@register('tests.record')
+def record(payload):
+    calls.append(payload)
+
+
+@register('tests.record_batch', batch=True)
+def record_batch(payloads):
+    calls.append(list(payloads))
+
+
+@register('tests.explode', max_attempts=2)
+def explode(payload):
+    raise RuntimeError('boom')
+
+
+class WorkerTestCase(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.worker = Worker(threads=1)
+
+    def test_runs_due_jobs_only(self):
+        """Test queued jobs run once and delayed ones wait"""
+        job = enqueue('tests.record', {'n': 1})
+        later = enqueue('tests.record', {'n': 2}, delay=timedelta(minutes=5))
+
+        self.assertEqual(self.worker.run_once(), 1)
+        self.assertEqual(calls, [{'n': 1}])
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(Job.objects.get(id=later.id).status, 'queued')
+        self.assertEqual(self.worker.run_once(), 0)
+
+    def test_batch_handler_gets_all_payloads(self):
+        """Test a batch handler is called once for every claimed job of its type"""
+        for n in range(3):
+            enqueue('tests.record_batch', {'n': n})
+        self.worker.run_once()
+        self.assertEqual(calls, [[{'n': 0}, {'n': 1}, {'n': 2}]])
+        self.assertEqual(self.worker.stats.summary()['tests.record_batch']['done'], 3)
+
+    def test_retries_with_backoff_then_fails(self):
+        """Test a failing job is retried later and gives up after max_attempts"""
+        job = enqueue('tests.explode')
+
+        self.worker.run_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=backoff(1) - 5))
+        self.assertIn('boom', job.last_error)
+
+        Job.objects.filter(id=job.id).update(run_after=timezone.now())
+        self.worker.run_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(self.worker.stats.summary()['tests.explode']['failed'], 1)
+
+    def test_stale_jobs_use_up_attempts(self):
+        """Test a job whose worker died is requeued as an attempt and fails at max_attempts"""
+        job = enqueue('tests.explode')
+        long_ago = timezone.now() - timedelta(hours=1)
+
+        Job.objects.filter(id=job.id).update(status='running', started_at=long_ago, locked_by='gone:1')
+        self.assertEqual(self.worker.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), ('queued', 1, ''))
+
+        Job.objects.filter(id=job.id).update(status='running', started_at=long_ago, locked_by='gone:2')
+        self.assertEqual(self.worker.requeue_stale(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIn('worker is assumed to have died', job.last_error)
+
+    def test_unknown_job_type_is_rejected(self):
+        """Test enqueueing a job nobody handles fails fast"""
+        with self.assertRaises(KeyError):
+            enqueue('tests.missing')
+
+
+class WorkerThreadsTestCase(TransactionTestCase):
+    def test_pool_threads_close_their_connections(self):
+        """Test each pool thread closes its database connections when its group is done"""
+        enqueue('tests.record', {'n': 1})
+        enqueue('tests.record_batch', {'n': 2})
+        closed_in = []
+
+        with mock.patch('jobqueue.worker.connections') as worker_connections:
+            worker_connections.close_all.side_effect = lambda: closed_in.append(threading.current_thread())
+            self.assertEqual(Worker(threads=2).run_once(), 2)
+
+        self.assertEqual(len(closed_in), 2)
+        self.assertNotIn(threading.main_thread(), closed_in)
+
+
+class NotificationJobsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='host',
+            email='host@example.com',
+            password='testpass123',
+            role='manager'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.customer = Customer.objects.create(
+            first_name='Jane',
+            last_name='Wanjiku',
+            email='jane@example.com',
+            phone='0712345678'
+        )
+
+    def test_confirmation_email_is_sent_by_worker(self):
+        """Test confirming a reservation queues the email instead of sending it inline"""
+        reservation = Reservation.objects.create(
+            customer=self.customer,
+            date=timezone.now().date() + timedelta(days=1),
+            time=time(19, 0),
+            party_size=2,
+            created_by=self.user
+        )
+
+        response = self.client.post(f'/api/reservations/reservations/{reservation.id}/confirm/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(Job.objects.filter(job_type='reservations.send_confirmation', status='queued').exists())
+
+        out = StringIO()
+        call_command('run_jobs', '--once', '--threads', '1', stdout=out)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['jane@example.com'])
+        self.assertIn('reservations.send_confirmation', out.getvalue())
+        reservation.refresh_from_db()
+        self.assertTrue(reservation.confirmation_sent)
+
+    def test_confirmation_retry_skips_guests_already_emailed(self):
+        """Test a failed send only re-sends to the guests that were not reached"""
+        reservations = [
+            Reservation.objects.create(
+                customer=self.customer, date=timezone.now().date() + timedelta(days=1),
+                time=time(19 + n, 0), party_size=2, created_by=self.user
+            )
+            for n in range(2)
+        ]
+        for reservation in reservations:
+            enqueue('reservations.send_confirmation', {'reservation_id': reservation.id})
+        send = locmem.EmailBackend.send_messages
+        sent = []
+
+        def fail_second(backend, messages):
+            sent.extend(messages)
+            if len(sent) == 2:
+                raise ConnectionError('SMTP went away')
+            return send(backend, messages)
+
+        with mock.patch.object(locmem.EmailBackend, 'send_messages', autospec=True,
+                               side_effect=fail_second):
+            Worker(threads=1).run_once()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(Reservation.objects.filter(confirmation_sent=True).count(), 1)
+
+        Job.objects.update(run_after=timezone.now())
+        Worker(threads=1).run_once()
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(Reservation.objects.filter(confirmation_sent=True).count(), 2)
+        self.assertNotEqual(mail.outbox[0].subject, mail.outbox[1].subject)
+
+    def test_password_reset_email_is_queued(self):
+        """Test forgot password hands the email to the worker"""
+        self.client.force_authenticate(user=None)
+        response = self.client.post('/api/accounts/forgot-password/', {'email': 'host@example.com'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        Worker(threads=1).run_once()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('reset-password?token=', mail.outbox[0].body)
@@ -0,0 +1,183 @@
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .queue import get_handler
+
+logger = logging.getLogger('maria_havens_pos')
+
+BACKOFF_BASE = 30
+BACKOFF_MAX = 60 * 60
+
+
+def backoff(attempts):
+    """Seconds to wait before retry number ``attempts`` (30s, 60s, 2m, ... capped at an hour)"""
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+class JobStats:
+    """Thread-safe per job type counters for one worker process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.by_type = defaultdict(lambda: {'done': 0, 'retried': 0, 'failed': 0, 'seconds': 0.0})
+
+    def record(self, job_type, outcome, count, seconds):
+        with self._lock:
+            stats = self.by_type[job_type]
+            stats[outcome] += count
+            stats['seconds'] += seconds
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        with self._lock:
+            return {
+                job_type: dict(
+                    stats,
+                    per_second=round((stats['done'] + stats['retried'] + stats['failed']) / elapsed, 2),
+                    avg_ms=round(1000 * stats['seconds'] / max(stats['done'] + stats['retried'] + stats['failed'], 1), 1)
+                )
+                for job_type, stats in self.by_type.items()
+            }
+
+
+class Worker:
+    """
+    Claims due jobs in batches and runs them on a thread pool.
+
+    Claiming is a conditional UPDATE (``status='queued'`` -> ``'running'``)
+    so several workers can poll the same table without running a job twice.
+    Jobs of the same type in a batch go to one thread; batch handlers get all
+    of their payloads in a single call.
+    """
+
+    def __init__(self, threads=4, batch_size=50, stale_after=timedelta(minutes=15)):
+        self.threads = threads
+        self.batch_size = batch_size
+        self.stale_after = stale_after
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.stats = JobStats()
+
+    def claim(self):
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(status='queued', run_after__lte=now)
+                .values_list('id', flat=True)[:self.batch_size]
+            )
+            if not ids:
+                return []
+            Job.objects.filter(id__in=ids, status='queued').update(
+                status='running', locked_by=self.name, started_at=now
+            )
+        return list(Job.objects.filter(id__in=ids, status='running', locked_by=self.name, started_at=now))
+
+    def requeue_stale(self):
+        """
+        Put back jobs whose worker died mid-run; returns how many were requeued.
+
+        A stale run counts as an attempt, so a job that keeps killing its
+        worker fails once it reaches ``max_attempts`` instead of looping.
+        """
+        now = timezone.now()
+        stale = Job.objects.filter(status='running', started_at__lt=now - self.stale_after)
+        stale.filter(attempts__gte=F('max_attempts') - 1).update(
+            status='failed', attempts=F('attempts') + 1, finished_at=now, locked_by='',
+            last_error=f'Still running after {self.stale_after}; the worker is assumed to have died'
+        )
+        return stale.update(
+            status='queued', attempts=F('attempts') + 1, run_after=now, locked_by=''
+        )
+
+    def run_once(self):
+        """Claim and run one batch; returns how many jobs were processed"""
+        jobs = self.claim()
+        if not jobs:
+            return 0
+        by_type = defaultdict(list)
+        for job in jobs:
+            by_type[job.job_type].append(job)
+
+        if self.threads > 1 and len(by_type) > 1:
+            with ThreadPoolExecutor(max_workers=self.threads) as pool:
+                list(pool.map(self._run_group, by_type.values()))
+        else:
+            for group in by_type.values():
+                self._run_group(group)
+        return len(jobs)
+
+    def _run_group(self, jobs):
+        try:
+            handler = get_handler(jobs[0].job_type)
+            if handler is None:
+                self._finish(jobs, time.perf_counter(), error='No handler registered', retry=False)
+            elif handler.batch:
+                self._call(handler, jobs, [job.payload for job in jobs])
+            else:
+                for job in jobs:
+                    self._call(handler, [job], job.payload)
+        finally:
+            # Each batch gets fresh pool threads, so their connections would
+            # never be reused; close them rather than wait for CONN_MAX_AGE
+            if threading.current_thread() is not threading.main_thread():
+                connections.close_all()
+
+    def _call(self, handler, jobs, payload):
+        started = time.perf_counter()
+        try:
+            handler.func(payload)
+        except Exception:
+            logger.exception('Job %s failed', ', '.join(str(job.id) for job in jobs))
+            self._finish(jobs, started, error=traceback.format_exc())
+        else:
+            self._finish(jobs, started)
+
+    def _finish(self, jobs, started, error=None, retry=True):
+        now = timezone.now()
+        seconds = time.perf_counter() - started
+        ids = [job.id for job in jobs]
+        if error is None:
+            Job.objects.filter(id__in=ids).update(status='done', finished_at=now, locked_by='', last_error='')
+            self.stats.record(jobs[0].job_type, 'done', len(jobs), seconds)
+            return
+
+        for job in jobs:
+            job.attempts += 1
+            if retry and job.attempts < job.max_attempts:
+                job.status = 'queued'
+                job.run_after = now + timedelta(seconds=backoff(job.attempts))
+                outcome = 'retried'
+            else:
+                job.status = 'failed'
+                job.finished_at = now
+                outcome = 'failed'
+            job.last_error = error[-5000:]
+            job.locked_by = ''
+            self.stats.record(job.job_type, outcome, 1, seconds / len(jobs))
+        Job.objects.bulk_update(jobs, ['status', 'attempts', 'run_after', 'finished_at', 'last_error', 'locked_by'])
+
+    def run(self, poll_interval=1.0, stop_event=None, stats_interval=60):
+        """Process jobs until ``stop_event`` is set"""
+        stop_event = stop_event or threading.Event()
+        last_report = time.monotonic()
+        self.requeue_stale()
+        while not stop_event.is_set():
+            processed = self.run_once()
+            if time.monotonic() - last_report >= stats_interval:
+                logger.info('Job throughput: %s', self.stats.summary())
+                last_report = time.monotonic()
+            if not processed:
+                stop_event.wait(poll_interval)
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class MariaHavensPosConfig(AppConfig):
+    name = 'maria_havens_pos'
+    verbose_name = 'Maria Havens POS'
+
+    def ready(self):
+        from . import db  # noqa: F401
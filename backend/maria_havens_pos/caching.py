@@ -0,0 +1,132 @@
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import patch_cache_control
+from rest_framework import status
+from rest_framework.response import Response
+
+API_CACHE_TIMEOUT = 5 * 60
+
+_stats_lock = threading.Lock()
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+
+def etag_for(data):
+    """Strong ETag for a JSON-serialisable payload"""
+    payload = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return '"%s"' % hashlib.md5(payload.encode()).hexdigest()
+
+
+def cached_response(request, data, max_age=60):
+    """
+    Response for read-only data that clients may cache for ``max_age`` seconds.
+
+    Adds an ETag and answers a matching ``If-None-Match`` with 304, so a
+    screen that polls an unchanged grid gets an empty body back.
+    """
+    etag = etag_for(data)
+    if etag in request.headers.get('If-None-Match', ''):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=max_age)
+    return response
+
+
+def cache_stats():
+    """Hit/miss counts per namespace since this process started"""
+    with _stats_lock:
+        return {namespace: dict(counts) for namespace, counts in _stats.items()}
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _count(namespace, outcome):
+    with _stats_lock:
+        _stats[namespace][outcome] += 1
+
+
+def _version_key(namespace):
+    return f'api:{namespace}:version'
+
+
+def namespace_version(namespace):
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_namespace(namespace):
+    """Make every cached response in ``namespace`` stale"""
+    cache.set(_version_key(namespace), time.time_ns(), None)
+
+
+def invalidate_on(namespace, *models):
+    """Invalidate ``namespace`` whenever one of ``models`` is saved or deleted"""
+    def invalidate(sender, **kwargs):
+        invalidate_namespace(namespace)
+        # Again after commit, in case a request cached the old rows meanwhile
+        transaction.on_commit(lambda: invalidate_namespace(namespace))
+
+    for model in models:
+        uid = f'api-cache:{namespace}:{model._meta.label}'
+        post_save.connect(invalidate, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(invalidate, sender=model, weak=False, dispatch_uid=uid)
+
+
+class CachedViewSetMixin:
+    """
+    Serve a viewset's ``list`` and ``retrieve`` from the cache.
+
+    Responses are keyed by the namespace version, the action, the object
+    id, the caller's role and the query string, so changes to any model
+    registered with ``invalidate_on(cache_namespace, ...)`` make every
+    cached page stale at once. ``X-Cache`` tells whether it was a hit.
+    """
+    cache_namespace = None
+    cache_timeout = API_CACHE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(request, lambda: super(CachedViewSetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(request, lambda: super(CachedViewSetMixin, self).retrieve(request, *args, **kwargs))
+
+    def _cache_key(self, request):
+        user = request.user
+        audience = user.role if user.is_authenticated else 'anonymous'
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field, '')
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        digest = hashlib.md5(f'{request.get_host()}?{query}'.encode()).hexdigest()
+        version = namespace_version(self.cache_namespace)
+        return f'api:{self.cache_namespace}:{version}:{self.action}:{lookup}:{audience}:{digest}'
+
+    def _cached(self, request, render):
+        key = self._cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            _count(self.cache_namespace, 'hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _count(self.cache_namespace, 'misses')
+        response = render()
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, self.cache_timeout)
+        response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,33 @@
+import logging
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger('maria_havens_pos')
+
+
+def apply_pragmas(connection, pragmas):
+    """Run ``PRAGMA name=value`` for each item on a SQLite connection"""
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Tune every new SQLite connection for several terminals writing at once.
+
+    WAL lets readers carry on while one writer commits, ``synchronous=NORMAL``
+    is safe under WAL and avoids an fsync per commit, ``busy_timeout`` makes
+    writers queue for the lock instead of failing, and ``mmap_size`` serves
+    reads from the page cache, as do a larger ``cache_size`` and in-memory
+    temp tables for sorts. Other backends are left alone.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    try:
+        apply_pragmas(connection, getattr(settings, 'SQLITE_PRAGMAS', {}))
+    except Exception:
+        logger.exception('Could not apply SQLite pragmas')
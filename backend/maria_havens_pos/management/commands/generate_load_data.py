@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from maria_havens_pos.sample_data import DEFAULT_COUNTS, PASSWORD, GenerationError, Generator
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate production-sized data (menu, customers, rooms, bookings, orders) for load testing'
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_COUNTS.items():
+            if name == 'days':
+                continue
+            parser.add_argument(f'--{name.replace("_", "-")}', type=int, default=default,
+                                help=f'Number of {name.replace("_", " ")} (default: {default})')
+        parser.add_argument('--days', type=int, default=DEFAULT_COUNTS['days'],
+                            help='Days of order, reservation and booking history (default: %(default)s)')
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Multiply every count, e.g. 0.01 for a quick local dataset')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert')
+        parser.add_argument('--seed', type=int, help='Random seed for a reproducible dataset')
+
+    def handle(self, *args, **options):
+        # Staff accounts and history length stay as given at any scale
+        counts = {
+            name: options[name] if name in ('users', 'days') else max(1, int(options[name] * options['scale']))
+            for name in DEFAULT_COUNTS
+        }
+        generator = Generator(
+            counts=counts, batch_size=options['batch_size'], seed=options['seed'],
+            log=lambda message: self.stdout.write(message),
+        )
+        try:
+            created = generator.run()
+        except GenerationError as exc:
+            raise CommandError(str(exc))
+
+        summary = ', '.join(f'{name.replace("_", " ")}: {total}' for name, total in created.items())
+        self.stdout.write(self.style.SUCCESS(f'Generated {summary}'))
+        self.stdout.write(
+            f'Staff log in as ldstaff0..ldstaff{counts["users"] - 1} with password "{PASSWORD}". '
+            'Run recompute_customer_stats to fill in customer visit totals.'
+        )
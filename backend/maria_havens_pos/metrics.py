@@ -0,0 +1,311 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('maria_havens_pos')
+
+DEFAULTS = {
+    'QUERY_BUDGET': 30,      # requests issuing more queries than this are flagged
+    'HEADERS': None,         # add X-DB-Queries/Server-Timing headers; defaults to DEBUG
+    'DIRECTORY': None,       # shared by all worker processes so /metrics can sum them
+    'EXPORT_INTERVAL': 5.0,  # seconds between a worker's writes to DIRECTORY
+}
+
+# A file not rewritten for this many export intervals belongs to a worker
+# that has exited; collect() skips and removes it
+STALE_EXPORTS = 3
+
+# Upper bounds of the histogram buckets for each measurement
+BUCKETS = {
+    'queries': (1, 2, 5, 10, 20, 50, 100, 200, 500),
+    'db_ms': (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+    'render_ms': (1, 5, 10, 25, 50, 100, 250, 500, 1000),
+    'total_ms': (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000),
+    'response_bytes': (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+}
+
+
+def get_config():
+    config = {**DEFAULTS, **getattr(settings, 'REQUEST_METRICS', {})}
+    if config['HEADERS'] is None:
+        config['HEADERS'] = settings.DEBUG
+    return config
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """``[(upper bound, observations <= bound), ...]`` ending with +Inf"""
+        total, result = 0, []
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'buckets': {('+Inf' if bound == float('inf') else bound): total for bound, total in self.cumulative()},
+        }
+
+
+class RequestMetrics:
+    """
+    Per-view histograms of every measurement, over-budget counts and named
+    counters for this process.
+
+    With ``DIRECTORY`` configured a background thread in each worker
+    writes its snapshot there every ``EXPORT_INTERVAL`` seconds, and
+    ``collect()`` sums the files that are still being refreshed so any
+    worker can answer a scrape for all of them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._counters = {}
+        self._process = None   # (pid, file name) this process exports to
+        self._exporter = None  # (pid, thread) refreshing that file
+
+    def increment(self, name, labels=None, amount=1):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, view, measurements, over_budget=False):
+        with self._lock:
+            entry = self._views.get(view)
+            if entry is None:
+                entry = self._views[view] = {
+                    'histograms': {name: Histogram(bounds) for name, bounds in BUCKETS.items()},
+                    'over_budget': 0,
+                }
+            for name, value in measurements.items():
+                entry['histograms'][name].observe(value)
+            entry['over_budget'] += over_budget
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view: {
+                    'requests': entry['histograms']['total_ms'].count,
+                    'over_budget': entry['over_budget'],
+                    **{name: histogram.as_dict() for name, histogram in entry['histograms'].items()},
+                }
+                for view, entry in sorted(self._views.items())
+            }
+
+    def counters(self):
+        with self._lock:
+            return [[name, dict(labels), value] for (name, labels), value in sorted(self._counters.items())]
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+            self._counters.clear()
+
+    def export(self, directory):
+        """Write this process's numbers to ``directory`` atomically"""
+        from .caching import cache_stats
+
+        data = {'views': self.snapshot(), 'counters': self.counters(), 'cache': cache_stats()}
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(descriptor, 'w') as handle:
+            json.dump(data, handle)
+        os.replace(temporary, os.path.join(directory, self._filename()))
+
+    def _filename(self):
+        # A fresh name per process, so a reused PID can't take over the
+        # file of a worker that has exited
+        pid = os.getpid()
+        if self._process is None or self._process[0] != pid:
+            self._process = (pid, f'metrics-{uuid.uuid4().hex}.json')
+        return self._process[1]
+
+    def maybe_export(self):
+        """Start this process's export thread once ``DIRECTORY`` is set"""
+        if not get_config()['DIRECTORY']:
+            return
+        with self._lock:
+            if self._exporter is not None and self._exporter[0] == os.getpid():
+                return
+            thread = threading.Thread(target=self._export_loop, name='metrics-export', daemon=True)
+            self._exporter = (os.getpid(), thread)
+        thread.start()
+
+    def _export_loop(self):
+        # Runs while idle too, so a live worker's file never looks stale
+        while True:
+            config = get_config()
+            if not config['DIRECTORY']:
+                with self._lock:
+                    self._exporter = None
+                return
+            try:
+                self.export(config['DIRECTORY'])
+            except OSError:
+                logger.exception('Could not export request metrics to %s', config['DIRECTORY'])
+            time.sleep(config['EXPORT_INTERVAL'])
+
+    def collect(self):
+        """
+        ``{'views', 'counters', 'cache'}`` for every live worker sharing
+        ``DIRECTORY``, or for this process alone without one.
+        """
+        from .caching import cache_stats
+
+        config = get_config()
+        directory = config['DIRECTORY']
+        if not directory:
+            return {'views': self.snapshot(), 'counters': self.counters(), 'cache': cache_stats()}
+
+        self.export(directory)
+        stale_before = time.time() - STALE_EXPORTS * config['EXPORT_INTERVAL']
+        merged = {'views': {}, 'counters': {}, 'cache': {}}
+        for filename in sorted(os.listdir(directory)):
+            if not (filename.startswith('metrics-') and filename.endswith('.json')):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                if os.path.getmtime(path) < stale_before:
+                    os.remove(path)
+                    continue
+                with open(path) as handle:
+                    data = json.load(handle)
+            except (OSError, ValueError):
+                continue  # being replaced right now; it will be read next scrape
+            _merge(merged['views'], data['views'])
+            _merge(merged['cache'], data['cache'])
+            for name, labels, value in data['counters']:
+                key = (name, tuple(sorted(labels.items())))
+                merged['counters'][key] = merged['counters'].get(key, 0) + value
+        merged['counters'] = [[name, dict(labels), value] for (name, labels), value in sorted(merged['counters'].items())]
+        return merged
+
+
+def _merge(target, source):
+    """Add the numbers in nested dict ``source`` into ``target``"""
+    for key, value in source.items():
+        if isinstance(value, dict):
+            _merge(target.setdefault(key, {}), value)
+        else:
+            target[key] = target.get(key, 0) + value
+
+
+registry = RequestMetrics()
+
+
+class QueryCounter:
+    """``execute_wrapper`` that counts queries and the time spent in them"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+_GROUP = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+
+
+def view_name(request):
+    """``METHOD /route/<pk>/`` with router regexes turned back into placeholders"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return f'{request.method} <unmatched>'
+    route = _GROUP.sub(r'<\1>', match.route).replace('^', '').replace('$', '')
+    return f'{request.method} /{route}'
+
+
+class QueryMetricsMiddleware:
+    """
+    Measure every request's queries, database time, render time, total
+    time and response size.
+
+    Measurements go into per-view histograms (see ``registry``), requests
+    over ``QUERY_BUDGET`` queries are logged, and with ``HEADERS`` on (the
+    default under DEBUG) the numbers are returned as ``X-DB-Queries`` and
+    ``Server-Timing`` headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        request._metrics_render_seconds = 0.0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        config = get_config()
+        view = view_name(request)
+        over_budget = counter.count > config['QUERY_BUDGET']
+        size = len(response.content) if not response.streaming else 0
+        registry.observe(view, {
+            'queries': counter.count,
+            'db_ms': counter.seconds * 1000,
+            'render_ms': request._metrics_render_seconds * 1000,
+            'total_ms': total * 1000,
+            'response_bytes': size,
+        }, over_budget=over_budget)
+        registry.maybe_export()
+
+        if over_budget:
+            logger.warning(
+                '%s issued %s queries (budget %s) in %.1fms',
+                view, counter.count, config['QUERY_BUDGET'], counter.seconds * 1000
+            )
+        if config['HEADERS']:
+            response['X-DB-Queries'] = str(counter.count)
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={counter.seconds * 1000:.1f}',
+                f'render;dur={request._metrics_render_seconds * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ])
+            if over_budget:
+                response['X-Query-Budget-Exceeded'] = str(config['QUERY_BUDGET'])
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that step
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._metrics_render_seconds += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
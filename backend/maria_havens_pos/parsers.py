@@ -0,0 +1,40 @@
+"""
+JSON parser backed by orjson, with DRF's JSONParser as the fallback.
+
+Request bodies are read and decoded in one call instead of through a
+codecs reader. orjson only reads UTF-8, so other charsets, and installs
+without orjson, use the stdlib parser. So do bodies with a run of 19 or
+more digits, which may hold an integer beyond 64 bits that orjson would
+turn into a float, and bodies orjson rejects, so those are accepted or
+reported exactly as DRF's JSONParser does.
+"""
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework import parsers
+
+from .renderers import FastJSONRenderer, orjson
+
+# Every integer outside the signed and unsigned 64-bit ranges has 19+ digits.
+# Turning every digit into 0 finds such runs far faster than a regex.
+DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+LONG_NUMBER = b'0' * 19
+
+
+class FastJSONParser(parsers.JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if LONG_NUMBER not in body.translate(DIGITS_TO_ZERO):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass  # e.g. 1e400, which the stdlib reads as infinity
+        return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,138 @@
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .metrics import registry
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Request histograms kept in milliseconds/bytes, exported in base units
+REQUEST_HISTOGRAMS = [
+    ('total_ms', 'pos_http_request_duration_seconds', 'Request latency by view', 1000),
+    ('db_ms', 'pos_http_request_db_seconds', 'Time spent in SQL per request by view', 1000),
+    ('render_ms', 'pos_http_response_render_seconds', 'Time spent rendering the response by view', 1000),
+    ('queries', 'pos_http_request_queries', 'SQL queries per request by view', 1),
+    ('response_bytes', 'pos_http_response_size_bytes', 'Response body size by view', 1),
+]
+
+COUNTERS = {
+    'orders_created': ('pos_orders_created_total', 'Orders created'),
+}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+class Exposition:
+    """Builds the Prometheus text format one metric family at a time"""
+
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, kind, help_text):
+        self.lines.append(f'# HELP {name} {help_text}')
+        self.lines.append(f'# TYPE {name} {kind}')
+
+    def sample(self, name, value, labels=None):
+        self.lines.append(f'{name}{_labels(labels)} {_number(value)}')
+
+    def render(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+def _request_metrics(out, collected):
+    views = collected['views']
+    for key, name, help_text, scale in REQUEST_HISTOGRAMS:
+        out.family(name, 'histogram', help_text)
+        for view, entry in views.items():
+            histogram = entry[key]
+            for bound, total in histogram['buckets'].items():
+                upper = float('inf') if bound == '+Inf' else float(bound) / scale
+                out.sample(f'{name}_bucket', total, {'view': view, 'le': _number(upper)})
+            out.sample(f'{name}_sum', histogram['sum'] / scale, {'view': view})
+            out.sample(f'{name}_count', histogram['count'], {'view': view})
+
+    out.family('pos_http_requests_over_query_budget_total', 'counter', 'Requests above the query budget by view')
+    for view, entry in views.items():
+        out.sample('pos_http_requests_over_query_budget_total', entry['over_budget'], {'view': view})
+
+    out.family('pos_cache_requests_total', 'counter', 'API response cache lookups by namespace and result')
+    for namespace, counts in sorted(collected['cache'].items()):
+        for key, result in (('hits', 'hit'), ('misses', 'miss')):
+            out.sample('pos_cache_requests_total', counts.get(key, 0), {'namespace': namespace, 'result': result})
+
+    by_name = {}
+    for name, labels, value in collected['counters']:
+        by_name.setdefault(name, []).append((labels, value))
+    for name, (metric, help_text) in COUNTERS.items():
+        out.family(metric, 'counter', help_text)
+        for labels, value in by_name.get(name, [({}, 0)]):
+            out.sample(metric, value, labels)
+
+
+def _business_metrics(out):
+    from hotels.models import Room
+    from orders.models import KitchenDisplay, Order, Table
+
+    now = timezone.now()
+
+    out.family('pos_open_orders', 'gauge', 'Orders not yet completed or cancelled by status')
+    open_orders = (
+        Order.objects.exclude(status__in=['completed', 'cancelled'])
+        .values('status').annotate(total=Count('id')).order_by('status')
+    )
+    for row in open_orders:
+        out.sample('pos_open_orders', row['total'], {'status': row['status']})
+
+    out.family('pos_orders_per_minute', 'gauge', 'Orders created per minute over the last five minutes')
+    recent = Order.objects.filter(created_at__gte=now - timedelta(minutes=5)).count()
+    out.sample('pos_orders_per_minute', recent / 5)
+
+    backlog = list(
+        KitchenDisplay.objects.filter(completed_at__isnull=True)
+        .values('station')
+        .annotate(total=Count('id'), overdue=Count('id', filter=Q(estimated_completion__lt=now)))
+        .order_by('station')
+    )
+    out.family('pos_kitchen_backlog', 'gauge', 'Open kitchen tickets by station')
+    for row in backlog:
+        out.sample('pos_kitchen_backlog', row['total'], {'station': row['station']})
+    out.family('pos_kitchen_overdue_tickets', 'gauge', 'Open kitchen tickets past their estimated completion by station')
+    for row in backlog:
+        out.sample('pos_kitchen_overdue_tickets', row['overdue'], {'station': row['station']})
+
+    tables = Table.objects.filter(is_active=True).aggregate(
+        total=Count('id'), occupied=Count('id', filter=Q(is_occupied=True))
+    )
+    out.family('pos_table_occupancy_ratio', 'gauge', 'Share of active tables that are occupied')
+    out.sample('pos_table_occupancy_ratio', tables['occupied'] / tables['total'] if tables['total'] else 0.0)
+
+    rooms = Room.objects.filter(is_active=True).aggregate(
+        total=Count('id'), occupied=Count('id', filter=Q(status='occupied'))
+    )
+    out.family('pos_room_occupancy_ratio', 'gauge', 'Share of active rooms that are occupied')
+    out.sample('pos_room_occupancy_ratio', rooms['occupied'] / rooms['total'] if rooms['total'] else 0.0)
+
+
+def render_metrics():
+    """The full ``/metrics`` payload: request, cache and business metrics"""
+    out = Exposition()
+    _request_metrics(out, registry.collect())
+    _business_metrics(out)
+    return out.render()
@@ -0,0 +1,43 @@
+"""
+JSON renderer backed by orjson, with DRF's JSONRenderer as the fallback.
+
+orjson serialises dicts, lists, strings and datetimes natively and much
+faster than ``json.dumps``. Anything it does not know (``Decimal``, lazy
+strings, timedeltas, querysets ...) goes through DRF's own encoder, so the
+output is the same as ``rest_framework.renderers.JSONRenderer``'s with one
+exception: orjson writes NaN and infinite floats as ``null`` where DRF's
+strict renderer raises. Checking every response for them would cost more
+than orjson saves, and the API has no such floats to return (amounts are
+Decimals rendered as strings). Without orjson installed, or for indented
+output, the stdlib renderer is used.
+"""
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Kept escaped so the output is a strict JavaScript subset, as DRF does
+LINE_SEPARATORS = (('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029'))
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        pretty = not self.compact or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        if orjson is None or data is None or pretty or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            # Non-string keys (e.g. party sizes) become strings, as with json.dumps
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; let json.dumps have a go, or raise
+            return super().render(data, accepted_media_type, renderer_context)
+
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
@@ -0,0 +1,362 @@
+"""
+Bulk generator for realistic data volumes, used for load and query testing.
+
+Unlike the create_sample_* commands this builds rows in batches with
+``bulk_create`` and spreads them over a history window, so a few million
+rows take minutes rather than hours. ``save()`` and signals do not run:
+generated numbers, totals and normalised contacts are filled in here, and
+caches are invalidated once at the end.
+"""
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from hotels.models import Room, RoomBooking, RoomType
+from menu.models import Category, MenuItem
+from orders.models import Order, OrderItem, Table
+from reservations.contacts import normalize_email, normalize_phone
+from reservations.models import Customer, Reservation
+
+PREFIX = 'LD'
+PASSWORD = 'loadtest-123'
+EMAIL_DOMAIN = 'loadtest.example.com'
+
+DEFAULT_COUNTS = {
+    'users': 60,
+    'menu_items': 10_000,
+    'tables': 60,
+    'customers': 100_000,
+    'rooms': 500,
+    'orders': 1_000_000,
+    'reservations': 200_000,
+    'days': 730,
+}
+
+FIRST_NAMES = ['Amina', 'Brian', 'Cynthia', 'David', 'Esther', 'Felix', 'Grace', 'Hassan', 'Irene', 'James',
+               'Kevin', 'Lucy', 'Mercy', 'Njeri', 'Otieno', 'Peter', 'Rose', 'Samuel', 'Wanjiku', 'Zawadi']
+LAST_NAMES = ['Achieng', 'Barasa', 'Chebet', 'Kamau', 'Kariuki', 'Kiptoo', 'Mwangi', 'Njoroge', 'Ochieng',
+              'Odhiambo', 'Omondi', 'Otieno', 'Wafula', 'Wambui', 'Wekesa']
+DISHES = ['Nyama Choma', 'Pilau', 'Ugali', 'Sukuma Wiki', 'Tilapia', 'Chapati', 'Samosa', 'Mandazi',
+          'Githeri', 'Mukimo', 'Biryani', 'Kuku Paka', 'Matoke', 'Burger', 'Pizza', 'Salad', 'Juice', 'Chai']
+STYLES = ['Classic', 'Spicy', 'Grilled', 'Coastal', 'House', 'Garden', 'Chef\'s', 'Family', 'Mini', 'Large']
+SECTIONS = ['Main', 'Window', 'Patio', 'Bar', 'Private']
+STATIONS = ['Main Kitchen', 'Grill', 'Bar', 'Pastry']
+ROLES = ['waiter', 'kitchen', 'waiter', 'waiter', 'manager', 'waiter', 'kitchen', 'waiter']
+ROOM_TYPES = [
+    ('Standard', Decimal('6500.00'), 2),
+    ('Deluxe', Decimal('9500.00'), 2),
+    ('Family', Decimal('14000.00'), 4),
+    ('Executive', Decimal('18000.00'), 2),
+    ('Suite', Decimal('26000.00'), 4),
+]
+# Relative share of orders per hour of day: lunch and a dinner rush
+HOURLY_WEIGHTS = [0, 0, 0, 0, 0, 0, 1, 2, 3, 2, 2, 4, 8, 9, 6, 3, 3, 5, 9, 12, 12, 9, 5, 2]
+TAX_RATE = Decimal('0.16')
+
+
+class GenerationError(Exception):
+    pass
+
+
+@contextmanager
+def historic_timestamps(*models):
+    """Let ``bulk_create`` keep the created/updated times we set"""
+    changed = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                changed.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in changed:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Generator:
+    def __init__(self, counts=None, batch_size=5000, seed=None, log=None):
+        self.counts = {**DEFAULT_COUNTS, **(counts or {})}
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.log = log or (lambda message: None)
+        self.today = timezone.localdate()
+        self.start = self.today - timedelta(days=self.counts['days'])
+
+    def run(self):
+        if Order.objects.filter(order_number__startswith=f'{PREFIX}-').exists():
+            raise GenerationError('Load data has already been generated in this database')
+        with historic_timestamps(Customer, Order, OrderItem, Reservation, RoomBooking):
+            self.users = self.create_users()
+            self.menu_items = self.create_menu()
+            self.tables = self.create_tables()
+            self.customer_ids = self.create_customers()
+            self.rooms = self.create_rooms()
+            created = {
+                'users': len(self.users),
+                'menu_items': len(self.menu_items),
+                'tables': len(self.tables),
+                'customers': len(self.customer_ids),
+                'rooms': len(self.rooms),
+                'room_bookings': self.create_room_bookings(),
+                'reservations': self.create_reservations(),
+                'orders': self.create_orders(),
+            }
+        self.invalidate_caches()
+        return created
+
+    def _bulk(self, model, rows):
+        total = 0
+        for batch in batched(rows, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+            total += len(batch)
+            if total % (self.batch_size * 20) == 0:
+                self.log(f'  {model.__name__}: {total}')
+        return total
+
+    def _moment(self, day):
+        hour = self.random.choices(range(24), weights=HOURLY_WEIGHTS)[0]
+        moment = datetime.combine(day, time(hour, self.random.randrange(60), self.random.randrange(60)))
+        return timezone.make_aware(moment)
+
+    def _day(self, start=None, end=None):
+        start = start or self.start
+        end = end or self.today
+        return start + timedelta(days=self.random.randrange((end - start).days + 1))
+
+    def create_users(self):
+        User = get_user_model()
+        password = make_password(PASSWORD)  # hash once, share between all staff
+        users = [
+            User(
+                username=f'{PREFIX.lower()}staff{n}',
+                email=f'{PREFIX.lower()}staff{n}@{EMAIL_DOMAIN}',
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                role=ROLES[n % len(ROLES)],
+                password=password,
+            )
+            for n in range(self.counts['users'])
+        ]
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        self.log(f'Users: {len(users)} (password "{PASSWORD}")')
+        return list(User.objects.filter(username__startswith=f'{PREFIX.lower()}staff'))
+
+    def create_menu(self):
+        categories = Category.objects.bulk_create([
+            Category(name=f'{PREFIX} {dish}', sort_order=n) for n, dish in enumerate(DISHES)
+        ])
+        self._bulk(MenuItem, (
+            MenuItem(
+                name=f'{self.random.choice(STYLES)} {dish} {n}',
+                category=categories[n % len(categories)],
+                price=Decimal(self.random.randrange(150, 3500, 10)),
+                preparation_time=self.random.choice([5, 10, 15, 20, 30]),
+                stock_quantity=self.random.randrange(0, 200),
+                sort_order=n,
+            )
+            for n, dish in ((n, DISHES[n % len(DISHES)]) for n in range(self.counts['menu_items']))
+        ))
+        self.log(f'Menu items: {self.counts["menu_items"]}')
+        return list(MenuItem.objects.filter(category__in=categories).values_list('id', 'price'))
+
+    def create_tables(self):
+        tables = Table.objects.bulk_create([
+            Table(number=f'{PREFIX}{n}', capacity=self.random.choice([2, 2, 4, 4, 4, 6, 8]),
+                  section=SECTIONS[n % len(SECTIONS)])
+            for n in range(1, self.counts['tables'] + 1)
+        ])
+        self.log(f'Tables: {len(tables)}')
+        return list(Table.objects.filter(number__startswith=PREFIX))
+
+    def create_customers(self):
+        def customers():
+            for n in range(self.counts['customers']):
+                first, last = self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+                phone = f'07{n:08d}'
+                email = f'{first}.{last}.{n}@{EMAIL_DOMAIN}'.lower()
+                created = self._moment(self._day())
+                yield Customer(
+                    first_name=first, last_name=last, phone=phone, email=email,
+                    phone_normalized=normalize_phone(phone), email_normalized=normalize_email(email),
+                    created_at=created, updated_at=created,
+                )
+
+        self._bulk(Customer, customers())
+        self.log(f'Customers: {self.counts["customers"]}')
+        return list(Customer.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').values_list('id', flat=True))
+
+    def create_rooms(self):
+        room_types = []
+        for name, price, occupancy in ROOM_TYPES:
+            room_type, _ = RoomType.objects.get_or_create(
+                name=name, defaults={'base_price': price, 'max_occupancy': occupancy}
+            )
+            room_types.append(room_type)
+        rooms_per_floor = 25
+        Room.objects.bulk_create([
+            Room(
+                number=f'{PREFIX}{n // rooms_per_floor + 1}{n % rooms_per_floor + 1:02d}',
+                room_type=room_types[n % len(room_types)],
+                floor=n // rooms_per_floor + 1,
+            )
+            for n in range(self.counts['rooms'])
+        ], batch_size=self.batch_size)
+        self.log(f'Rooms: {self.counts["rooms"]}')
+        return list(Room.objects.filter(number__startswith=PREFIX).select_related('room_type'))
+
+    def create_room_bookings(self):
+        """Back-to-back stays per room from the start of the window to a month ahead"""
+        horizon = self.today + timedelta(days=30)
+
+        def bookings():
+            number = 0
+            for room in self.rooms:
+                day = self.start + timedelta(days=self.random.randrange(4))
+                while day < horizon:
+                    nights = self.random.choice([1, 1, 2, 2, 3, 4, 7])
+                    check_out = day + timedelta(days=nights)
+                    if check_out <= self.today:
+                        status = self.random.choice(['checked_out'] * 18 + ['cancelled', 'no_show'])
+                    elif day <= self.today:
+                        status = 'checked_in'
+                    else:
+                        status = self.random.choice(['confirmed', 'confirmed', 'pending'])
+                    charges = room.room_type.base_price * nights
+                    tax = (charges * TAX_RATE).quantize(Decimal('0.01'))
+                    created = self._moment(max(self.start, day - timedelta(days=self.random.randrange(30))))
+                    number += 1
+                    yield RoomBooking(
+                        booking_number=f'{PREFIX}B{number:09d}',
+                        customer_id=self.random.choice(self.customer_ids),
+                        room=room,
+                        check_in_date=day,
+                        check_out_date=check_out,
+                        nights=nights,
+                        adults=self.random.randint(1, room.room_type.max_occupancy),
+                        room_rate=room.room_type.base_price,
+                        total_room_charges=charges,
+                        tax_amount=tax,
+                        total_amount=charges + tax,
+                        status=status,
+                        reminder_sent=day <= self.today,
+                        created_at=created,
+                        updated_at=created,
+                    )
+                    day = check_out + timedelta(days=self.random.choice([0, 0, 1, 2, 3]))
+
+        total = self._bulk(RoomBooking, bookings())
+        self.log(f'Room bookings: {total}')
+        return total
+
+    def create_reservations(self):
+        horizon = self.today + timedelta(days=60)
+
+        def reservations():
+            for n in range(self.counts['reservations']):
+                day = self._day(end=horizon)
+                table = self.random.choice(self.tables)
+                created = self._moment(max(self.start, day - timedelta(days=self.random.randrange(14))))
+                if day < self.today:
+                    status = self.random.choice(['completed'] * 8 + ['cancelled', 'no_show'])
+                else:
+                    status = self.random.choice(['confirmed', 'confirmed', 'pending'])
+                yield Reservation(
+                    reservation_number=f'{PREFIX}R{n:09d}',
+                    customer_id=self.random.choice(self.customer_ids),
+                    date=day,
+                    time=time(self.random.choice([12, 13, 18, 19, 19, 20, 20, 21]), self.random.choice([0, 15, 30, 45])),
+                    party_size=self.random.randint(1, table.capacity),
+                    table=table if status != 'pending' else None,
+                    status=status,
+                    confirmation_sent=status != 'pending',
+                    reminder_sent=day < self.today,
+                    created_by=self.random.choice(self.users),
+                    created_at=created,
+                    updated_at=created,
+                )
+
+        total = self._bulk(Reservation, reservations())
+        self.log(f'Reservations: {total}')
+        return total
+
+    def create_orders(self):
+        """Orders with their items, one batch of orders (and its items) per transaction"""
+        waiters = [user for user in self.users if user.role == 'waiter'] or self.users
+        total = 0
+        for batch in batched(range(self.counts['orders']), self.batch_size):
+            orders, lines = [], []
+            for n in batch:
+                created = self._moment(self._day())
+                items = [
+                    (self.random.choice(self.menu_items), self.random.choice([1, 1, 1, 2, 3]))
+                    for _ in range(self.random.choice([1, 2, 2, 3, 3, 4, 5]))
+                ]
+                subtotal = sum((price * quantity for (_, price), quantity in items), Decimal('0.00'))
+                tax = (subtotal * TAX_RATE).quantize(Decimal('0.01'))
+                dine_in = self.random.random() < 0.7
+                recent = created.date() == self.today
+                status = self.random.choice(['pending', 'confirmed', 'preparing', 'ready', 'served']) if recent else (
+                    'cancelled' if self.random.random() < 0.03 else 'completed'
+                )
+                orders.append(Order(
+                    order_number=f'{PREFIX}-{n:09d}',
+                    order_type='dine_in' if dine_in else self.random.choice(['takeaway', 'delivery']),
+                    table=self.random.choice(self.tables) if dine_in else None,
+                    customer_id=self.random.choice(self.customer_ids) if self.random.random() < 0.3 else None,
+                    status=status,
+                    subtotal=subtotal,
+                    tax_amount=tax,
+                    total_amount=subtotal + tax,
+                    server=self.random.choice(waiters),
+                    created_at=created,
+                    updated_at=created,
+                    confirmed_at=created + timedelta(minutes=2) if status != 'pending' else None,
+                    completed_at=created + timedelta(minutes=self.random.randint(30, 120)) if status == 'completed' else None,
+                ))
+                lines.append((items, created, 'served' if status == 'completed' else 'pending'))
+
+            with transaction.atomic():
+                Order.objects.bulk_create(orders, batch_size=self.batch_size)
+                OrderItem.objects.bulk_create([
+                    OrderItem(
+                        order=order, menu_item_id=menu_item_id, quantity=quantity,
+                        unit_price=price, subtotal=price * quantity,
+                        status=item_status, created_at=created, updated_at=created,
+                    )
+                    for order, (items, created, item_status) in zip(orders, lines)
+                    for (menu_item_id, price), quantity in items
+                ], batch_size=self.batch_size)
+            total += len(orders)
+            if total % (self.batch_size * 20) == 0:
+                self.log(f'  Order: {total}')
+        self.log(f'Orders: {total}')
+        return total
+
+    def invalidate_caches(self):
+        from hotels import availability as room_availability
+        from maria_havens_pos.caching import invalidate_namespace
+        from reservations import availability as table_availability
+
+        for namespace in ('menu', 'tables', 'room_types'):
+            invalidate_namespace(namespace)
+        table_availability.invalidate_all()
+        room_availability.invalidate()
@@ -28,15 +28,18 @@ INSTALLED_APPS = [
     # 'import_export',
     
     # Local apps
+    'maria_havens_pos',
     'accounts',
     'menu',
     'orders',
     'reservations',
     'hotels',
+    'jobqueue',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'maria_havens_pos.metrics.QueryMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -67,13 +70,70 @@ TEMPLATES = [
 WSGI_APPLICATION = 'maria_havens_pos.wsgi.application'
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Production sets DATABASE_URL (e.g. postgres://pos:secret@db:5432/maria_havens)
+# and keeps connections open between requests. Without it the local SQLite
+# file is used, tuned by maria_havens_pos/db.py.
+DATABASE_URL = os.environ.get('DATABASE_URL')
+
+if DATABASE_URL:
+    import dj_database_url
+
+    DATABASES = {
+        'default': dj_database_url.parse(
+            DATABASE_URL,
+            conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            conn_health_checks=True,
+        )
+    }
+    if os.environ.get('DB_POOLER') == 'pgbouncer':
+        # Transaction pooling can't keep server-side cursors across queries
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+else:
+    DATABASES = {
+        'default': {
+            # django.db.backends.sqlite3 with BEGIN IMMEDIATE transactions
+            'ENGINE': 'maria_havens_pos.sqlite',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Seconds to wait for the write lock before "database is locked"
+                'timeout': 20,
+            },
+        }
     }
+
+# Applied to every new SQLite connection (see maria_havens_pos/db.py)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64000,  # negative means KiB, i.e. 64 MB of page cache
+    'temp_store': 'MEMORY',
 }
 
+# Cache
+# Local memory per process by default; set REDIS_URL to share one cache
+# between workers (e.g. redis://localhost:6379/1).
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'mhpos',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'maria-havens-pos',
+            'KEY_PREFIX': 'mhpos',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -122,13 +182,60 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50,
+    # orjson when installed, DRF's stdlib json otherwise (see renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'maria_havens_pos.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'maria_havens_pos.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
+# The signed-in user is cached only when the cache is shared: a save in one
+# worker can't drop another worker's local memory entry.
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.CachedUserBackend' if REDIS_URL else 'django.contrib.auth.backends.ModelBackend',
+]
+
 # Email Configuration (for development)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'Maria Havens <noreply@mariahavens.com>'
+
+# Audit log (UserActivity rows are written in the background).
+# AUDIT_LOG_MODE=sync writes them inline; the test runner does that itself.
+AUDIT_LOG = {
+    'MODE': os.environ.get('AUDIT_LOG_MODE', 'thread'),
+    'MAX_QUEUE': 10000,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 1.0,
+    'OVERFLOW': 'drop',
+}
+
+# Runs the suite with AUDIT_LOG['MODE'] = 'sync'
+TEST_RUNNER = 'maria_havens_pos.testing.TestRunner'
+
+# Per-request query/timing metrics (maria_havens_pos/metrics.py). Requests
+# over QUERY_BUDGET queries are logged; HEADERS defaults to DEBUG. With
+# several worker processes point METRICS_DIR at a directory they share so
+# /metrics reports all of them.
+REQUEST_METRICS = {
+    'QUERY_BUDGET': 30,
+    'DIRECTORY': os.environ.get('METRICS_DIR'),
+}
+
+# Bearer token Prometheus sends when scraping /metrics
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Individual activity rows older than this are rolled up into daily counts
+# by `manage.py prune_activity`, which also deletes stale sessions
+ACTIVITY_RETENTION_DAYS = 90
+SESSION_RETENTION_DAYS = 30
 
 # Logging
 LOGGING = {
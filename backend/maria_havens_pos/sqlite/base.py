@@ -0,0 +1,17 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend whose transactions start with ``BEGIN IMMEDIATE``.
+
+    A plain ``BEGIN`` takes the write lock only at the first write, so two
+    transactions that both read and then write can deadlock; SQLite resolves
+    that by failing one with "database is locked" straight away, without
+    honouring ``busy_timeout``. Taking the lock up front makes concurrent
+    writers wait their turn instead. Reads outside ``atomic()`` are not
+    affected.
+    """
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
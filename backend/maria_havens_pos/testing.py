@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+
+class TestRunner(DiscoverRunner):
+    """
+    The default runner, with audit rows written inline.
+
+    Tests assert on UserActivity and UserSession rows right after a request,
+    and TestCase transactions would block a background writer anyway. A
+    test can still use ``override_settings(AUDIT_LOG=...)`` for thread mode.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._audit_log = override_settings(AUDIT_LOG={**settings.AUDIT_LOG, 'MODE': 'sync'})
+        self._audit_log.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._audit_log.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+class QueryScalingMixin:
+    """
+    Assertions that an endpoint's query count does not grow with its data.
+
+    Each check calls the endpoint with ``rows`` rows seeded and again after
+    seeding up to ``rows * scale``; an N+1 shows up as a different count.
+    Response caches are cleared before every call so the queries run.
+    """
+    rows = 3
+    scale = 10
+
+    def api_client(self, user=None):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user=user)
+        return client
+
+    def count_queries(self, client, method, path, data=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, method)(path, data, format='json')
+        self.assertLess(response.status_code, 400, f'{method.upper()} {path}: {response.content[:300]!r}')
+        return [query['sql'] for query in queries.captured_queries]
+
+    def assertQueriesDoNotScale(self, client, path, seed, method='get', data=None, rows=None):
+        """``seed(count)`` adds ``count`` rows of whatever ``path`` lists"""
+        rows = rows or self.rows
+        seed(rows)
+        small = self.count_queries(client, method, path, data)
+        seed(rows * (self.scale - 1))
+        large = self.count_queries(client, method, path, data)
+        self.assertEqual(
+            len(small), len(large),
+            f'{method.upper()} {path} ran {len(small)} queries for {rows} rows but {len(large)} for '
+            f'{rows * self.scale}:\n' + '\n'.join(large)
+        )
+        return len(large)
+
+    def assertActionQueriesDoNotScale(self, client, make_path, seed, method='post', data=None, rows=None):
+        """
+        For actions that change their target: ``seed(count)`` builds a fresh
+        target with ``count`` related rows and returns it, and
+        ``make_path(target)`` is the URL to call.
+        """
+        rows = rows or self.rows
+        small = self.count_queries(client, method, make_path(seed(rows)), data)
+        path = make_path(seed(rows * self.scale))
+        large = self.count_queries(client, method, path, data)
+        self.assertEqual(
+            len(small), len(large),
+            f'{method.upper()} {path} ran {len(small)} queries for {rows} rows but {len(large)} '
+            f'for {rows * self.scale}:\n' + '\n'.join(large)
+        )
+        return len(large)
@@ -0,0 +1,647 @@
+import json
+import os
+import tempfile
+import threading
+import time as time_module
+import io
+import uuid
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError, connections, transaction
+from django.db.models import Count
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from unittest import mock
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework import status
+from hotels.models import Room, RoomBooking
+from hotels.serializers import RoomBookingSummarySerializer
+from hotels.views import RoomBookingViewSet
+from menu.models import Category, MenuItem
+from menu.serializers import MenuItemListSerializer
+from menu.views import MenuItemViewSet
+from orders.models import KitchenDisplay, Order, OrderItem, Table
+from orders.serializers import OrderSummarySerializer, OrderSummaryValuesSerializer
+from orders.views import OrderViewSet
+from reservations.contacts import normalize_phone
+from reservations.models import Customer, Reservation
+from reservations.serializers import ReservationSummarySerializer
+from reservations.views import ReservationViewSet
+from . import parsers, renderers
+from .caching import cache_stats, reset_cache_stats
+from .metrics import Histogram, registry
+from .sample_data import GenerationError, Generator
+from .values_serializers import ValuesSerializer
+
+User = get_user_model()
+
+
+class SQLiteConcurrencyTestCase(SimpleTestCase):
+    """Concurrent writers against an on-disk SQLite file"""
+    alias = 'concurrency'
+    writers = 20
+    transactions = 25
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'concurrency.sqlite3')
+        self.addCleanup(self.remove_database)
+
+    def remove_database(self):
+        if self.alias in connections.settings:
+            connections[self.alias].close()
+            del connections[self.alias]
+            del connections.settings[self.alias]
+
+    def configure(self, engine):
+        connections.settings[self.alias] = {
+            **connections.settings['default'],
+            'ENGINE': engine,
+            'NAME': self.path,
+        }
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('CREATE TABLE IF NOT EXISTS counter (id INTEGER PRIMARY KEY, value INTEGER)')
+            cursor.execute('INSERT OR REPLACE INTO counter (id, value) VALUES (1, 0)')
+
+    def run_writers(self):
+        """Each writer reads the counter and writes it back in one transaction"""
+        errors = []
+        start = threading.Barrier(self.writers)
+
+        def write():
+            connection = connections[self.alias]
+            try:
+                start.wait()
+                for _ in range(self.transactions):
+                    try:
+                        with transaction.atomic(using=self.alias):
+                            with connection.cursor() as cursor:
+                                cursor.execute('SELECT value FROM counter WHERE id = 1')
+                                value = cursor.fetchone()[0]
+                                cursor.execute('UPDATE counter SET value = %s WHERE id = 1', [value + 1])
+                    except OperationalError as exc:
+                        errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=write) for _ in range(self.writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('SELECT value FROM counter WHERE id = 1')
+            return cursor.fetchone()[0], errors
+
+    def test_pragmas_applied(self):
+        """Test new connections pick up WAL and the busy timeout"""
+        self.configure('maria_havens_pos.sqlite')
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertGreater(cursor.fetchone()[0], 0)
+
+    def test_immediate_transactions_have_no_lock_errors(self):
+        """Test 20 concurrent read-then-write writers all succeed"""
+        self.configure('maria_havens_pos.sqlite')
+
+        value, errors = self.run_writers()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(value, self.writers * self.transactions)
+
+    def run_interleaved(self):
+        """
+        Two transactions that read, then write: ``first`` reads, ``second``
+        reads, writes and commits, then ``first`` writes.
+        """
+        errors = []
+        first_read = threading.Event()
+        second_done = threading.Event()
+
+        def increment(before_write=None, after_read=None):
+            connection = connections[self.alias]
+            try:
+                with transaction.atomic(using=self.alias):
+                    with connection.cursor() as cursor:
+                        cursor.execute('SELECT value FROM counter WHERE id = 1')
+                        value = cursor.fetchone()[0]
+                        if after_read:
+                            after_read.set()
+                        if before_write:
+                            # With BEGIN IMMEDIATE the second writer is queued behind us
+                            before_write.wait(timeout=0.5)
+                        cursor.execute('UPDATE counter SET value = %s WHERE id = 1', [value + 1])
+            except OperationalError as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        def second():
+            first_read.wait()
+            increment()
+            second_done.set()
+
+        threads = [
+            threading.Thread(target=increment, kwargs={'before_write': second_done, 'after_read': first_read}),
+            threading.Thread(target=second),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('SELECT value FROM counter WHERE id = 1')
+            return cursor.fetchone()[0], errors
+
+    def test_deferred_transactions_hit_lock_errors(self):
+        """Test the stock backend fails a read-then-write race despite busy_timeout"""
+        self.configure('django.db.backends.sqlite3')
+
+        value, errors = self.run_interleaved()
+
+        self.assertEqual(len(errors), 1)
+        self.assertIn('locked', str(errors[0]))
+        self.assertEqual(value, 1)
+
+    def test_immediate_transactions_serialise_the_race(self):
+        """Test the same race succeeds with BEGIN IMMEDIATE"""
+        self.configure('maria_havens_pos.sqlite')
+
+        value, errors = self.run_interleaved()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(value, 2)
+
+
+class CachedViewSetTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        reset_cache_stats()
+        self.client = APIClient()
+        self.category = Category.objects.create(name='Mains', sort_order=1)
+        self.table = Table.objects.create(number='T1', capacity=4)
+
+    def test_second_list_served_from_cache(self):
+        """Test a repeated list request makes no queries"""
+        first = self.client.get('/api/menu/categories/')
+
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/menu/categories/')
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(cache_stats()['menu'], {'hits': 1, 'misses': 1})
+
+    def test_query_params_are_part_of_key(self):
+        """Test different filters are cached separately"""
+        self.client.get('/api/menu/categories/')
+        response = self.client.get('/api/menu/categories/', {'search': 'Mains'})
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_save_invalidates(self):
+        """Test saving a model drops cached responses"""
+        self.client.get(f'/api/menu/categories/{self.category.id}/')
+        self.category.name = 'Grills'
+        self.category.save()
+
+        response = self.client.get(f'/api/menu/categories/{self.category.id}/')
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['name'], 'Grills')
+
+    def test_table_status_change_invalidates(self):
+        """Test occupying a table is visible in the cached table"""
+        self.client.get(f'/api/orders/tables/{self.table.id}/')
+        self.client.post(f'/api/orders/tables/{self.table.id}/occupy/')
+
+        response = self.client.get(f'/api/orders/tables/{self.table.id}/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertTrue(response.data['is_occupied'])
+
+    def test_delete_invalidates(self):
+        """Test deleting a model drops cached lists"""
+        self.client.get('/api/orders/tables/')
+        self.table.delete()
+
+        response = self.client.get('/api/orders/tables/')
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+
+class QueryMetricsMiddlewareTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        registry.reset()
+        self.client = APIClient()
+        for number in range(3):
+            Table.objects.create(number=f'T{number}', capacity=4)
+
+    @override_settings(REQUEST_METRICS={'HEADERS': True})
+    def test_debug_headers(self):
+        """Test query count and timings are returned as headers"""
+        response = self.client.get('/api/orders/tables/')
+
+        self.assertGreater(int(response['X-DB-Queries']), 0)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+
+    def test_no_headers_by_default_outside_debug(self):
+        """Test headers stay off when DEBUG is off"""
+        response = self.client.get('/api/orders/tables/')
+
+        self.assertNotIn('X-DB-Queries', response)
+
+    def test_requests_aggregated_per_view(self):
+        """Test measurements are grouped by route"""
+        self.client.get('/api/orders/tables/')
+        self.client.get('/api/orders/tables/')
+        self.client.get(f'/api/orders/tables/{Table.objects.first().id}/')
+
+        views = registry.snapshot()
+        listing = views['GET /api/orders/tables/']
+        self.assertEqual(listing['requests'], 2)
+        self.assertEqual(listing['total_ms']['count'], 2)
+        self.assertGreater(listing['response_bytes']['sum'], 0)
+        self.assertIn('GET /api/orders/tables/<pk>/', views)
+
+    @override_settings(REQUEST_METRICS={'QUERY_BUDGET': 0, 'HEADERS': True})
+    def test_over_budget_flagged(self):
+        """Test requests above the query budget are counted and flagged"""
+        with self.assertLogs('maria_havens_pos', level='WARNING'):
+            response = self.client.get('/api/orders/tables/')
+
+        self.assertEqual(response['X-Query-Budget-Exceeded'], '0')
+        self.assertEqual(registry.snapshot()['GET /api/orders/tables/']['over_budget'], 1)
+
+    def test_metrics_endpoint_requires_manager(self):
+        """Test only managers can read the metrics"""
+        self.client.get('/api/orders/tables/')
+        self.assertEqual(self.client.get('/api/metrics/').status_code, status.HTTP_403_FORBIDDEN)
+
+        manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='testpass123', role='manager'
+        )
+        self.client.force_authenticate(user=manager)
+        response = self.client.get('/api/metrics/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('GET /api/orders/tables/', response.data['views'])
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test observations land in the first bucket that fits"""
+        histogram = Histogram((1, 5, 10))
+        for value in (0.5, 3, 3, 7, 50):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative(), [(1, 1), (5, 3), (10, 4), (float('inf'), 5)])
+        self.assertEqual(histogram.count, 5)
+
+
+class PrometheusMetricsTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        registry.reset()
+        reset_cache_stats()
+        self.client = APIClient()
+        self.tables = [Table.objects.create(number=f'T{number}', capacity=4) for number in range(2)]
+        self.tables[0].is_occupied = True
+        self.tables[0].save()
+
+        category = Category.objects.create(name='Mains')
+        dish = MenuItem.objects.create(name='Nyama Choma', category=category, price=Decimal('900.00'))
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(order_type='dine_in', status='preparing')
+        item = OrderItem.objects.create(order=order, menu_item=dish, quantity=1, unit_price=dish.price)
+        KitchenDisplay.objects.create(
+            order_item=item, station='Grill', estimated_completion=timezone.now() - timedelta(minutes=5)
+        )
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_token_required(self):
+        """Test the scrape endpoint checks the bearer token"""
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_exposition_contents(self):
+        """Test request, cache and business metrics are exported"""
+        self.client.get('/api/orders/tables/')
+        self.client.get('/api/orders/tables/')
+
+        body = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret').content.decode()
+
+        self.assertIn('# TYPE pos_http_request_duration_seconds histogram', body)
+        self.assertIn('pos_http_request_duration_seconds_count{view="GET /api/orders/tables/"} 2', body)
+        self.assertIn('pos_cache_requests_total{namespace="tables",result="hit"} 1', body)
+        self.assertIn('pos_orders_created_total{order_type="dine_in"} 1', body)
+        self.assertIn('pos_open_orders{status="preparing"} 1', body)
+        self.assertIn('pos_kitchen_backlog{station="Grill"} 1', body)
+        self.assertIn('pos_kitchen_overdue_tickets{station="Grill"} 1', body)
+        self.assertIn('pos_table_occupancy_ratio 0.5', body)
+
+    def test_workers_aggregated_through_directory(self):
+        """Test snapshots from other workers in the shared directory are summed"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with override_settings(REQUEST_METRICS={'DIRECTORY': directory.name}), \
+                mock.patch.object(registry, 'maybe_export'):
+            self.client.get('/api/orders/tables/')
+            registry.export(directory.name)
+            with open(os.path.join(directory.name, 'metrics-1.json'), 'w') as handle:
+                json.dump(
+                    {'views': registry.snapshot(), 'counters': [['orders_created', {}, 4]], 'cache': {}},
+                    handle
+                )
+
+            collected = registry.collect()
+
+        self.assertEqual(collected['views']['GET /api/orders/tables/']['requests'], 2)
+        self.assertIn(['orders_created', {}, 4], collected['counters'])
+
+    def test_exporter_thread_refreshes_file(self):
+        """Test each worker keeps its file fresh from a background thread until DIRECTORY goes"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with override_settings(REQUEST_METRICS={'DIRECTORY': directory.name, 'EXPORT_INTERVAL': 0.01}):
+            registry.maybe_export()
+            exporter = registry._exporter[1]
+            for _ in range(500):
+                exported = [name for name in os.listdir(directory.name) if name.endswith('.json')]
+                if exported:
+                    break
+                time_module.sleep(0.01)
+            self.assertEqual(len(exported), 1)
+
+        exporter.join(timeout=5)
+        self.assertFalse(exporter.is_alive())
+
+    def test_stale_worker_files_dropped(self):
+        """Test a file its worker stopped refreshing is neither summed nor kept"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        stale = os.path.join(directory.name, 'metrics-1234.json')
+        with open(stale, 'w') as handle:
+            json.dump({'views': {}, 'counters': [['orders_created', {}, 4]], 'cache': {}}, handle)
+        an_hour_ago = time_module.time() - 3600
+        os.utime(stale, (an_hour_ago, an_hour_ago))
+
+        with override_settings(REQUEST_METRICS={'DIRECTORY': directory.name}):
+            collected = registry.collect()
+
+        self.assertNotIn(['orders_created', {}, 4], collected['counters'])
+        self.assertFalse(os.path.exists(stale))
+        # This process's own file is named per process, not per PID
+        self.assertEqual(len(os.listdir(directory.name)), 1)
+        self.assertNotIn(str(os.getpid()), os.listdir(directory.name)[0])
+
+    def test_rolled_back_order_not_counted(self):
+        """Test orders_created only counts committed orders"""
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Order.objects.create(order_type='takeaway')
+                    raise RuntimeError('payment failed')
+            except RuntimeError:
+                pass
+
+        self.assertNotIn('takeaway', [labels.get('order_type') for _, labels, _ in registry.counters()])
+
+
+class LoadDataGeneratorTestCase(TestCase):
+    counts = {
+        'users': 4, 'menu_items': 30, 'tables': 6, 'customers': 40,
+        'rooms': 5, 'orders': 120, 'reservations': 25, 'days': 30,
+    }
+
+    def test_generates_requested_volumes(self):
+        """Test the generator creates the requested rows with consistent totals"""
+        created = Generator(counts=self.counts, batch_size=50, seed=1).run()
+
+        self.assertEqual(created['orders'], 120)
+        self.assertEqual(Order.objects.count(), 120)
+        self.assertEqual(MenuItem.objects.count(), 30)
+        self.assertEqual(Customer.objects.count(), 40)
+        self.assertEqual(Room.objects.count(), 5)
+        self.assertGreater(RoomBooking.objects.count(), 5)
+        self.assertEqual(Reservation.objects.count(), 25)
+
+        order = Order.objects.prefetch_related('items').first()
+        self.assertEqual(order.subtotal, sum(item.subtotal for item in order.items.all()))
+        customer = Customer.objects.first()
+        self.assertEqual(customer.phone_normalized, normalize_phone(customer.phone))
+        oldest = Order.objects.order_by('created_at').first().created_at
+        self.assertLess(oldest, timezone.now() - timedelta(days=7))
+        # auto_now_add is restored afterwards
+        self.assertTrue(Order._meta.get_field('created_at').auto_now_add)
+
+    def test_refuses_to_run_twice(self):
+        """Test a second run does not collide with the first one's numbers"""
+        Generator(counts=self.counts, seed=1).run()
+
+        with self.assertRaises(GenerationError):
+            Generator(counts=self.counts, seed=2).run()
+
+
+class ValuesSerializerTestCase(TestCase):
+    """Values serializers render list endpoints exactly like their ModelSerializers"""
+    counts = {
+        'users': 4, 'menu_items': 30, 'tables': 6, 'customers': 40,
+        'rooms': 5, 'orders': 60, 'reservations': 40, 'days': 30,
+    }
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        Generator(counts=self.counts, batch_size=50, seed=3).run()
+        MenuItem.objects.filter(pk=MenuItem.objects.first().pk).update(image='menu_items/ugali.jpg')
+        self.manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='testpass123', role='manager'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+
+    def assertSameList(self, viewset, path):
+        fast = self.client.get(path)
+        cache.clear()
+        with mock.patch.object(viewset, 'values_serializer_class', None):
+            slow = self.client.get(path)
+
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertGreater(len(fast.data['results']), 0)
+        self.assertEqual(fast.data, slow.data)
+        self.assertEqual(fast.content, slow.content)
+
+    def test_order_list(self):
+        """Test the order list, including orders without a table"""
+        self.assertTrue(Order.objects.filter(table__isnull=True).exists())
+        self.assertSameList(OrderViewSet, '/api/orders/orders/?page=2')
+        self.assertSameList(OrderViewSet, '/api/orders/orders/?ordering=total_amount&search=LD')
+
+    def test_menu_item_list(self):
+        """Test the menu item list, including image URLs"""
+        self.assertSameList(MenuItemViewSet, '/api/menu/items/?ordering=-price')
+        self.assertSameList(MenuItemViewSet, '/api/menu/items/?search=Ugali')
+
+    def test_room_booking_list(self):
+        """Test the room booking list"""
+        self.assertSameList(RoomBookingViewSet, '/api/hotels/bookings/')
+
+    def test_reservation_list(self):
+        """Test the reservation list, including reservations without a table"""
+        self.assertTrue(Reservation.objects.filter(table__isnull=True).exists())
+        self.assertSameList(ReservationViewSet, '/api/reservations/reservations/')
+
+    def test_matches_serializers_in_other_time_zones(self):
+        """Test datetimes follow the active time zone like DRF does"""
+        cases = [
+            (OrderSummarySerializer, Order.objects.select_related('table').annotate(items_count=Count('items'))),
+            (MenuItemListSerializer, MenuItem.objects.select_related('category')),
+            (RoomBookingSummarySerializer, RoomBooking.objects.select_related('customer', 'room')),
+            (ReservationSummarySerializer, Reservation.objects.select_related('customer', 'table')),
+        ]
+        views = {
+            OrderSummarySerializer: OrderViewSet, MenuItemListSerializer: MenuItemViewSet,
+            RoomBookingSummarySerializer: RoomBookingViewSet, ReservationSummarySerializer: ReservationViewSet,
+        }
+        for time_zone in ('UTC', 'America/New_York'):
+            with timezone.override(time_zone):
+                for serializer_class, queryset in cases:
+                    values_serializer = views[serializer_class].values_serializer_class
+                    with self.subTest(serializer_class.__name__, time_zone=time_zone):
+                        self.assertEqual(
+                            values_serializer(queryset.values(*values_serializer.lookups())).data,
+                            serializer_class(queryset, many=True).data
+                        )
+
+    def test_rejects_fields_it_cannot_compile(self):
+        """Test a property or method field has to be declared in computed"""
+        class Summary(OrderSummarySerializer):
+            server_name = serializers.SerializerMethodField()
+
+            class Meta(OrderSummarySerializer.Meta):
+                fields = OrderSummarySerializer.Meta.fields + ['server_name']
+
+            def get_server_name(self, obj):
+                return str(obj.server)
+
+        class SummaryValues(ValuesSerializer):
+            serializer_class = Summary
+            annotations = OrderSummaryValuesSerializer.annotations
+
+        with self.assertRaises(ImproperlyConfigured):
+            SummaryValues.lookups()
+
+        SummaryValues.computed = {'server_name': (('server__username',), str)}
+        self.assertIn('server__username', SummaryValues.lookups())
+
+
+class FastJSONTestCase(TestCase):
+    """The orjson renderer and parser behave like DRF's stdlib ones"""
+
+    def payload(self):
+        nairobi = timezone.get_fixed_timezone(180)
+        return {
+            'total': Decimal('1234.50'),
+            'created_at': datetime(2024, 3, 1, 18, 30, 5, 120000, tzinfo=dt_timezone.utc),
+            'local': datetime(2024, 3, 1, 21, 30, tzinfo=nairobi),
+            'naive': datetime(2024, 3, 1, 21, 30),
+            'date': date(2024, 3, 1),
+            'time': time(19, 45, 30, 500),
+            'duration': timedelta(minutes=90),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'label': gettext_lazy('Confirmed'),
+            'by_size': {2: 4, 4: 1},
+            'note': 'Table by the window\u2028please \u2014 asante',
+            'rows': [{'price': Decimal('0.10'), 'tags': ('spicy', 'vegan')}],
+            'empty': None,
+        }
+
+    def test_renders_like_drf(self):
+        """Test the output is byte-for-byte what JSONRenderer produces"""
+        rendered = renderers.FastJSONRenderer().render(self.payload())
+
+        self.assertEqual(rendered, JSONRenderer().render(self.payload()))
+        self.assertIn(b'\\u2028', rendered)
+
+    def test_indented_and_fallback_output(self):
+        """Test indented output and installs without orjson use the stdlib renderer"""
+        indented = renderers.FastJSONRenderer().render(self.payload(), 'application/json; indent=4')
+        self.assertEqual(indented, JSONRenderer().render(self.payload(), 'application/json; indent=4'))
+
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(renderers.FastJSONRenderer().render(self.payload()), JSONRenderer().render(self.payload()))
+
+    def test_non_finite_floats_render_as_null(self):
+        """Test NaN and infinities become null, where JSONRenderer raises"""
+        data = {'rows': [float('nan'), float('inf')]}
+
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+        self.assertEqual(renderers.FastJSONRenderer().render(data), b'{"rows":[null,null]}')
+
+    def test_parses_like_drf(self):
+        """Test request bodies parse the same and errors become ParseError"""
+        body = b'{"items": [{"menu_item_id": 1, "quantity": 2}], "note": "\xc3\xa9", "price": 12.5}'
+
+        self.assertEqual(
+            parsers.FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body))
+        )
+        for invalid in (b'{"items": [', b'{"amount": NaN}', b''):
+            with self.assertRaises(ParseError):
+                parsers.FastJSONParser().parse(io.BytesIO(invalid))
+
+        with mock.patch.object(parsers, 'orjson', None):
+            self.assertEqual(parsers.FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+    def test_large_numbers_parse_like_drf(self):
+        """Test integers beyond 64 bits stay exact and huge exponents parse as the stdlib does"""
+        for body in (b'{"id": 123456789012345678901234567890}', b'[-9223372036854775809]', b'{"x": 1e400}'):
+            self.assertEqual(
+                parsers.FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body))
+            )
+        parsed = parsers.FastJSONParser().parse(io.BytesIO(b'{"id": 123456789012345678901234567890}'))
+        self.assertEqual(parsed['id'], 123456789012345678901234567890)
+
+    def test_api_uses_fast_json(self):
+        """Test API responses and request bodies go through the configured classes"""
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(
+            username='manager', email='manager@example.com', password='testpass123', role='manager'
+        ))
+
+        response = client.post(
+            '/api/menu/categories/', '{"name": "Grill"}', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsInstance(response.accepted_renderer, renderers.FastJSONRenderer)
+        self.assertEqual(json.loads(response.content)['name'], 'Grill')
+
+        response = client.post('/api/menu/categories/', '{"name": ', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
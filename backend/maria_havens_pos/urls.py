@@ -3,6 +3,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
+from . import views
 # backend/maria_havens_pos/urls.py
 from django.contrib import admin
 from django.urls import path, include
@@ -22,6 +23,8 @@ urlpatterns = [
     path('api/orders/', include('orders.urls')),
     path('api/reservations/', include('reservations.urls')),
     path('api/hotels/', include('hotels.urls')),
+    path('api/metrics/', views.request_metrics, name='request_metrics'),
+    path('metrics', views.prometheus_metrics, name='prometheus_metrics'),
     path('api/', include(router.urls)),
 ]
 
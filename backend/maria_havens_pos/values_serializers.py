@@ -0,0 +1,258 @@
+"""
+Read-only list serializers that render ``QuerySet.values()`` rows.
+
+A ``ModelSerializer`` builds a model instance per row and then calls
+``get_attribute`` and ``to_representation`` on every field of it. For long
+lists that dominates the request. A ``ValuesSerializer`` is compiled once
+from the ``ModelSerializer`` it stands in for: every field becomes a
+``values()`` lookup plus a precomputed converter, so a row is one dict
+comprehension over plain getters and the output matches the original.
+
+Fields whose source is a property rather than a column are declared in
+``computed`` as ``name: (lookups, function)``; fields the viewset's
+queryset annotates are listed in ``annotations``.
+"""
+import datetime
+import decimal
+from functools import cached_property
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import fields as drf_fields
+from rest_framework.fields import empty
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+# Returned by a guarded getter for a field DRF would leave out
+_SKIP = object()
+
+
+class ValuesSerializer:
+    serializer_class = None
+    computed = {}
+    annotations = ()
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.context = context or {}
+
+    @classmethod
+    def lookups(cls):
+        """Everything to pass to ``values()``"""
+        return cls._compiled()[1]
+
+    @classmethod
+    def _compiled(cls):
+        # Per class, not inherited from a parent's compilation
+        if '_fields' not in cls.__dict__:
+            fields = [_compile_field(cls, name, field) for name, field in cls.serializer_class().fields.items()
+                      if not field.write_only]
+            lookups = dict.fromkeys(
+                lookup for _, kind, lookup, _, guards in fields
+                for lookup in ([*lookup] if kind == 'computed' else [lookup, *guards])
+            )
+            cls._fields = (fields, tuple(lookups))
+        return cls._fields
+
+    @cached_property
+    def _getters(self):
+        """``(name, getter)`` for each field, given this serializer's context"""
+        getters = []
+        for name, kind, lookup, params, guards in self._compiled()[0]:
+            if kind == 'computed':
+                getter = _computed_getter(lookup, params)
+            else:
+                convert = _converter(kind, params, self.context)
+                getter = itemgetter(lookup) if convert is None else _converted_getter(lookup, convert)
+            if guards:
+                getter = _guarded_getter(getter, guards)
+            getters.append((name, getter))
+        return getters
+
+    @cached_property
+    def _has_guards(self):
+        return any(guards for *_, guards in self._compiled()[0])
+
+    def to_representation(self, row):
+        if self._has_guards:
+            return {name: value for name, get in self._getters if (value := get(row)) is not _SKIP}
+        return {name: get(row) for name, get in self._getters}
+
+    @property
+    def data(self):
+        getters = self._getters
+        if self._has_guards:
+            return [
+                {name: value for name, get in getters if (value := get(row)) is not _SKIP}
+                for row in self.rows
+            ]
+        return [{name: get(row) for name, get in getters} for row in self.rows]
+
+
+class ValuesListMixin:
+    """
+    Render ``list`` with ``values_serializer_class`` when a viewset sets one.
+
+    Filtering, ordering and pagination work as before; only the rows are
+    fetched with ``values()`` and rendered without model instances.
+    """
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.values_serializer_class
+        if serializer_class is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        queryset = queryset.values(*serializer_class.lookups())
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer_class(page, context=context).data)
+        return Response(serializer_class(queryset, context=context).data)
+
+
+def _compile_field(cls, name, field):
+    """``(name, kind, lookup, params, guards)`` for one serializer field"""
+    if name in cls.computed:
+        lookups, function = cls.computed[name]
+        return name, 'computed', tuple(lookups), function, ()
+    if name in cls.annotations:
+        return name, 'plain', field.source, None, ()
+
+    if isinstance(field, (drf_fields.SerializerMethodField, drf_fields.HiddenField)) or not field.source_attrs:
+        raise ImproperlyConfigured(f'{cls.__name__}: declare {name!r} in computed')
+
+    model = cls.serializer_class.Meta.model
+    guards = []
+    for depth, attr in enumerate(field.source_attrs):
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(
+                f'{cls.__name__}: {name!r} reads {field.source!r}, which is not a column; declare it in computed'
+            )
+        if depth < len(field.source_attrs) - 1:
+            if not model_field.is_relation or model_field.many_to_many or model_field.one_to_many:
+                raise ImproperlyConfigured(f'{cls.__name__}: cannot follow {field.source!r} for {name!r}')
+            if model_field.null and field.default is empty and not field.allow_null:
+                guards.append('__'.join(field.source_attrs[:depth + 1]))
+            model = model_field.related_model
+    lookup = '__'.join(field.source_attrs)
+
+    if isinstance(field, drf_fields.DecimalField):
+        coerce = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        if field.localize:
+            raise ImproperlyConfigured(f'{cls.__name__}: localized decimal {name!r} is not supported')
+        params = (field.decimal_places, field.max_digits, field.rounding, coerce)
+        return name, 'decimal', lookup, params, tuple(guards)
+    if isinstance(field, drf_fields.DateTimeField):
+        return name, 'datetime', lookup, (getattr(field, 'format', api_settings.DATETIME_FORMAT),
+                                          getattr(field, 'timezone', empty)), tuple(guards)
+    if isinstance(field, (drf_fields.DateField, drf_fields.TimeField)):
+        default = api_settings.DATE_FORMAT if isinstance(field, drf_fields.DateField) else api_settings.TIME_FORMAT
+        return name, 'temporal', lookup, getattr(field, 'format', default), tuple(guards)
+    if isinstance(field, drf_fields.FileField):
+        use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+        return name, 'file', lookup, (use_url, model_field.storage), tuple(guards)
+    if isinstance(field, (drf_fields.ReadOnlyField, drf_fields.CharField, drf_fields.IntegerField,
+                          drf_fields.BooleanField, drf_fields.ChoiceField, drf_fields.FloatField,
+                          drf_fields.JSONField, PrimaryKeyRelatedField)):
+        # Database values already come back as what these fields output
+        return name, 'plain', lookup, None, tuple(guards)
+    raise ImproperlyConfigured(
+        f'{cls.__name__}: {type(field).__name__} {name!r} is not supported; declare it in computed'
+    )
+
+
+def _converter(kind, params, context):
+    """A function of one non-null value, or None when values pass through"""
+    if kind == 'plain':
+        return None
+
+    if kind == 'decimal':
+        places, max_digits, rounding, coerce = params
+        exponent = decimal.Decimal('.1') ** places if places is not None else None
+        arithmetic = decimal.getcontext().copy()
+        if max_digits is not None:
+            arithmetic.prec = max_digits
+
+        def convert(value):
+            if not isinstance(value, decimal.Decimal):
+                value = decimal.Decimal(str(value).strip())
+            if exponent is not None:
+                value = value.quantize(exponent, rounding=rounding, context=arithmetic)
+            return '{:f}'.format(value) if coerce else value
+        return convert
+
+    if kind == 'datetime':
+        output_format, field_timezone = params
+        if output_format is None:
+            return None
+        if field_timezone is empty:
+            field_timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+
+        def convert(value):
+            if isinstance(value, str):
+                return value
+            if field_timezone is not None:
+                value = value.astimezone(field_timezone) if timezone.is_aware(value) else (
+                    timezone.make_aware(value, field_timezone)
+                )
+            elif timezone.is_aware(value):
+                value = timezone.make_naive(value, datetime.timezone.utc)
+            if output_format.lower() == ISO_8601:
+                value = value.isoformat()
+                return value[:-6] + 'Z' if value.endswith('+00:00') else value
+            return value.strftime(output_format)
+        return convert
+
+    if kind == 'temporal':
+        output_format = params
+        if output_format is None:
+            return None
+        if output_format.lower() == ISO_8601:
+            return lambda value: value if isinstance(value, str) else value.isoformat()
+        return lambda value: value if isinstance(value, str) else value.strftime(output_format)
+
+    if kind == 'file':
+        use_url, storage = params
+        if not use_url:
+            return lambda value: value or None
+        request = context.get('request')
+
+        def convert(value):
+            if not value:
+                return None
+            url = storage.url(value)
+            return request.build_absolute_uri(url) if request is not None else url
+        return convert
+
+    raise ValueError(kind)
+
+
+def _guarded_getter(get, guards):
+    """DRF leaves a dotted field out when a relation on the way is null"""
+    def guarded(row):
+        for guard in guards:
+            if row[guard] is None:
+                return _SKIP
+        return get(row)
+    return guarded
+
+
+def _converted_getter(lookup, convert):
+    def get(row):
+        value = row[lookup]
+        return None if value is None else convert(value)
+    return get
+
+
+def _computed_getter(lookups, function):
+    if len(lookups) == 1:
+        lookup, = lookups
+        return lambda row: function(row[lookup])
+    return lambda row: function(*[row[lookup] for lookup in lookups])
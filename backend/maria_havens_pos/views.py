@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from accounts.permissions import IsAdminOrManager
+from .caching import cache_stats
+from .metrics import get_config, registry
+from .prometheus import CONTENT_TYPE, render_metrics
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminOrManager])
+def request_metrics(request):
+    """Per-view query, timing and size histograms for this process"""
+    return Response({
+        'query_budget': get_config()['QUERY_BUDGET'],
+        'views': registry.snapshot(),
+        'cache': cache_stats(),
+    })
+
+
+def prometheus_metrics(request):
+    """
+    Prometheus scrape endpoint.
+
+    With METRICS_TOKEN set the scraper must send it as a bearer token;
+    without one the endpoint is only open under DEBUG or to signed-in
+    admins and managers.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        allowed = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        user = request.user
+        allowed = settings.DEBUG or (user.is_authenticated and user.can_access_admin())
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from maria_havens_pos.values_serializers import ValuesSerializer
 from .models import (
     Category, MenuItem, MenuItemVariation, MenuItemAddOn, 
     MenuItemAddOnRelation, Recipe, RecipeIngredient, MenuDiscount
@@ -16,7 +17,10 @@ class CategorySerializer(serializers.ModelSerializer):
         ]
     
     def get_items_count(self, obj):
-        return obj.items.filter(availability_status='available').count()
+        count = getattr(obj, 'available_items_count', None)  # annotated by CategoryViewSet
+        if count is None:
+            count = obj.items.filter(availability_status='available').count()
+        return count
 
 
 class MenuItemVariationSerializer(serializers.ModelSerializer):
@@ -98,6 +102,20 @@ class MenuItemSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+def menu_item_prefetches(prefix=''):
+    """
+    ``prefetch_related`` lookups that let ``MenuItemSerializer`` render the
+    menu items reached through ``prefix`` (e.g. ``'order_item__menu_item__'``)
+    without a query per item.
+    """
+    return [
+        prefix + lookup for lookup in (
+            'category', 'created_by', 'updated_by', 'variations',
+            'addon_relations__addon', 'recipe__created_by', 'recipe__ingredients',
+        )
+    ]
+
+
 class MenuItemCreateSerializer(serializers.ModelSerializer):
     variations = MenuItemVariationSerializer(many=True, required=False)
     addons = serializers.ListField(
@@ -157,6 +175,21 @@ class MenuItemListSerializer(serializers.ModelSerializer):
         ]
 
 
+class MenuItemListValuesSerializer(ValuesSerializer):
+    """``MenuItemListSerializer`` output built from ``values()`` rows"""
+    serializer_class = MenuItemListSerializer
+    computed = {
+        # Same as MenuItem.is_available and MenuItem.is_low_stock
+        'is_available': (
+            ('availability_status', 'stock_quantity'),
+            lambda availability_status, stock: availability_status == 'available' and stock > 0
+        ),
+        'is_low_stock': (
+            ('stock_quantity', 'low_stock_threshold'), lambda stock, threshold: stock <= threshold
+        ),
+    }
+
+
 class MenuDiscountSerializer(serializers.ModelSerializer):
     applicable_items_names = serializers.SerializerMethodField()
     applicable_categories_names = serializers.SerializerMethodField()
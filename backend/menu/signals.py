@@ -0,0 +1,12 @@
+from maria_havens_pos.caching import invalidate_on
+from .models import (
+    Category, MenuItem, MenuItemVariation, MenuItemAddOn,
+    MenuItemAddOnRelation, Recipe, RecipeIngredient
+)
+
+# Cached menu and category responses nest all of these
+invalidate_on(
+    'menu',
+    Category, MenuItem, MenuItemVariation, MenuItemAddOn,
+    MenuItemAddOnRelation, Recipe, RecipeIngredient
+)
@@ -0,0 +1,124 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from maria_havens_pos.testing import QueryScalingMixin
+from .models import (
+    Category, MenuDiscount, MenuItem, MenuItemAddOn, MenuItemAddOnRelation, MenuItemVariation, Recipe,
+    RecipeIngredient
+)
+
+User = get_user_model()
+
+
+class MenuQueryCountTestCase(QueryScalingMixin, TestCase):
+    """Menu endpoints run the same number of queries for N and 10N rows"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='testpass123', role='manager'
+        )
+        self.client = self.api_client(self.manager)
+        self.category = Category.objects.create(name='Mains')
+        self.dish = MenuItem.objects.create(
+            name='Nyama Choma', category=self.category, price=Decimal('900.00'), created_by=self.manager
+        )
+        self.recipe = Recipe.objects.create(
+            menu_item=self.dish, instructions='Grill', prep_time=10, cook_time=30, created_by=self.manager
+        )
+        self.seeded = 0
+
+    def next_number(self):
+        self.seeded += 1
+        return self.seeded
+
+    def seed_categories(self, count):
+        for _ in range(count):
+            category = Category.objects.create(name=f'Category {self.next_number()}')
+            MenuItem.objects.create(name='Dish', category=category, price=Decimal('100.00'))
+
+    def seed_items(self, count, **fields):
+        for _ in range(count):
+            number = self.next_number()
+            item = MenuItem.objects.create(
+                name=f'Dish {number}', category=self.category, price=Decimal('100.00'),
+                created_by=self.manager, updated_by=self.manager, **fields
+            )
+            MenuItemVariation.objects.create(menu_item=item, name='Large', price_modifier=Decimal('50.00'))
+            addon = MenuItemAddOn.objects.create(name=f'Addon {number}', price=Decimal('20.00'))
+            MenuItemAddOnRelation.objects.create(menu_item=item, addon=addon)
+
+    def seed_item_details(self, count):
+        for _ in range(count):
+            number = self.next_number()
+            MenuItemVariation.objects.create(menu_item=self.dish, name=f'Size {number}')
+            addon = MenuItemAddOn.objects.create(name=f'Addon {number}', price=Decimal('20.00'))
+            MenuItemAddOnRelation.objects.create(menu_item=self.dish, addon=addon)
+            RecipeIngredient.objects.create(recipe=self.recipe, name=f'Spice {number}', quantity=1, unit='g')
+
+    def seed_discounts(self, count):
+        for _ in range(count):
+            discount = MenuDiscount.objects.create(
+                name=f'Happy hour {self.next_number()}', value=Decimal('10.00'), created_by=self.manager,
+                start_date=timezone.now() - timedelta(days=1), end_date=timezone.now() + timedelta(days=1)
+            )
+            discount.applicable_items.add(self.dish)
+            discount.applicable_categories.add(self.category)
+
+    def test_category_list(self):
+        """Test listing categories with their item counts"""
+        self.assertQueriesDoNotScale(self.client, '/api/menu/categories/', self.seed_categories)
+
+    def test_category_retrieve(self):
+        """Test retrieving a category with many items"""
+        self.assertQueriesDoNotScale(self.client, f'/api/menu/categories/{self.category.id}/', self.seed_items)
+
+    def test_item_list(self):
+        """Test listing menu items"""
+        self.assertQueriesDoNotScale(self.client, '/api/menu/items/', self.seed_items)
+
+    def test_item_retrieve(self):
+        """Test retrieving a menu item with many variations, add-ons and ingredients"""
+        self.assertQueriesDoNotScale(self.client, f'/api/menu/items/{self.dish.id}/', self.seed_item_details)
+
+    def test_low_stock(self):
+        """Test the low stock action"""
+        self.assertQueriesDoNotScale(
+            self.client, '/api/menu/items/low_stock/', lambda count: self.seed_items(count, stock_quantity=0)
+        )
+
+    def test_featured(self):
+        """Test the featured items action"""
+        self.assertQueriesDoNotScale(
+            self.client, '/api/menu/items/featured/', lambda count: self.seed_items(count, is_featured=True)
+        )
+
+    def test_addon_list(self):
+        """Test listing add-ons"""
+        self.assertQueriesDoNotScale(self.client, '/api/menu/addons/', self.seed_item_details)
+
+    def test_discount_list(self):
+        """Test listing discounts with their items and categories"""
+        self.assertQueriesDoNotScale(self.client, '/api/menu/discounts/', self.seed_discounts)
+
+    def test_menu_stats(self):
+        """Test the menu statistics"""
+        self.assertQueriesDoNotScale(self.client, '/api/menu/stats/', self.seed_items)
+
+    def test_bulk_update_stock(self):
+        """Test bulk stock updates do not query per item"""
+        def seed(count):
+            self.seed_items(count)
+            return [{'id': item_id, 'stock_quantity': 5} for item_id in MenuItem.objects.values_list('id', flat=True)]
+
+        small = self.count_queries(self.client, 'post', '/api/menu/bulk-update-stock/', {'items': seed(self.rows)})
+        large = self.count_queries(
+            self.client, 'post', '/api/menu/bulk-update-stock/', {'items': seed(self.rows * (self.scale - 1))}
+        )
+
+        self.assertEqual(len(small), len(large), '\n'.join(large))
+        self.assertEqual(MenuItem.objects.filter(stock_quantity=5).count(), MenuItem.objects.count())
@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from .models import Category, MenuItem
+
+User = get_user_model()
+
+
+class BulkUpdateStockTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='testpass123', role='manager'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.manager)
+        category = Category.objects.create(name='Mains')
+        self.dish = MenuItem.objects.create(
+            name='Nyama Choma', category=category, price=Decimal('900.00'), stock_quantity=2
+        )
+
+    def test_string_ids_accepted(self):
+        """Test ids sent as strings update the item"""
+        response = self.client.post(
+            '/api/menu/bulk-update-stock/',
+            {'items': [{'id': str(self.dish.id), 'stock_quantity': 9}]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.dish.refresh_from_db()
+        self.assertEqual(self.dish.stock_quantity, 9)
+
+    def test_invalid_ids_skipped(self):
+        """Test ids that are not numbers are skipped instead of failing the request"""
+        response = self.client.post(
+            '/api/menu/bulk-update-stock/',
+            {'items': [{'id': 'abc', 'stock_quantity': 1}, {'id': self.dish.id, 'stock_quantity': 7}]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.dish.refresh_from_db()
+        self.assertEqual(self.dish.stock_quantity, 7)
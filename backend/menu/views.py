@@ -23,15 +23,20 @@ from .models import (
     MenuItemAddOnRelation, Recipe, RecipeIngredient, MenuDiscount
 )
 from .serializers import (
-    CategorySerializer, MenuItemSerializer, MenuItemListSerializer,
+    CategorySerializer, MenuItemSerializer, MenuItemListSerializer, MenuItemListValuesSerializer,
     MenuItemCreateSerializer, MenuItemVariationSerializer, MenuItemAddOnSerializer,
     RecipeSerializer, MenuDiscountSerializer, MenuStatsSerializer
 )
-from accounts.models import UserActivity
+from accounts.audit import log_activity
+from maria_havens_pos.caching import CachedViewSetMixin, invalidate_namespace
+from maria_havens_pos.values_serializers import ValuesListMixin
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
-    queryset = Category.objects.all()
+class CategoryViewSet(CachedViewSetMixin, viewsets.ModelViewSet):
+    cache_namespace = 'menu'
+    queryset = Category.objects.annotate(
+        available_items_count=Count('items', filter=Q(items__availability_status='available'))
+    )
     serializer_class = CategorySerializer
     permission_classes = []  # Temporarily allow public access for testing
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -47,7 +52,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
         category = serializer.save()
         
         # Log activity
-        UserActivity.objects.create(
+        log_activity(
             user=self.request.user,
             action='menu_updated',
             description=f'Created category: {category.name}',
@@ -62,7 +67,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
         category = serializer.save()
         
         # Log activity
-        UserActivity.objects.create(
+        log_activity(
             user=self.request.user,
             action='menu_updated',
             description=f'Updated category: {category.name}',
@@ -78,7 +83,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
         super().perform_destroy(instance)
         
         # Log activity
-        UserActivity.objects.create(
+        log_activity(
             user=self.request.user,
             action='menu_updated',
             description=f'Deleted category: {category_name}',
@@ -93,7 +98,8 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return self.request.META.get('REMOTE_ADDR', '127.0.0.1')
 
 
-class MenuItemViewSet(viewsets.ModelViewSet):
+class MenuItemViewSet(CachedViewSetMixin, ValuesListMixin, viewsets.ModelViewSet):
+    cache_namespace = 'menu'
     queryset = MenuItem.objects.all()
     permission_classes = [AllowAny]  # Temporarily allow unauthenticated access for development
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -101,6 +107,7 @@ class MenuItemViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'price', 'created_at', 'sort_order']
     ordering = ['category', 'sort_order', 'name']
+    values_serializer_class = MenuItemListValuesSerializer
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -117,6 +124,12 @@ class MenuItemViewSet(viewsets.ModelViewSet):
         if (not user or not user.is_authenticated or not user.can_manage_menu()) and self.request.query_params.get('pos') == 'true':
             queryset = queryset.filter(availability_status='available')
         
+        # The full serializer nests variations, add-ons and the recipe
+        if self.action != 'list':
+            queryset = queryset.prefetch_related(
+                'variations', 'addon_relations__addon', 'recipe__created_by', 'recipe__ingredients'
+            )
+        
         return queryset
     
     def perform_create(self, serializer):
@@ -128,7 +141,7 @@ class MenuItemViewSet(viewsets.ModelViewSet):
         
         # Log activity if user is authenticated
         if user and user.is_authenticated:
-            UserActivity.objects.create(
+            log_activity(
                 user=user,
                 action='menu_updated',
                 description=f'Created menu item: {menu_item.name}',
@@ -145,7 +158,7 @@ class MenuItemViewSet(viewsets.ModelViewSet):
         
         # Log activity if user is authenticated
         if user and user.is_authenticated:
-            UserActivity.objects.create(
+            log_activity(
                 user=user,
                 action='menu_updated',
                 description=f'Updated menu item: {menu_item.name}',
@@ -173,7 +186,7 @@ class MenuItemViewSet(viewsets.ModelViewSet):
                 menu_item.save(update_fields=['stock_quantity'])
                 
                 # Log activity
-                UserActivity.objects.create(
+                log_activity(
                     user=self.request.user,
                     action='menu_updated',
                     description=f'Updated stock for {menu_item.name}: {old_quantity} → {stock_quantity}',
@@ -232,7 +245,7 @@ class MenuItemAddOnViewSet(viewsets.ModelViewSet):
         addon = serializer.save()
         
         # Log activity
-        UserActivity.objects.create(
+        log_activity(
             user=self.request.user,
             action='menu_updated',
             description=f'Created addon: {addon.name}',
@@ -257,7 +270,9 @@ class MenuDiscountViewSet(viewsets.ModelViewSet):
     ordering = ['-created_at']
     
     def get_queryset(self):
-        queryset = MenuDiscount.objects.all()
+        queryset = MenuDiscount.objects.select_related('created_by').prefetch_related(
+            'applicable_items', 'applicable_categories'
+        )
         
         # Filter active discounts for current time
         if self.request.query_params.get('active_only') == 'true':
@@ -277,7 +292,7 @@ class MenuDiscountViewSet(viewsets.ModelViewSet):
         discount = serializer.save()
         
         # Log activity
-        UserActivity.objects.create(
+        log_activity(
             user=self.request.user,
             action='menu_updated',
             description=f'Created discount: {discount.name}',
@@ -339,28 +354,44 @@ def bulk_update_stock(request):
     items = request.data.get('items', [])
     updated_items = []
     
+    # Ids may arrive as strings ("5"); unusable ones are skipped
+    pks = []
     for item_data in items:
+        try:
+            pks.append(int(item_data.get('id')))
+        except (TypeError, ValueError):
+            pks.append(None)
+    
+    # Load every item in one query and write them back in one bulk update
+    menu_items = MenuItem.objects.in_bulk([pk for pk in pks if pk])
+    changed = []
+    for item_data, pk in zip(items, pks):
         item_id = item_data.get('id')
         stock_quantity = item_data.get('stock_quantity')
+        menu_item = menu_items.get(pk)
         
-        if item_id and stock_quantity is not None:
+        if menu_item is not None and stock_quantity is not None:
             try:
-                menu_item = MenuItem.objects.get(id=item_id)
-                old_quantity = menu_item.stock_quantity
-                menu_item.stock_quantity = int(stock_quantity)
-                menu_item.save(update_fields=['stock_quantity'])
-                
-                updated_items.append({
-                    'id': item_id,
-                    'name': menu_item.name,
-                    'old_quantity': old_quantity,
-                    'new_quantity': menu_item.stock_quantity
-                })
-            except (MenuItem.DoesNotExist, ValueError):
+                new_quantity = int(stock_quantity)
+            except (TypeError, ValueError):
                 continue
+            old_quantity = menu_item.stock_quantity
+            menu_item.stock_quantity = new_quantity
+            changed.append(menu_item)
+            
+            updated_items.append({
+                'id': item_id,
+                'name': menu_item.name,
+                'old_quantity': old_quantity,
+                'new_quantity': menu_item.stock_quantity
+            })
+    
+    if changed:
+        MenuItem.objects.bulk_update(changed, ['stock_quantity'])
+        invalidate_namespace('menu')  # bulk_update sends no post_save
     
     # Log activity
-    UserActivity.objects.create(
+    log_activity(
         user=request.user,
         action='menu_updated',
         description=f'Bulk updated stock for {len(updated_items)} items',
@@ -44,6 +44,9 @@ class Order(models.Model):
     customer_name = models.CharField(max_length=255, blank=True)
     customer_phone = models.CharField(max_length=20, blank=True)
     customer_email = models.EmailField(blank=True)
+    customer = models.ForeignKey(
+        'reservations.Customer', on_delete=models.SET_NULL, null=True, blank=True, related_name='orders'
+    )
     table = models.ForeignKey(Table, on_delete=models.SET_NULL, null=True, blank=True, related_name='orders')
     order_type = models.CharField(max_length=20, choices=ORDER_TYPE_CHOICES, default='dine_in')
     status = models.CharField(max_length=20, choices=ORDER_STATUS_CHOICES, default='pending')
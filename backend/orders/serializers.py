@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Table, Order, OrderItem, OrderItemAddOn, Payment, KitchenDisplay
-from menu.serializers import MenuItemSerializer, MenuItemAddOnSerializer
+from menu.serializers import MenuItemSerializer, MenuItemAddOnSerializer, menu_item_prefetches
+from maria_havens_pos.values_serializers import ValuesSerializer
 
 User = get_user_model()
 
@@ -62,6 +63,11 @@ class OrderItemSerializer(serializers.ModelSerializer):
         return order_item
 
 
+def order_item_prefetches(prefix=''):
+    """``prefetch_related`` lookups for rendering order items through ``prefix``"""
+    return [prefix + 'menu_item', prefix + 'addons__addon', *menu_item_prefetches(prefix + 'menu_item__')]
+
+
 class PaymentSerializer(serializers.ModelSerializer):
     processed_by = serializers.StringRelatedField(read_only=True)
     
@@ -86,7 +92,7 @@ class OrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = [
-            'id', 'order_number', 'customer_name', 'customer_phone',
+            'id', 'order_number', 'customer', 'customer_name', 'customer_phone',
             'customer_email', 'table', 'table_id', 'order_type', 'status',
             'subtotal', 'tax_amount', 'discount_amount', 'total_amount',
             'special_instructions', 'estimated_prep_time', 'server',
@@ -134,7 +140,7 @@ class KitchenDisplaySerializer(serializers.ModelSerializer):
 class OrderSummarySerializer(serializers.ModelSerializer):
     """Lightweight serializer for order lists"""
     table_number = serializers.CharField(source='table.number', read_only=True)
-    items_count = serializers.IntegerField(source='items.count', read_only=True)
+    items_count = serializers.IntegerField(read_only=True)  # annotated by OrderViewSet
     
     class Meta:
         model = Order
@@ -142,4 +148,10 @@ class OrderSummarySerializer(serializers.ModelSerializer):
             'id', 'order_number', 'customer_name', 'table_number',
             'order_type', 'status', 'total_amount', 'items_count',
             'created_at', 'estimated_prep_time'
-        ]
\ No newline at end of file
+        ]
+
+
+class OrderSummaryValuesSerializer(ValuesSerializer):
+    """``OrderSummarySerializer`` output built from ``values()`` rows"""
+    serializer_class = OrderSummarySerializer
+    annotations = ('items_count',)
\ No newline at end of file
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from maria_havens_pos.caching import invalidate_on
+from maria_havens_pos.metrics import registry
+from .models import Order, Table
+
+invalidate_on('tables', Table)
+
+
+@receiver(post_save, sender=Order)
+def count_created_order(sender, instance, created, using, **kwargs):
+    if created:
+        # Not counted if the transaction that created it rolls back
+        labels = {'order_type': instance.order_type}
+        transaction.on_commit(lambda: registry.increment('orders_created', labels), using=using)
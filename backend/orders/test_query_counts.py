@@ -0,0 +1,152 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from maria_havens_pos.testing import QueryScalingMixin
+from menu.models import (
+    Category, MenuItem, MenuItemAddOn, MenuItemAddOnRelation, MenuItemVariation, Recipe, RecipeIngredient
+)
+from .models import KitchenDisplay, Order, OrderItem, OrderItemAddOn, Payment, Table
+
+User = get_user_model()
+
+
+class OrderQueryCountTestCase(QueryScalingMixin, TestCase):
+    """Order endpoints run the same number of queries for N and 10N rows"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='testpass123', role='manager'
+        )
+        self.client = self.api_client(self.manager)
+        category = Category.objects.create(name='Mains')
+        self.dish = MenuItem.objects.create(
+            name='Nyama Choma', category=category, price=Decimal('900.00'), created_by=self.manager
+        )
+        MenuItemVariation.objects.create(menu_item=self.dish, name='Large', price_modifier=Decimal('200.00'))
+        self.addon = MenuItemAddOn.objects.create(name='Kachumbari', price=Decimal('100.00'))
+        MenuItemAddOnRelation.objects.create(menu_item=self.dish, addon=self.addon)
+        recipe = Recipe.objects.create(
+            menu_item=self.dish, instructions='Grill', prep_time=10, cook_time=30, created_by=self.manager
+        )
+        RecipeIngredient.objects.create(recipe=recipe, name='Goat', quantity=Decimal('0.5'), unit='kg')
+        self.table = Table.objects.create(number='1', capacity=4)
+        self.seeded = 0
+        self.order = self.create_order()
+
+    def next_number(self):
+        self.seeded += 1
+        return self.seeded
+
+    def create_order(self, status='pending'):
+        # Generated numbers are random and can collide across hundreds of rows
+        return Order.objects.create(
+            order_type='dine_in', table=self.table, status=status, server=self.manager,
+            order_number=f'ORD-TEST-{self.next_number():05d}'
+        )
+
+    def add_items(self, order, count, status='pending'):
+        for _ in range(count):
+            item = OrderItem.objects.create(
+                order=order, menu_item=self.dish, quantity=1, unit_price=self.dish.price, status=status
+            )
+            OrderItemAddOn.objects.create(order_item=item, addon=self.addon, unit_price=self.addon.price)
+
+    def seed_tables(self, count):
+        for _ in range(count):
+            Table.objects.create(number=f'T{self.next_number()}', capacity=4)
+
+    def seed_orders(self, count, status='pending'):
+        for _ in range(count):
+            order = self.create_order(status)
+            self.add_items(order, 2)
+            Payment.objects.create(order=order, amount=Decimal('100.00'), payment_method='cash')
+
+    def seed_tickets(self, count):
+        for _ in range(count):
+            item = OrderItem.objects.create(order=self.order, menu_item=self.dish, quantity=1, unit_price=self.dish.price)
+            OrderItemAddOn.objects.create(order_item=item, addon=self.addon, unit_price=self.addon.price)
+            KitchenDisplay.objects.create(
+                order_item=item, assigned_to=self.manager,
+                estimated_completion=timezone.now() - timedelta(minutes=5)
+            )
+
+    def order_with_items(self, count, status='pending'):
+        order = self.create_order(status)
+        self.add_items(order, count)
+        return order
+
+    def test_table_list(self):
+        """Test listing tables"""
+        self.assertQueriesDoNotScale(self.client, '/api/orders/tables/', self.seed_tables)
+
+    def test_available_tables(self):
+        """Test the available tables action"""
+        self.assertQueriesDoNotScale(self.client, '/api/orders/tables/available/', self.seed_tables)
+
+    def test_order_list(self):
+        """Test listing orders"""
+        self.assertQueriesDoNotScale(self.client, '/api/orders/orders/', self.seed_orders)
+
+    def test_active_orders(self):
+        """Test the active orders action"""
+        self.assertQueriesDoNotScale(self.client, '/api/orders/orders/active/', self.seed_orders)
+
+    def test_kitchen_queue(self):
+        """Test the kitchen queue action"""
+        self.assertQueriesDoNotScale(
+            self.client, '/api/orders/orders/kitchen_queue/', lambda count: self.seed_orders(count, 'confirmed')
+        )
+
+    def test_order_retrieve(self):
+        """Test retrieving an order with many items"""
+        self.assertQueriesDoNotScale(
+            self.client, f'/api/orders/orders/{self.order.id}/', lambda count: self.add_items(self.order, count)
+        )
+
+    def test_confirm_order(self):
+        """Test confirming an order sends all its items to the kitchen"""
+        queries = self.assertActionQueriesDoNotScale(
+            self.client, lambda order: f'/api/orders/orders/{order.id}/confirm/', self.order_with_items
+        )
+        self.assertLessEqual(queries, 10)
+
+    def test_complete_order(self):
+        """Test completing a served order"""
+        self.assertActionQueriesDoNotScale(
+            self.client, lambda order: f'/api/orders/orders/{order.id}/complete/',
+            lambda count: self.order_with_items(count, status='served')
+        )
+
+    def test_kitchen_display_list(self):
+        """Test listing kitchen tickets"""
+        self.assertQueriesDoNotScale(self.client, '/api/orders/kitchen-display/', self.seed_tickets)
+
+    def test_overdue_tickets(self):
+        """Test the overdue tickets action"""
+        self.assertQueriesDoNotScale(self.client, '/api/orders/kitchen-display/overdue/', self.seed_tickets)
+
+    def test_start_ticket(self):
+        """Test starting a ticket on an order with many items"""
+        def seed(count):
+            order = self.order_with_items(count)
+            item = order.items.first()
+            return KitchenDisplay.objects.create(order_item=item, estimated_completion=timezone.now())
+
+        self.assertActionQueriesDoNotScale(
+            self.client, lambda ticket: f'/api/orders/kitchen-display/{ticket.id}/start/', seed
+        )
+
+    def test_payment_list(self):
+        """Test listing payments"""
+        self.assertQueriesDoNotScale(self.client, '/api/orders/payments/', self.seed_orders)
+
+    def test_order_item_list(self):
+        """Test listing order items"""
+        self.assertQueriesDoNotScale(
+            self.client, '/api/orders/order-items/', lambda count: self.add_items(self.order, count)
+        )
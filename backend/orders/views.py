@@ -11,12 +11,18 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from .models import Table, Order, OrderItem, Payment, KitchenDisplay
 from .serializers import (
     TableSerializer, OrderSerializer, OrderSummarySerializer,
-    OrderItemSerializer, PaymentSerializer, KitchenDisplaySerializer
+    OrderItemSerializer, PaymentSerializer, KitchenDisplaySerializer,
+    OrderSummaryValuesSerializer, order_item_prefetches
 )
 from accounts.permissions import RoleBasedPermission
+from maria_havens_pos.caching import CachedViewSetMixin
+from maria_havens_pos.values_serializers import ValuesListMixin
+from reservations.contacts import find_customer
+from reservations.stats import record_order
 
 
-class TableViewSet(viewsets.ModelViewSet):
+class TableViewSet(CachedViewSetMixin, viewsets.ModelViewSet):
+    cache_namespace = 'tables'
     queryset = Table.objects.all()
     serializer_class = TableSerializer
     permission_classes = [AllowAny]  # Temporarily allow unauthenticated access for development
@@ -31,7 +37,7 @@ class TableViewSet(viewsets.ModelViewSet):
         """Mark table as occupied"""
         table = self.get_object()
         table.is_occupied = True
-        table.save()
+        table.save(update_fields=['is_occupied'])
         return Response({'status': 'table occupied'})
     
     @action(detail=True, methods=['post'])
@@ -39,7 +45,7 @@ class TableViewSet(viewsets.ModelViewSet):
         """Mark table as free"""
         table = self.get_object()
         table.is_occupied = False
-        table.save()
+        table.save(update_fields=['is_occupied'])
         return Response({'status': 'table freed'})
     
     @action(detail=False, methods=['get'])
@@ -50,20 +56,32 @@ class TableViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.select_related('table', 'server', 'kitchen_staff').prefetch_related('items__menu_item', 'payments')
+class OrderViewSet(ValuesListMixin, viewsets.ModelViewSet):
+    queryset = Order.objects.select_related('table', 'server', 'kitchen_staff').prefetch_related(
+        *order_item_prefetches('items__'), 'payments__processed_by'
+    )
     permission_classes = [AllowAny]  # Temporarily allow unauthenticated access for development
     filter_backends = [SearchFilter, OrderingFilter]
     filterset_fields = ['status', 'order_type', 'table']
     search_fields = ['order_number', 'customer_name', 'customer_phone']
     ordering_fields = ['created_at', 'total_amount', 'status']
     ordering = ['-created_at']
+    values_serializer_class = OrderSummaryValuesSerializer
     
     def get_serializer_class(self):
         if self.action == 'list':
             return OrderSummarySerializer
         return OrderSerializer
     
+    def get_queryset(self):
+        if self.action == 'list':
+            # Summaries only need how many items there are, not the items
+            return Order.objects.select_related('table').annotate(items_count=Count('items'))
+        if self.action in ('confirm', 'cancel', 'serve', 'complete', 'add_payment'):
+            # These change the order without rendering it
+            return Order.objects.select_related('table')
+        return self.queryset
+    
     def perform_create(self, serializer):
         """Create order and assign server"""
         user = getattr(self.request, 'user', None)
@@ -71,10 +89,16 @@ class OrderViewSet(viewsets.ModelViewSet):
         server = user if user and user.is_authenticated else None
         order = serializer.save(server=server)
         
+        # Link walk-in orders to a known customer so their spend is tracked
+        if not order.customer_id and (order.customer_phone or order.customer_email):
+            order.customer = find_customer(phone=order.customer_phone, email=order.customer_email)
+            if order.customer:
+                order.save(update_fields=['customer'])
+        
         # Mark table as occupied if dine-in
         if order.table and order.order_type == 'dine_in':
             order.table.is_occupied = True
-            order.table.save()
+            order.table.save(update_fields=['is_occupied'])
     
     @action(detail=True, methods=['post'])
     def confirm(self, request, pk=None):
@@ -86,11 +110,14 @@ class OrderViewSet(viewsets.ModelViewSet):
             order.save()
             
             # Create kitchen display items
-            for item in order.items.all():
-                KitchenDisplay.objects.create(
+            now = timezone.now()
+            KitchenDisplay.objects.bulk_create([
+                KitchenDisplay(
                     order_item=item,
-                    estimated_completion=timezone.now() + timezone.timedelta(minutes=item.menu_item.preparation_time)
+                    estimated_completion=now + timezone.timedelta(minutes=item.menu_item.preparation_time)
                 )
+                for item in order.items.select_related('menu_item')
+            ])
             
             return Response({'status': 'order confirmed'})
         return Response({'error': 'Order cannot be confirmed'}, status=status.HTTP_400_BAD_REQUEST)
@@ -106,7 +133,7 @@ class OrderViewSet(viewsets.ModelViewSet):
             # Free table if applicable
             if order.table and order.order_type == 'dine_in':
                 order.table.is_occupied = False
-                order.table.save()
+                order.table.save(update_fields=['is_occupied'])
             
             return Response({'status': 'order cancelled'})
         return Response({'error': 'Order cannot be cancelled'}, status=status.HTTP_400_BAD_REQUEST)
@@ -130,11 +157,12 @@ class OrderViewSet(viewsets.ModelViewSet):
             order.status = 'completed'
             order.completed_at = timezone.now()
             order.save()
+            record_order(order)
             
             # Free table if applicable
             if order.table and order.order_type == 'dine_in':
                 order.table.is_occupied = False
-                order.table.save()
+                order.table.save(update_fields=['is_occupied'])
             
             return Response({'status': 'order completed'})
         return Response({'error': 'Order cannot be completed'}, status=status.HTTP_400_BAD_REQUEST)
@@ -155,6 +183,34 @@ class OrderViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(orders, many=True)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, RoleBasedPermission])
+    def charge_to_room(self, request, pk=None):
+        """Post the order to the folio of the guest checked in to a room"""
+        from hotels.folio import FolioError, post_order
+        from hotels.models import RoomBooking
+        
+        order = self.get_object()
+        room_number = request.data.get('room_number')
+        if not room_number:
+            return Response({'error': 'Room number required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        bookings = list(RoomBooking.objects.filter(room__number=room_number, status='checked_in')[:2])
+        if not bookings:
+            return Response({'error': 'No checked-in guest in that room'}, status=status.HTTP_404_NOT_FOUND)
+        if len(bookings) > 1:
+            return Response(
+                {'error': 'More than one booking is checked in to that room; post to the booking instead'},
+                status=status.HTTP_409_CONFLICT
+            )
+        booking = bookings[0]
+        
+        try:
+            post_order(booking, order, user=request.user)
+        except FolioError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({'status': 'charged to room', 'booking_number': booking.booking_number})
+    
     @action(detail=True, methods=['post'])
     def add_payment(self, request, pk=None):
         """Add payment to order"""
@@ -176,7 +232,7 @@ class OrderViewSet(viewsets.ModelViewSet):
 class KitchenDisplayViewSet(viewsets.ModelViewSet):
     queryset = KitchenDisplay.objects.select_related(
         'order_item__order__table', 'order_item__menu_item', 'assigned_to'
-    )
+    ).prefetch_related(*order_item_prefetches('order_item__'))
     serializer_class = KitchenDisplaySerializer
     permission_classes = [AllowAny]  # Temporarily allow unauthenticated access for development
     filter_backends = [OrderingFilter]
@@ -251,7 +307,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
 
 
 class OrderItemViewSet(viewsets.ModelViewSet):
-    queryset = OrderItem.objects.select_related('order', 'menu_item')
+    queryset = OrderItem.objects.select_related('order', 'menu_item').prefetch_related(*order_item_prefetches())
     serializer_class = OrderItemSerializer
     permission_classes = [AllowAny]  # Temporarily allow unauthenticated access for development
     filter_backends = [OrderingFilter]
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class ReservationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'reservations'
\ No newline at end of file
+    name = 'reservations'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,166 @@
+import time as time_module
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from .seating import build_seating_plan, load_bookings, load_tables, reservation_window
+
+SLOT = timedelta(minutes=15)
+SLOTS_PER_DAY = 96
+# Bitmaps cover the day and the following one so late parties that run past
+# midnight are checked against the next morning's bookings as well.
+HORIZON_SLOTS = 2 * SLOTS_PER_DAY
+
+CACHE_TIMEOUT = 60 * 60
+# The per-process cache only hears about bookings made by its own worker, so
+# other workers' changes must show up within seconds rather than an hour
+LOCAL_CACHE_TIMEOUT = 10
+VERSION_KEY = 'reservations:availability:version'
+
+
+def _slot(moment, day_start, round_up=False):
+    minutes, remainder = divmod((moment - day_start).total_seconds(), 60)
+    slot, part = divmod(int(minutes), 15)
+    if round_up and (part or remainder):
+        slot += 1
+    return max(0, min(slot, HORIZON_SLOTS))
+
+
+def _mask(first, last):
+    """Bits ``first`` (inclusive) to ``last`` (exclusive)"""
+    return ((1 << (last - first)) - 1) << first if last > first else 0
+
+
+class DayAvailability:
+    """
+    Per-table 15 minute slot bitmaps for one date.
+
+    Bit ``n`` of ``busy[table_id]`` is set when the table is taken (or being
+    reset) during the n-th quarter hour after midnight. Reservations without
+    a table are placed by the seating solver first, so pending bookings use
+    up capacity exactly as they will on the night.
+    """
+
+    def __init__(self, plan_date, tables, busy, windows, turn_slots):
+        self.date = plan_date
+        self.tables = sorted(tables, key=lambda t: (t.capacity, t.number))
+        self.busy = busy
+        self.windows = windows
+        self.turn_slots = turn_slots
+
+    @classmethod
+    def build(cls, plan_date):
+        tables = load_tables()
+        bookings = load_bookings(plan_date, days=2)
+        plan = build_seating_plan(tables, bookings)
+        day_start = datetime.combine(plan_date, datetime.min.time())
+
+        busy = dict.fromkeys(plan.tables, 0)
+        for table_id, start, end in plan.intervals():
+            busy[table_id] |= _mask(_slot(start, day_start), _slot(end, day_start, round_up=True))
+        windows = [
+            (_slot(booking.start, day_start), _slot(booking.end, day_start, round_up=True))
+            for booking in bookings
+        ]
+        turn_slots = -(-plan.turn_time // SLOT)
+        return cls(plan_date, tables, busy, windows, turn_slots)
+
+    def _window(self, res_time, duration_hours):
+        day_start = datetime.combine(self.date, datetime.min.time())
+        start, end = reservation_window(self.date, res_time, duration_hours)
+        first = _slot(start, day_start)
+        return first, _slot(end, day_start, round_up=True)
+
+    def free_tables(self, res_time, duration_hours=2, party_size=1):
+        """Tables (smallest first) that can take ``party_size`` at ``res_time``"""
+        first, last = self._window(res_time, duration_hours)
+        needed = _mask(first, min(last + self.turn_slots, HORIZON_SLOTS))
+        return [
+            table for table in self.tables
+            if table.capacity >= party_size and not self.busy.get(table.id, 0) & needed
+        ]
+
+    def reserve(self, table_id, res_time, duration_hours=2):
+        """Mark ``table_id`` busy in this copy, e.g. while matching a batch"""
+        first, last = self._window(res_time, duration_hours)
+        self.busy[table_id] = self.busy.get(table_id, 0) | _mask(first, min(last + self.turn_slots, HORIZON_SLOTS))
+
+    def existing_reservations(self, res_time, duration_hours=2):
+        """Active reservations overlapping the requested window"""
+        first, last = self._window(res_time, duration_hours)
+        return sum(1 for start, end in self.windows if start < last and first < end)
+
+    def counts(self, times, party_sizes, duration_hours=2):
+        """``{time: {party_size: free tables}}`` for every combination"""
+        result = {}
+        for res_time in times:
+            capacities = [table.capacity for table in self.free_tables(res_time, duration_hours)]
+            result[res_time] = {
+                size: len(capacities) - bisect_left(capacities, size) for size in party_sizes
+            }
+        return result
+
+    @property
+    def max_capacity(self):
+        return self.tables[-1].capacity if self.tables else 0
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = time_module.time_ns()
+        cache.add(VERSION_KEY, version, None)
+        version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def _cache_key(plan_date):
+    return f'reservations:availability:{_version()}:{plan_date.isoformat()}'
+
+
+def cache_timeout():
+    """Seconds a built day may be served; short unless the cache is shared"""
+    if isinstance(caches['default'], LocMemCache):
+        return LOCAL_CACHE_TIMEOUT
+    return CACHE_TIMEOUT
+
+
+def for_date(plan_date):
+    """Availability for ``plan_date``, built once and then served from the cache"""
+    key = _cache_key(plan_date)
+    day = cache.get(key)
+    if day is None:
+        day = DayAvailability.build(plan_date)
+        cache.set(key, day, cache_timeout())
+    return day
+
+
+def invalidate_dates(dates):
+    """
+    Drop cached availability affected by reservations on ``dates``.
+
+    A reservation shows up in its own day, the previous day's bitmaps (past
+    midnight) and the next day's (spillover), so all three are dropped.
+    """
+    affected = set()
+    for day in dates:
+        affected.update((day - timedelta(days=1), day, day + timedelta(days=1)))
+    cache.delete_many([_cache_key(day) for day in affected])
+
+
+def invalidate_all():
+    """Forget every cached day, e.g. after the floor plan changes"""
+    cache.set(VERSION_KEY, time_module.time_ns(), None)
+
+
+def times_between(start, end, step=SLOT):
+    """Times from ``start`` to ``end`` inclusive every ``step``"""
+    moment = datetime.combine(datetime.min.date(), start)
+    last = datetime.combine(datetime.min.date(), end)
+    times = []
+    while moment <= last:
+        times.append(moment.time())
+        moment += step
+    return times
@@ -0,0 +1,43 @@
+import re
+
+DEFAULT_COUNTRY_CODE = '254'  # Kenya
+_NON_DIGITS = re.compile(r'\D')
+
+
+def normalize_phone(raw, country_code=DEFAULT_COUNTRY_CODE):
+    """
+    E.164 form of a phone number as typed at the till.
+
+    ``0712 345 678``, ``712345678``, ``254712345678`` and ``+254-712-345678``
+    all become ``+254712345678``. Numbers already carrying another country
+    code keep it. Returns '' for input that is too short to be a number.
+    """
+    if not raw:
+        return ''
+    raw = raw.strip()
+    digits = _NON_DIGITS.sub('', raw)
+    if raw.startswith('+') or raw.startswith('00'):
+        digits = digits[2:] if raw.startswith('00') else digits
+    elif digits.startswith('0'):
+        digits = country_code + digits[1:]
+    elif len(digits) == 9:
+        digits = country_code + digits
+    if len(digits) < 8:
+        return ''
+    return '+' + digits
+
+
+def normalize_email(raw):
+    return (raw or '').strip().lower()
+
+
+def find_customer(phone=None, email=None):
+    """Customer matching a phone number or email, via the normalized indexes"""
+    from .models import Customer
+
+    for field, value in (('phone_normalized', normalize_phone(phone)), ('email_normalized', normalize_email(email))):
+        if value:
+            customer = Customer.objects.filter(**{field: value}).order_by('id').first()
+            if customer:
+                return customer
+    return None
@@ -0,0 +1,150 @@
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Customer
+
+logger = logging.getLogger('maria_havens_pos')
+
+# Profile fields copied from a duplicate when the surviving record has them blank
+FILL_FIELDS = ['date_of_birth', 'dietary_restrictions', 'preferred_seating', 'special_occasions']
+# Status flags that are a decision about one guest; a merge reports them instead of copying
+REVIEW_FLAGS = ['is_blacklisted', 'is_vip']
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        if parent != item:
+            parent = self.parent[item] = self.find(parent)
+        return parent
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+def _name_parts(first_name, last_name):
+    return first_name.strip().rstrip('.').casefold(), last_name.strip().rstrip('.').casefold()
+
+
+def _part_matches(a, b):
+    """Equal, or one is the initial of the other ('j' and 'jane')"""
+    if not a or not b:
+        return False
+    return a == b or (min(len(a), len(b)) == 1 and a[0] == b[0])
+
+
+def names_match(a, b):
+    """Whether two ``(first, last)`` name pairs can be the same person"""
+    return _part_matches(a[0], b[0]) and _part_matches(a[1], b[1])
+
+
+def duplicate_groups():
+    """
+    Groups of customer ids that are the same person.
+
+    A shared normalized phone or email only makes two records candidates:
+    families and colleagues share phone numbers. A candidate pair is merged
+    when the names match (allowing initials) or when both the phone and the
+    email match. Candidates are bucketed by contact key and name initials, so
+    only records in the same small bucket are compared, and confirmed pairs
+    are joined with union-find.
+    """
+    uf = _UnionFind()
+    buckets = defaultdict(list)
+    both_keys = {}
+    rows = Customer.objects.filter(
+        ~Q(phone_normalized='') | ~Q(email_normalized='')
+    ).values_list('id', 'first_name', 'last_name', 'phone_normalized', 'email_normalized').order_by('id')
+    for customer_id, first_name, last_name, phone, email in rows.iterator(chunk_size=5000):
+        name = _name_parts(first_name, last_name)
+        if phone and email:
+            other = both_keys.setdefault((phone, email), customer_id)
+            if other != customer_id:
+                uf.union(other, customer_id)
+        if not name[0] or not name[1]:
+            continue
+        # Matching names always share their initials
+        initials = (name[0][0], name[1][0])
+        for key in (('phone', phone), ('email', email)):
+            if key[1]:
+                buckets[key + initials].append((customer_id, name))
+
+    for candidates in buckets.values():
+        for index, (customer_id, name) in enumerate(candidates):
+            for other_id, other_name in candidates[:index]:
+                if names_match(name, other_name):
+                    uf.union(other_id, customer_id)
+
+    groups = defaultdict(list)
+    for customer_id in uf.parent:
+        groups[uf.find(customer_id)].append(customer_id)
+    return [sorted(ids) for ids in groups.values() if len(ids) > 1]
+
+
+def merge_customers(survivor, duplicates):
+    """
+    Fold ``duplicates`` into ``survivor`` and delete them.
+
+    Every relation pointing at Customer (reservations, waitlist, orders,
+    hotel stays, ...) is re-pointed with one UPDATE per relation, and the
+    visit/spend totals are added up. ``is_vip`` and ``is_blacklisted`` are
+    never copied; see ``flags_to_review``.
+    """
+    duplicate_ids = [customer.id for customer in duplicates]
+    with transaction.atomic():
+        for relation in Customer._meta.related_objects:
+            if relation.one_to_many:
+                relation.related_model._base_manager.filter(
+                    **{f'{relation.field.name}__in': duplicate_ids}
+                ).update(**{relation.field.name: survivor})
+
+        for duplicate in duplicates:
+            survivor.total_visits += duplicate.total_visits
+            survivor.total_spent += duplicate.total_spent
+            if duplicate.last_visit and (not survivor.last_visit or duplicate.last_visit > survivor.last_visit):
+                survivor.last_visit = duplicate.last_visit
+            for field in FILL_FIELDS:
+                if not getattr(survivor, field) and getattr(duplicate, field):
+                    setattr(survivor, field, getattr(duplicate, field))
+
+        Customer.objects.filter(id__in=duplicate_ids).delete()
+        survivor.save()
+    return survivor
+
+
+def flags_to_review(survivor, duplicates):
+    """Status flags set on a duplicate but not on the survivor, as ``(customer id, field)``"""
+    return [
+        (duplicate.id, field)
+        for duplicate in duplicates
+        for field in REVIEW_FLAGS
+        if getattr(duplicate, field) and not getattr(survivor, field)
+    ]
+
+
+def dedupe_customers(dry_run=False):
+    """
+    Merge every group of duplicate customers.
+
+    The record with the most visits (then the oldest) survives. Returns
+    ``(ids, review)`` for each group found: the ids with the survivor first,
+    and the flags a person should check on the survivor (``flags_to_review``).
+    """
+    merged = []
+    for ids in duplicate_groups():
+        customers = sorted(Customer.objects.filter(id__in=ids), key=lambda c: (-c.total_visits, c.id))
+        review = flags_to_review(customers[0], customers[1:])
+        for duplicate_id, field in review:
+            logger.warning('Customer %s: %s was set on merged duplicate %s', customers[0].id, field, duplicate_id)
+        merged.append(([customer.id for customer in customers], review))
+        if not dry_run:
+            merge_customers(customers[0], customers[1:])
+    return merged
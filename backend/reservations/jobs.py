@@ -0,0 +1,69 @@
+import logging
+from datetime import date, time
+
+from django.core.mail import EmailMessage, get_connection
+
+from jobqueue.queue import register
+from .dedupe import dedupe_customers
+from .waitlist import match_freed
+from .models import Reservation, WaitList
+
+logger = logging.getLogger('maria_havens_pos')
+
+
+@register('reservations.send_confirmation', batch=True)
+def send_confirmations(payloads):
+    """
+    Email every confirmation in the batch over one connection.
+
+    Each reservation is marked as soon as its email has gone, so a retry
+    after a failed send only emails the guests that were not reached.
+    """
+    reservations = Reservation.objects.filter(
+        id__in=[payload['reservation_id'] for payload in payloads],
+        confirmation_sent=False
+    ).select_related('customer')
+
+    with get_connection() as connection:
+        for reservation in reservations:
+            connection.send_messages([EmailMessage(
+                f'Your reservation {reservation.reservation_number} is confirmed',
+                f'Dear {reservation.customer.full_name},\n\n'
+                f'We look forward to welcoming your party of {reservation.party_size} '
+                f'on {reservation.date:%A %d %B %Y} at {reservation.time:%H:%M}.\n\n'
+                'Maria Havens',
+                to=[reservation.customer.email]
+            )])
+            Reservation.objects.filter(id=reservation.id).update(confirmation_sent=True)
+
+
+@register('reservations.match_waitlist', batch=True)
+def match_waitlist(payloads):
+    """Offer every slot freed since the last batch to the waitlist in one pass"""
+    match_freed([(date.fromisoformat(payload['date']), time.fromisoformat(payload['time'])) for payload in payloads])
+
+
+@register('reservations.notify_waitlist', batch=True)
+def notify_waitlist(payloads):
+    """Tell waiting parties a table has opened up"""
+    entries = WaitList.objects.filter(
+        id__in=[payload['waitlist_id'] for payload in payloads]
+    ).select_related('customer')
+
+    messages = []
+    for entry in entries:
+        text = (
+            f'Good news {entry.customer.first_name}, a table for {entry.party_size} is free '
+            f'on {entry.date:%d %B} at {entry.time:%H:%M}. Call us to confirm.'
+        )
+        if entry.notify_by_email:
+            messages.append(EmailMessage('A table is available at Maria Havens', text, to=[entry.customer.email]))
+        if entry.notify_by_phone:
+            # No SMS gateway yet; the message is logged for the front desk
+            logger.info('SMS to %s: %s', entry.customer.phone, text)
+    get_connection().send_messages(messages)
+
+
+@register('reservations.dedupe_customers', max_attempts=1)
+def dedupe(payload):
+    dedupe_customers()
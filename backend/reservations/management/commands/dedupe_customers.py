@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from reservations.dedupe import dedupe_customers
+
+
+class Command(BaseCommand):
+    help = 'Merge customer records that share a name and a phone number or email, or both'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List duplicate groups without merging them'
+        )
+
+    def handle(self, *args, **options):
+        groups = dedupe_customers(dry_run=options['dry_run'])
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        for ids, review in groups:
+            self.stdout.write(f'{prefix}Customer {ids[0]} <- {", ".join(str(i) for i in ids[1:])}')
+            for duplicate_id, field in review:
+                self.stdout.write(self.style.WARNING(
+                    f'{prefix}  Review customer {ids[0]}: {field} was set on {duplicate_id} and not copied'
+                ))
+        removed = sum(len(ids) - 1 for ids, _ in groups)
+        self.stdout.write(self.style.SUCCESS(f'{prefix}Duplicate customers merged: {removed}'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from reservations.stats import recompute_all
+
+
+class Command(BaseCommand):
+    help = "Rebuild customers' visit and spend totals from reservations, stays and orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report customers whose stats drifted without fixing them'
+        )
+
+    def handle(self, *args, **options):
+        changed = recompute_all(dry_run=options['dry_run'])
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(f'{prefix}Customers corrected: {len(changed)}'))
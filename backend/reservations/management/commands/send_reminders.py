@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from django.apps import apps
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reservations.reminders import send_reservation_reminders
+
+
+class Command(BaseCommand):
+    help = "Email reminders for tomorrow's reservations and hotel arrivals"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Date to send reminders for (YYYY-MM-DD). Defaults to tomorrow.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Rows read, sent and marked per batch'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count what is due without sending anything'
+        )
+
+    def handle(self, *args, **options):
+        day = timezone.now().date() + timedelta(days=1)
+        if options['date']:
+            try:
+                day = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('Invalid date format, expected YYYY-MM-DD')
+
+        send_options = {
+            'chunk_size': options['chunk_size'],
+            'connection': get_connection(),
+            'dry_run': options['dry_run'],
+        }
+        prefix = '[dry run] ' if options['dry_run'] else ''
+
+        count = send_reservation_reminders(day, **send_options)
+        self.stdout.write(f'{prefix}Reservation reminders for {day}: {count}')
+
+        if apps.is_installed('hotels'):
+            from hotels.reminders import send_arrival_reminders
+            count = send_arrival_reminders(day, **send_options)
+            self.stdout.write(f'{prefix}Arrival reminders for {day}: {count}')
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-19 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='waitlist',
+            index=models.Index(fields=['date', 'is_active', 'notified'], name='reservation_date_932e5e_idx'),
+        ),
+    ]
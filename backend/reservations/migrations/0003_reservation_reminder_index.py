@@ -0,0 +1,20 @@
+# Generated by Django 5.0.2 on 2026-10-19 02:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+        ('reservations', '0002_waitlist_date_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['date', 'reminder_sent'], name='reservation_date_bdd192_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.0.2 on 2026-10-19 02:04
+
+import re
+
+from django.db import migrations, models
+
+# Copies of reservations.contacts as of this migration, so later changes
+# there never alter what it writes
+
+
+def normalize_phone(raw, country_code='254'):
+    if not raw:
+        return ''
+    raw = raw.strip()
+    digits = re.sub(r'\D', '', raw)
+    if raw.startswith('+') or raw.startswith('00'):
+        digits = digits[2:] if raw.startswith('00') else digits
+    elif digits.startswith('0'):
+        digits = country_code + digits[1:]
+    elif len(digits) == 9:
+        digits = country_code + digits
+    if len(digits) < 8:
+        return ''
+    return '+' + digits
+
+
+def normalize_email(raw):
+    return (raw or '').strip().lower()
+
+
+def backfill_contacts(apps, schema_editor):
+    Customer = apps.get_model('reservations', 'Customer')
+    batch = []
+    for customer in Customer.objects.only('id', 'phone', 'email').iterator(chunk_size=2000):
+        customer.phone_normalized = normalize_phone(customer.phone)
+        customer.email_normalized = normalize_email(customer.email)
+        batch.append(customer)
+        if len(batch) >= 2000:
+            Customer.objects.bulk_update(batch, ['phone_normalized', 'email_normalized'])
+            batch = []
+    Customer.objects.bulk_update(batch, ['phone_normalized', 'email_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0003_reservation_reminder_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='email_normalized',
+            field=models.EmailField(blank=True, db_index=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='phone_normalized',
+            # Was 20, too short for the backfill; 0005 widens databases migrated before
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=23),
+        ),
+        migrations.RunPython(backfill_contacts, migrations.RunPython.noop),
+    ]
@@ -12,6 +12,11 @@ class Customer(models.Model):
     last_name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=20)
+    # Lookup keys kept in sync by save(); see reservations.contacts. A 20
+    # character phone can grow by the country code: '0' + 19 digits becomes
+    # '+254' + 19 digits.
+    phone_normalized = models.CharField(max_length=23, blank=True, db_index=True, editable=False)
+    email_normalized = models.EmailField(blank=True, db_index=True, editable=False)
     date_of_birth = models.DateField(null=True, blank=True)
     
     # Preferences
@@ -37,6 +42,15 @@ class Customer(models.Model):
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
     
+    def save(self, *args, **kwargs):
+        from .contacts import normalize_email, normalize_phone
+        self.phone_normalized = normalize_phone(self.phone)
+        self.email_normalized = normalize_email(self.email)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'phone_normalized', 'email_normalized'}
+        super().save(*args, **kwargs)
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -95,6 +109,9 @@ class Reservation(models.Model):
     
     class Meta:
         ordering = ['date', 'time']
+        indexes = [
+            models.Index(fields=['date', 'reminder_sent']),
+        ]
     
     def __str__(self):
         return f"{self.reservation_number} - {self.customer.full_name} on {self.date} at {self.time}"
@@ -102,7 +119,7 @@ class Reservation(models.Model):
     def save(self, *args, **kwargs):
         if not self.reservation_number:
             # Generate reservation number: RES-YYYYMMDD-XXXXX
-            from django.utils.text import get_random_string
+            from django.utils.crypto import get_random_string
             date_part = timezone.now().strftime('%Y%m%d')
             random_part = get_random_string(5, '0123456789')
             self.reservation_number = f'RES-{date_part}-{random_part}'
@@ -194,6 +211,9 @@ class WaitList(models.Model):
     
     class Meta:
         ordering = ['date', 'time', 'created_at']
+        indexes = [
+            models.Index(fields=['date', 'is_active', 'notified']),
+        ]
     
     def __str__(self):
         return f"Waitlist - {self.customer.full_name} for {self.date} at {self.time}"
\ No newline at end of file
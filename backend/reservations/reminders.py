@@ -0,0 +1,53 @@
+from django.core.mail import EmailMessage, get_connection
+
+from .models import Reservation
+
+REMINDER_SUBJECT = 'Reminder: your table at Maria Havens on {date:%A %d %B}'
+REMINDER_BODY = (
+    'Dear {customer__first_name} {customer__last_name},\n\n'
+    'This is a reminder of your reservation {reservation_number} for {party_size} '
+    'on {date:%A %d %B} at {time:%H:%M}.\n'
+    'If your plans have changed please let us know so we can offer the table to someone else.\n\n'
+    'Maria Havens'
+)
+
+
+def send_in_chunks(queryset, fields, render, chunk_size=500, connection=None, dry_run=False):
+    """
+    Email every row of ``queryset`` and flag it ``reminder_sent``.
+
+    Rows are read ``chunk_size`` at a time by primary key (keyset paging, so
+    memory stays flat however many rows are due). Each chunk is rendered,
+    sent over the one shared ``connection`` and marked sent with a single
+    UPDATE, so a run that dies midway resumes where it stopped. Returns the
+    number of rows handled.
+    """
+    connection = connection or get_connection()
+    model = queryset.model
+    handled = 0
+    last_id = 0
+    with connection:
+        while True:
+            rows = list(queryset.filter(id__gt=last_id).order_by('id').values('id', *fields)[:chunk_size])
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+            if not dry_run:
+                connection.send_messages([render(row) for row in rows])
+                model.objects.filter(id__in=[row['id'] for row in rows]).update(reminder_sent=True)
+            handled += len(rows)
+    return handled
+
+
+def render_reservation_reminder(row):
+    return EmailMessage(REMINDER_SUBJECT.format(**row), REMINDER_BODY.format(**row), to=[row['customer__email']])
+
+
+def send_reservation_reminders(day, **options):
+    """Remind confirmed guests booked on ``day`` who have not been reminded yet"""
+    due = Reservation.objects.filter(date=day, reminder_sent=False, status='confirmed')
+    fields = [
+        'reservation_number', 'date', 'time', 'party_size',
+        'customer__first_name', 'customer__last_name', 'customer__email'
+    ]
+    return send_in_chunks(due, fields, render_reservation_reminder, **options)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from maria_havens_pos.values_serializers import ValuesSerializer
 from .models import Customer, Reservation, ReservationNote, ReservationHistory, WaitList
 
 User = get_user_model()
@@ -104,4 +105,15 @@ class ReservationSummarySerializer(serializers.ModelSerializer):
         fields = [
             'id', 'reservation_number', 'customer_name', 'date', 'time',
             'party_size', 'table_number', 'status', 'occasion', 'created_at'
-        ]
\ No newline at end of file
+        ]
+
+
+def full_name(first_name, last_name):
+    """``Customer.full_name`` from the two columns"""
+    return f"{first_name} {last_name}"
+
+
+class ReservationSummaryValuesSerializer(ValuesSerializer):
+    """``ReservationSummarySerializer`` output built from ``values()`` rows"""
+    serializer_class = ReservationSummarySerializer
+    computed = {'customer_name': (('customer__first_name', 'customer__last_name'), full_name)}
\ No newline at end of file
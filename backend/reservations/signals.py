@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from orders.models import Table
+from . import availability
+from .models import Reservation
+
+
+@receiver(pre_save, sender=Reservation)
+def remember_reservation_date(sender, instance, **kwargs):
+    # A rescheduled reservation also frees its old date
+    instance._previous_date = None
+    if instance.pk and (kwargs.get('update_fields') is None or 'date' in kwargs['update_fields']):
+        instance._previous_date = Reservation.objects.filter(pk=instance.pk).values_list('date', flat=True).first()
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def invalidate_reservation_availability(sender, instance, **kwargs):
+    dates = {instance.date}
+    if getattr(instance, '_previous_date', None):
+        dates.add(instance._previous_date)
+    availability.invalidate_dates(dates)
+    # Drop again once committed so a concurrent read cannot re-cache the old rows
+    transaction.on_commit(lambda: availability.invalidate_dates(dates))
+
+
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+def invalidate_table_availability(sender, instance, **kwargs):
+    # Seating and clearing a table only touch is_occupied, which has no effect on future slots
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and set(update_fields) <= {'is_occupied'}:
+        return
+    availability.invalidate_all()
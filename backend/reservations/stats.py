@@ -0,0 +1,112 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.apps import apps
+from django.db import transaction
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Count, F, Max, Q, Sum
+from django.utils import timezone
+
+from .models import Customer, Reservation
+
+VISIT_RESERVATION_STATUSES = ['seated', 'completed']
+VISIT_BOOKING_STATUSES = ['checked_in', 'checked_out']
+
+
+def record_visit(customer_id, when=None):
+    """Count a visit with one atomic UPDATE (no read-modify-write race)"""
+    when = when or timezone.now()
+    Customer.objects.filter(id=customer_id).update(
+        total_visits=F('total_visits') + 1,
+        last_visit=when,
+        updated_at=when
+    )
+
+
+def record_spend(customer_id, amount, when=None):
+    """Add ``amount`` (may be negative for reversals) to the customer's lifetime spend"""
+    if not customer_id or not amount:
+        return
+    fields = {'total_spent': F('total_spent') + Decimal(amount), 'updated_at': timezone.now()}
+    if when is not None:
+        fields['last_visit'] = when
+    Customer.objects.filter(id=customer_id).update(**fields)
+
+
+def record_order(order):
+    """
+    Add a completed restaurant order to its customer's spend.
+
+    Orders charged to a room are skipped: they are part of the booking's
+    total, which counts at check-out.
+    """
+    if order.customer_id and not _charged_to_room(order):
+        record_spend(order.customer_id, order.total_amount, when=order.completed_at or timezone.now())
+
+
+def _charged_to_room(order):
+    try:
+        return order.folio_entry is not None
+    except (ObjectDoesNotExist, AttributeError):  # no folio entry, or hotels not installed
+        return False
+
+
+def _history():
+    """
+    ``{customer_id: [visits, spent, last_visit]}`` from the full history.
+
+    One grouped aggregate per source (reservations, hotel stays, orders).
+    """
+    totals = defaultdict(lambda: [0, Decimal('0.00'), None])
+
+    def merge(customer_id, visits=0, spent=None, last=None):
+        row = totals[customer_id]
+        row[0] += visits
+        row[1] += spent or 0
+        if last and (row[2] is None or last > row[2]):
+            row[2] = last
+
+    for row in Reservation.objects.filter(status__in=VISIT_RESERVATION_STATUSES).values('customer').annotate(
+        visits=Count('id'), last=Max('seated_at')
+    ).order_by():
+        merge(row['customer'], visits=row['visits'], last=row['last'])
+
+    if apps.is_installed('hotels'):
+        RoomBooking = apps.get_model('hotels', 'RoomBooking')
+        for row in RoomBooking.objects.filter(status__in=VISIT_BOOKING_STATUSES).values('customer').annotate(
+            visits=Count('id'),
+            spent=Sum('total_amount', filter=Q(status='checked_out')),
+            last=Max('checked_in_at')
+        ).order_by():
+            merge(row['customer'], visits=row['visits'], spent=row['spent'], last=row['last'])
+
+    orders = apps.get_model('orders', 'Order').objects.filter(status='completed', customer__isnull=False)
+    if apps.is_installed('hotels'):
+        orders = orders.filter(folio_entry__isnull=True)
+    for row in orders.values('customer').annotate(spent=Sum('total_amount'), last=Max('completed_at')).order_by():
+        merge(row['customer'], spent=row['spent'], last=row['last'])
+
+    return totals
+
+
+def recompute_all(dry_run=False, batch_size=500):
+    """
+    Rebuild every customer's lifetime stats from history.
+
+    Only customers whose stored numbers drifted are written, in
+    ``bulk_update`` batches. Returns the list of customer ids that differed.
+    """
+    totals = _history()
+    empty = [0, Decimal('0.00'), None]
+    changed = []
+    for customer in Customer.objects.only('id', 'total_visits', 'total_spent', 'last_visit').iterator(chunk_size=2000):
+        visits, spent, last = totals.get(customer.id, empty)
+        last = last or customer.last_visit
+        if (customer.total_visits, customer.total_spent, customer.last_visit) != (visits, spent, last):
+            customer.total_visits, customer.total_spent, customer.last_visit = visits, spent, last
+            changed.append(customer)
+
+    if not dry_run:
+        with transaction.atomic():
+            Customer.objects.bulk_update(changed, ['total_visits', 'total_spent', 'last_visit'], batch_size=batch_size)
+    return [customer.id for customer in changed]
@@ -0,0 +1,142 @@
+from datetime import time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from maria_havens_pos.testing import QueryScalingMixin
+from orders.models import Table
+from .models import Customer, Reservation, ReservationHistory, ReservationNote, WaitList
+
+User = get_user_model()
+
+
+class ReservationQueryCountTestCase(QueryScalingMixin, TestCase):
+    """Reservation endpoints run the same number of queries for N and 10N rows"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='testpass123', role='manager'
+        )
+        self.client = self.api_client(self.manager)
+        self.today = timezone.now().date()
+        self.table = Table.objects.create(number='1', capacity=4)
+        self.customer = Customer.objects.create(
+            first_name='Amina', last_name='Otieno', email='amina@example.com', phone='0712345678'
+        )
+        self.seeded = 0
+        self.reservation = self.reserve()
+
+    def next_number(self):
+        self.seeded += 1
+        return self.seeded
+
+    def reserve(self, day=None, status='confirmed', customer=None):
+        # Generated numbers are random and can collide across hundreds of rows
+        return Reservation.objects.create(
+            customer=customer or self.customer, date=day or self.today, time=time(19, 0), party_size=2,
+            table=self.table, status=status, created_by=self.manager, host=self.manager,
+            reservation_number=f'RES-TEST-{self.next_number():05d}'
+        )
+
+    def new_customer(self, **fields):
+        number = self.next_number()
+        return Customer.objects.create(
+            first_name='Guest', last_name=f'{number}', email=f'guest{number}@example.com',
+            phone=f'0700{number:06d}', **fields
+        )
+
+    def seed_customers(self, count, **fields):
+        for _ in range(count):
+            self.new_customer(**fields)
+
+    def seed_reservations(self, count, day=None):
+        for _ in range(count):
+            reservation = self.reserve(day, customer=self.new_customer())
+            ReservationNote.objects.create(reservation=reservation, note='Window seat', created_by=self.manager)
+            ReservationHistory.objects.create(reservation=reservation, action='created', performed_by=self.manager)
+
+    def seed_notes(self, count):
+        for _ in range(count):
+            ReservationNote.objects.create(reservation=self.reservation, note='Allergy', created_by=self.manager)
+            ReservationHistory.objects.create(
+                reservation=self.reservation, action='modified', performed_by=self.manager
+            )
+
+    def seed_waitlist(self, count):
+        for _ in range(count):
+            customer = self.new_customer()
+            WaitList.objects.create(
+                customer=customer, date=self.today, time=time(20, 0), party_size=2,
+                converted_to_reservation=self.reserve(customer=customer)
+            )
+
+    def test_customer_list(self):
+        """Test listing customers"""
+        self.assertQueriesDoNotScale(self.client, '/api/reservations/customers/', self.seed_customers)
+
+    def test_vip_customers(self):
+        """Test the VIP customers action"""
+        self.assertQueriesDoNotScale(
+            self.client, '/api/reservations/customers/vip/', lambda count: self.seed_customers(count, is_vip=True)
+        )
+
+    def test_customer_lookup(self):
+        """Test looking up a customer by phone"""
+        self.assertQueriesDoNotScale(
+            self.client, '/api/reservations/customers/lookup/?phone=0712345678', self.seed_customers
+        )
+
+    def test_reservation_list(self):
+        """Test listing reservations"""
+        self.assertQueriesDoNotScale(self.client, '/api/reservations/reservations/', self.seed_reservations)
+
+    def test_reservation_retrieve(self):
+        """Test retrieving a reservation with many notes and history entries"""
+        self.assertQueriesDoNotScale(
+            self.client, f'/api/reservations/reservations/{self.reservation.id}/', self.seed_notes
+        )
+
+    def test_today(self):
+        """Test today's reservations"""
+        self.assertQueriesDoNotScale(self.client, '/api/reservations/reservations/today/', self.seed_reservations)
+
+    def test_upcoming(self):
+        """Test the upcoming reservations action"""
+        self.assertQueriesDoNotScale(
+            self.client, '/api/reservations/reservations/upcoming/',
+            lambda count: self.seed_reservations(count, self.today + timedelta(days=1))
+        )
+
+    def test_confirm(self):
+        """Test confirming a reservation with a long history"""
+        def seed(count):
+            reservation = self.reserve(status='pending')
+            for _ in range(count):
+                ReservationHistory.objects.create(reservation=reservation, action='modified', performed_by=self.manager)
+            return reservation
+
+        self.assertActionQueriesDoNotScale(
+            self.client, lambda reservation: f'/api/reservations/reservations/{reservation.id}/confirm/', seed
+        )
+
+    def test_seating_plan(self):
+        """Test the seating plan"""
+        def seed(count):
+            for _ in range(count):
+                Table.objects.create(number=f'T{self.next_number()}', capacity=4)
+            self.seed_reservations(count)
+
+        self.assertQueriesDoNotScale(self.client, '/api/reservations/reservations/seating_plan/', seed)
+
+    def test_availability(self):
+        """Test availability for a date"""
+        self.assertQueriesDoNotScale(
+            self.client, f'/api/reservations/reservations/availability/?date={self.today.isoformat()}',
+            self.seed_reservations
+        )
+
+    def test_waitlist_list(self):
+        """Test listing the waitlist"""
+        self.assertQueriesDoNotScale(self.client, '/api/reservations/waitlist/', self.seed_waitlist)
@@ -0,0 +1,538 @@
+from django.test import TestCase, override_settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+import random
+import time as time_module
+from unittest import mock
+from jobqueue.models import Job
+from jobqueue.worker import Worker
+from orders.models import Order, Table
+from .models import Customer, Reservation, WaitList
+from . import availability, stats, waitlist
+from .contacts import normalize_phone
+from .dedupe import dedupe_customers, duplicate_groups
+from .seating import Booking, TableInfo, build_seating_plan, suggest_table
+
+User = get_user_model()
+
+
+class ReservationTestMixin:
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='host',
+            email='host@example.com',
+            password='testpass123',
+            role='manager'
+        )
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+
+        self.customer = Customer.objects.create(
+            first_name='Jane',
+            last_name='Wanjiku',
+            email='jane@example.com',
+            phone='0712345678'
+        )
+        self.day = timezone.now().date() + timedelta(days=1)
+
+    def create_reservation(self, res_time, party_size=2, table=None, status='confirmed', **kwargs):
+        return Reservation.objects.create(
+            customer=self.customer,
+            date=kwargs.pop('date', self.day),
+            time=res_time,
+            party_size=party_size,
+            table=table,
+            status=status,
+            created_by=self.user,
+            **kwargs
+        )
+
+
+class SeatingPlanTestCase(ReservationTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.two_top = Table.objects.create(number='T1', capacity=2, section='Main')
+        self.patio_two = Table.objects.create(number='T2', capacity=2, section='Patio')
+        self.four_top = Table.objects.create(number='T3', capacity=4, section='Main')
+
+    def test_best_fit_prefers_smallest_table(self):
+        """Test a couple is put on a two-top rather than the four-top"""
+        table = suggest_table(self.day, time(19, 0), 2)
+        self.assertEqual(table.capacity, 2)
+
+    def test_seating_preference_breaks_ties(self):
+        """Test the requested section wins among equally sized tables"""
+        table = suggest_table(self.day, time(19, 0), 2, seating_preference='patio')
+        self.assertEqual(table.id, self.patio_two.id)
+
+    def test_turn_time_blocks_back_to_back(self):
+        """Test a table is not reused until the turn time has passed"""
+        self.create_reservation(time(18, 0), table=self.two_top)
+        self.create_reservation(time(18, 0), table=self.patio_two)
+
+        # 20:00 is inside the 15 minute reset of both two-tops
+        self.assertEqual(suggest_table(self.day, time(20, 0), 2).id, self.four_top.id)
+        self.assertEqual(suggest_table(self.day, time(20, 15), 2).capacity, 2)
+
+    def test_pending_reservations_hold_tables(self):
+        """Test pending and unassigned reservations are planned before a suggestion"""
+        self.create_reservation(time(19, 0), party_size=4, status='pending')
+        self.assertIsNone(suggest_table(self.day, time(19, 30), 3))
+
+    def test_late_reservation_spills_into_next_day(self):
+        """Test a reservation running past midnight blocks its table the next day"""
+        self.create_reservation(time(23, 30), party_size=4, table=self.four_top, duration_hours=3)
+        self.assertIsNone(suggest_table(self.day + timedelta(days=1), time(1, 0), 4))
+
+    def test_seating_plan_endpoint(self):
+        """Test the seating plan lists assigned and unassigned reservations"""
+        seated = self.create_reservation(time(19, 0), party_size=4)
+        too_big = self.create_reservation(time(19, 0), party_size=6)
+
+        response = self.client.get('/api/reservations/reservations/seating_plan/', {'date': self.day.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        assignments = {row['reservation_id']: row['table_number'] for row in response.data['assignments']}
+        self.assertEqual(assignments[seated.id], 'T3')
+        self.assertEqual([row['reservation_id'] for row in response.data['unassigned']], [too_big.id])
+
+    def test_suggest_table_endpoint(self):
+        """Test suggesting a table through the API"""
+        response = self.client.get('/api/reservations/reservations/suggest_table/', {
+            'date': self.day.isoformat(), 'time': '19:00', 'party_size': 3
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['available'])
+        self.assertEqual(response.data['table']['number'], 'T3')
+
+        response = self.client.get('/api/reservations/reservations/suggest_table/', {'date': self.day.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        for duration in ['nan', 'inf', '-1', '0', '48']:
+            response = self.client.get('/api/reservations/reservations/suggest_table/', {
+                'date': self.day.isoformat(), 'time': '19:00', 'duration_hours': duration
+            })
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, duration)
+
+    def test_seat_without_table_uses_suggestion(self):
+        """Test seating a reservation without a table picks a free one"""
+        reservation = self.create_reservation(time(19, 0), party_size=2)
+        self.two_top.is_occupied = True
+        self.two_top.save()
+
+        response = self.client.post(f'/api/reservations/reservations/{reservation.id}/seat/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.table_id, self.patio_two.id)
+        self.assertEqual(reservation.status, 'seated')
+
+    def test_seat_refused_when_own_table_occupied_and_none_free(self):
+        """Test a party is not seated at its occupied table when nothing else is free"""
+        reservation = self.create_reservation(time(19, 0), party_size=4, table=self.four_top)
+        self.four_top.is_occupied = True
+        self.four_top.save()
+
+        response = self.client.post(f'/api/reservations/reservations/{reservation.id}/seat/')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, 'confirmed')
+        self.assertFalse(reservation.history.filter(action='seated').exists())
+
+    def test_large_day_plans_quickly(self):
+        """Test planning 400 reservations over 100 tables stays well under a second"""
+        rng = random.Random(30)
+        tables = [TableInfo(i, f'T{i}', rng.choice([2, 2, 4, 4, 6, 8]), rng.choice(['Main', 'Patio'])) for i in range(100)]
+        start = datetime.combine(self.day, time(11, 0))
+        bookings = []
+        for i in range(400):
+            begin = start + timedelta(minutes=15 * rng.randrange(44))
+            bookings.append(Booking(i, begin, begin + timedelta(hours=2), rng.randint(1, 8), None, ''))
+
+        started = time_module.perf_counter()
+        plan = build_seating_plan(tables, bookings)
+        elapsed = time_module.perf_counter() - started
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(len(plan.assignments) + len(plan.unassigned), 400)
+        for booking in bookings:
+            table = plan.table_for(booking.id)
+            if table is not None:
+                self.assertGreaterEqual(table.capacity, booking.party_size)
+
+
+class AvailabilityTestCase(ReservationTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.two_top = Table.objects.create(number='T1', capacity=2)
+        self.four_top = Table.objects.create(number='T2', capacity=4)
+
+    def check(self, res_time, party_size=2, res_date=None, **params):
+        return self.client.get('/api/reservations/reservations/availability/', {
+            'date': (res_date or self.day).isoformat(),
+            'time': res_time,
+            'party_size': party_size,
+            **params
+        })
+
+    def test_duration_blocks_whole_stay(self):
+        """Test a long reservation blocks its table for its full duration"""
+        self.create_reservation(time(18, 0), party_size=4, table=self.four_top, duration_hours=4)
+
+        response = self.check('21:30', party_size=3)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['available'])
+        self.assertEqual(response.data['existing_reservations'], 1)
+
+        response = self.check('22:15', party_size=3)
+        self.assertTrue(response.data['available'])
+
+    def test_across_midnight(self):
+        """Test late parties are checked against bookings after midnight"""
+        self.create_reservation(time(0, 30), party_size=4, table=self.four_top, date=self.day + timedelta(days=1))
+
+        self.assertFalse(self.check('23:00', party_size=3).data['available'])
+        self.assertTrue(self.check('20:00', party_size=3).data['available'])
+
+        self.create_reservation(time(23, 0), party_size=2, table=self.two_top)
+        response = self.check('01:00', res_date=self.day + timedelta(days=1))
+        self.assertFalse(response.data['available'])
+
+    def test_duration_must_be_finite_and_bounded(self):
+        """Test nan, infinite and out-of-range durations are rejected"""
+        for duration in ['nan', 'inf', '-inf', '0', '13']:
+            response = self.check('19:00', duration_hours=duration)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, duration)
+
+        self.assertEqual(self.check('19:00', duration_hours='12').status_code, status.HTTP_200_OK)
+
+    def test_cache_is_updated_on_changes(self):
+        """Test cached availability follows new, rescheduled and cancelled reservations"""
+        self.assertEqual(self.check('19:00').data['available_tables'], 2)
+
+        reservation = self.create_reservation(time(19, 0), party_size=4)
+        self.assertEqual(self.check('19:00').data['available_tables'], 1)
+
+        reservation.date = self.day + timedelta(days=3)
+        reservation.save()
+        self.assertEqual(self.check('19:00').data['available_tables'], 2)
+
+        reservation.date = self.day
+        reservation.save()
+        response = self.client.post(f'/api/reservations/reservations/{reservation.id}/cancel/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.check('19:00').data['available_tables'], 2)
+
+    def test_cached_day_uses_no_queries(self):
+        """Test repeated checks for a date are served from the cache"""
+        availability.for_date(self.day)
+        with self.assertNumQueries(0):
+            day = availability.for_date(self.day)
+            day.free_tables(time(19, 0), 2, 2)
+
+    def test_local_cache_keeps_days_briefly(self):
+        """Test a per-process cache holds days for seconds, a shared one for an hour"""
+        self.assertEqual(availability.cache_timeout(), availability.LOCAL_CACHE_TIMEOUT)
+
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://redis'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(availability.cache_timeout(), availability.CACHE_TIMEOUT)
+
+    def test_evening_for_all_party_sizes(self):
+        """Test the whole evening is returned for every party size in one call"""
+        self.create_reservation(time(19, 0), party_size=2, table=self.two_top)
+
+        response = self.client.get('/api/reservations/reservations/availability/', {
+            'date': self.day.isoformat(), 'start': '18:00', 'end': '20:00'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        slots = {slot['time']: slot['available_tables'] for slot in response.data['slots']}
+        self.assertEqual(len(slots), 9)
+        self.assertEqual(slots['18:00'], {1: 1, 2: 1, 3: 1, 4: 1})
+        self.assertEqual(slots['20:00'], {1: 1, 2: 1, 3: 1, 4: 1})
+        self.assertNotIn('17:45', slots)
+        self.assertEqual(availability.for_date(self.day).counts([time(21, 15)], [2])[time(21, 15)][2], 2)
+
+    def test_availability_grid(self):
+        """Test the grid covers every date, time and party size in one response"""
+        self.create_reservation(time(19, 0), party_size=4, table=self.four_top)
+
+        response = self.client.get('/api/reservations/reservations/availability_grid/', {
+            'start_date': self.day.isoformat(), 'days': 3, 'start': '18:00', 'end': '19:00', 'party_sizes': '2,4'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['times'], ['18:00', '18:15', '18:30', '18:45', '19:00'])
+        self.assertEqual(len(response.data['grid']), 3)
+        self.assertEqual(response.data['grid'][self.day.isoformat()][0], [1, 0])
+        self.assertEqual(response.data['grid'][(self.day + timedelta(days=1)).isoformat()][0], [2, 1])
+        self.assertIn('ETag', response)
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/reservations/reservations/availability_grid/', {
+                'start_date': self.day.isoformat(), 'days': 3
+            })
+
+    def test_availability_grid_validates_params(self):
+        """Test out-of-range days, durations and party sizes are rejected"""
+        for params in [
+            {'days': 0}, {'days': 10 ** 9}, {'duration_hours': 'nan'}, {'duration_hours': 'inf'},
+            {'duration_hours': '100'}, {'party_sizes': '2,0'}, {'party_sizes': '1000000'},
+        ]:
+            response = self.client.get('/api/reservations/reservations/availability_grid/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class WaitlistMatchingTestCase(ReservationTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.four_top = Table.objects.create(number='T1', capacity=4)
+
+    def wait(self, res_time, party_size, email):
+        customer = Customer.objects.create(first_name='Wait', last_name=email, email=email, phone='0700000000')
+        return WaitList.objects.create(customer=customer, date=self.day, time=res_time, party_size=party_size)
+
+    def test_cancellation_notifies_best_candidate(self):
+        """Test a cancellation offers the table to the largest party that fits, oldest first"""
+        reservation = self.create_reservation(time(19, 0), party_size=4, table=self.four_top)
+        couple = self.wait(time(19, 0), 2, 'couple@example.com')
+        first_family = self.wait(time(19, 15), 4, 'family1@example.com')
+        second_family = self.wait(time(19, 0), 4, 'family2@example.com')
+        far_off = self.wait(time(21, 0), 4, 'late@example.com')
+
+        response = self.client.post(f'/api/reservations/reservations/{reservation.id}/cancel/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(WaitList.objects.filter(notified=True).exists())
+        Worker(threads=1).run_once()
+
+        notified = set(WaitList.objects.filter(notified=True).values_list('id', flat=True))
+        self.assertEqual(notified, {first_family.id})
+        self.assertNotIn(couple.id, notified)
+        self.assertNotIn(second_family.id, notified)
+        self.assertNotIn(far_off.id, notified)
+
+    def test_failed_match_does_not_fail_cancellation(self):
+        """Test a crash while matching is retried by the worker, not returned to the client"""
+        reservation = self.create_reservation(time(19, 0), party_size=4, table=self.four_top)
+        self.wait(time(19, 0), 4, 'family@example.com')
+
+        response = self.client.post(f'/api/reservations/reservations/{reservation.id}/cancel/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with mock.patch('reservations.jobs.match_freed', side_effect=RuntimeError('boom')):
+            Worker(threads=1).run_once()
+
+        job = Job.objects.get(job_type='reservations.match_waitlist')
+        self.assertEqual(job.status, 'queued')
+        self.assertIn('boom', job.last_error)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, 'cancelled')
+
+    def test_burst_of_cancellations_in_one_pass(self):
+        """Test several freed slots never hand the same table out twice"""
+        two_top = Table.objects.create(number='T2', capacity=2)
+        first = self.create_reservation(time(19, 0), party_size=4, table=self.four_top)
+        second = self.create_reservation(time(19, 0), party_size=2, table=two_top)
+        entries = [self.wait(time(19, 0), 2, f'guest{i}@example.com') for i in range(3)]
+
+        first.status = second.status = 'cancelled'
+        first.save()
+        second.save()
+        matched = waitlist.match_freed([(self.day, time(19, 0)), (self.day, time(19, 0)), (self.day, time(19, 0))])
+
+        self.assertEqual([entry.id for entry in matched], [entries[0].id, entries[1].id])
+        self.assertFalse(WaitList.objects.get(id=entries[2].id).notified)
+
+    def test_match_converts_to_reservations(self):
+        """Test the batched match action books waiting parties straight in"""
+        entry = self.wait(time(20, 0), 3, 'walkin@example.com')
+        too_big = self.wait(time(20, 0), 6, 'party@example.com')
+
+        response = self.client.post('/api/reservations/waitlist/match/', {
+            'date': self.day.isoformat(), 'convert': True
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data['matched']], [entry.id])
+
+        entry.refresh_from_db()
+        self.assertFalse(entry.is_active)
+        self.assertEqual(entry.converted_to_reservation.table_id, self.four_top.id)
+        self.assertTrue(WaitList.objects.get(id=too_big.id).is_active)
+
+
+class ReminderTestCase(ReservationTestMixin, TestCase):
+    def test_send_reminders_in_chunks(self):
+        """Test due reminders are sent in chunks and each row is marked once"""
+        due = [self.create_reservation(time(18, 0) if i % 2 else time(20, 0)) for i in range(5)]
+        pending = self.create_reservation(time(19, 0), status='pending')
+        other_day = self.create_reservation(time(19, 0), date=self.day + timedelta(days=1))
+
+        out = StringIO()
+        call_command('send_reminders', '--date', self.day.isoformat(), '--chunk-size', '2', stdout=out)
+
+        self.assertIn('Reservation reminders for', out.getvalue())
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].subject, f'Reminder: your table at Maria Havens on {self.day:%A %d %B}')
+        self.assertEqual(Reservation.objects.filter(id__in=[r.id for r in due], reminder_sent=True).count(), 5)
+        self.assertFalse(Reservation.objects.get(id=pending.id).reminder_sent)
+        self.assertFalse(Reservation.objects.get(id=other_day.id).reminder_sent)
+
+        # A second run has nothing left to send
+        call_command('send_reminders', '--date', self.day.isoformat(), stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_dry_run_sends_nothing(self):
+        """Test a dry run only counts due reminders"""
+        self.create_reservation(time(19, 0))
+        out = StringIO()
+        call_command('send_reminders', '--dry-run', stdout=out)
+
+        self.assertIn('[dry run] Reservation reminders', out.getvalue())
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(Reservation.objects.filter(reminder_sent=True).exists())
+
+
+class CustomerStatsTestCase(ReservationTestMixin, TestCase):
+    def create_order(self, total, status='served', **kwargs):
+        return Order.objects.create(
+            customer=kwargs.pop('customer', self.customer),
+            order_type='takeaway',
+            status=status,
+            total_amount=Decimal(total),
+            **kwargs
+        )
+
+    def test_seat_and_order_update_stats(self):
+        """Test seating counts a visit and completing an order adds spend"""
+        reservation = self.create_reservation(time(19, 0))
+        self.client.post(f'/api/reservations/reservations/{reservation.id}/seat/')
+        order = self.create_order('1500.00')
+        self.client.post(f'/api/orders/orders/{order.id}/complete/')
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.total_visits, 1)
+        self.assertEqual(self.customer.total_spent, Decimal('1500.00'))
+        self.assertIsNotNone(self.customer.last_visit)
+
+    def test_walk_in_order_is_linked_by_email(self):
+        """Test an order placed with a known email is linked to the customer"""
+        response = self.client.post('/api/orders/orders/', {
+            'customer_name': 'Jane', 'customer_email': 'JANE@example.com', 'order_type': 'takeaway'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.get(id=response.data['id']).customer_id, self.customer.id)
+
+    def test_recompute_fixes_drift(self):
+        """Test recomputing rebuilds stats from history and skips customers already correct"""
+        self.create_reservation(time(19, 0), status='completed', seated_at=timezone.now() - timedelta(days=3))
+        self.create_reservation(time(20, 0), status='cancelled')
+        order = self.create_order('800.00', status='completed', completed_at=timezone.now())
+        self.create_order('300.00', status='cancelled')
+        Customer.objects.filter(id=self.customer.id).update(total_visits=7, total_spent=Decimal('5.00'))
+        untouched = Customer.objects.create(first_name='New', last_name='Guest', email='new@example.com', phone='0700')
+
+        out = StringIO()
+        call_command('recompute_customer_stats', stdout=out)
+        self.assertIn('Customers corrected: 1', out.getvalue())
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.total_visits, 1)
+        self.assertEqual(self.customer.total_spent, Decimal('800.00'))
+        self.assertEqual(self.customer.last_visit, Order.objects.get(id=order.id).completed_at)
+        self.assertEqual(stats.recompute_all(), [])
+        untouched.refresh_from_db()
+        self.assertEqual(untouched.total_visits, 0)
+
+
+class CustomerContactsTestCase(ReservationTestMixin, TestCase):
+    def test_normalize_phone(self):
+        """Test local, international and messy numbers normalize to E.164"""
+        for raw in ['0712 345 678', '712345678', '254712345678', '+254-712-345678', '00254712345678']:
+            self.assertEqual(normalize_phone(raw), '+254712345678', raw)
+        self.assertEqual(normalize_phone('+44 20 7946 0958'), '+442079460958')
+        self.assertEqual(normalize_phone('123'), '')
+        longest = normalize_phone('0' + '7' * 19)
+        self.assertEqual(len(longest), Customer._meta.get_field('phone_normalized').max_length)
+        self.assertEqual(normalize_phone(''), '')
+
+    def test_lookup_by_phone_or_email(self):
+        """Test the POS can find a guest however the number is typed"""
+        self.assertEqual(self.customer.phone_normalized, '+254712345678')
+
+        response = self.client.get('/api/reservations/customers/lookup/', {'phone': '+254 712 345678'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], self.customer.id)
+
+        response = self.client.get('/api/reservations/customers/lookup/', {'email': ' Jane@Example.com '})
+        self.assertEqual(response.data['id'], self.customer.id)
+
+        response = self.client.get('/api/reservations/customers/lookup/', {'phone': '0799999999'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_order_linked_by_phone(self):
+        """Test a walk-in order is linked to the customer with the same phone number"""
+        response = self.client.post('/api/orders/orders/', {
+            'customer_name': 'Jane', 'customer_phone': '+254712345678', 'order_type': 'takeaway'
+        }, format='json')
+        self.assertEqual(Order.objects.get(id=response.data['id']).customer_id, self.customer.id)
+
+    def test_dedupe_merges_by_blocking_keys(self):
+        """Test customers sharing a phone or email and a name are merged with their history"""
+        same_phone = Customer.objects.create(
+            first_name='Jane', last_name='W', email='jane.w@example.com', phone='0712 345 678',
+            total_visits=2, dietary_restrictions='Vegetarian'
+        )
+        same_email_as_dup = Customer.objects.create(
+            first_name='J', last_name='Wanjiku', email='JANE.W@example.com', phone='0733000000', is_vip=True
+        )
+        stranger = Customer.objects.create(first_name='Other', last_name='Guest', email='o@example.com', phone='0744000000')
+        reservation = self.create_reservation(time(19, 0))
+        reservation.customer = same_email_as_dup
+        reservation.save()
+
+        out = StringIO()
+        call_command('dedupe_customers', stdout=out)
+        self.assertIn('Duplicate customers merged: 2', out.getvalue())
+
+        survivor = Customer.objects.get(id=same_phone.id)
+        self.assertEqual(survivor.total_visits, 2)
+        self.assertFalse(survivor.is_vip)
+        self.assertIn(f'Review customer {survivor.id}: is_vip was set on {same_email_as_dup.id}', out.getvalue())
+        self.assertEqual(survivor.dietary_restrictions, 'Vegetarian')
+        self.assertEqual(Reservation.objects.get(id=reservation.id).customer_id, survivor.id)
+        self.assertEqual(set(Customer.objects.values_list('id', flat=True)), {survivor.id, stranger.id})
+
+    def test_dedupe_keeps_family_on_shared_phone(self):
+        """Test a shared phone alone never merges people with different names"""
+        husband = Customer.objects.create(
+            first_name='John', last_name='Wanjiku', email='john@example.com', phone='0712345678', is_blacklisted=True
+        )
+        colleague = Customer.objects.create(
+            first_name='Jane', last_name='Kamau', email='jk@example.com', phone='+254712345678'
+        )
+
+        self.assertEqual(duplicate_groups(), [])
+        call_command('dedupe_customers', stdout=StringIO())
+        self.assertEqual(Customer.objects.filter(id__in=[self.customer.id, husband.id, colleague.id]).count(), 3)
+        self.customer.refresh_from_db()
+        self.assertFalse(self.customer.is_blacklisted)
+
+    def test_dedupe_never_copies_blacklist(self):
+        """Test a blacklisted duplicate is merged but the flag is left for review"""
+        duplicate = Customer.objects.create(
+            first_name='jane', last_name='wanjiku', email='JANE@Example.com', phone='0799000000',
+            is_blacklisted=True
+        )
+
+        groups = dedupe_customers()
+
+        self.assertEqual(groups, [([self.customer.id, duplicate.id], [(duplicate.id, 'is_blacklisted')])])
+        self.customer.refresh_from_db()
+        self.assertFalse(self.customer.is_blacklisted)
@@ -8,5 +8,5 @@ router.register(r'reservations', views.ReservationViewSet)
 router.register(r'waitlist', views.WaitListViewSet)
 
 urlpatterns = [
-    path('api/reservations/', include(router.urls)),
+    path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -12,10 +12,18 @@ from datetime import date, datetime, timedelta
 from .models import Customer, Reservation, ReservationNote, ReservationHistory, WaitList
 from .serializers import (
     CustomerSerializer, ReservationSerializer, ReservationSummarySerializer,
-    ReservationNoteSerializer, WaitListSerializer
+    ReservationSummaryValuesSerializer, ReservationNoteSerializer, WaitListSerializer
 )
 from accounts.permissions import RoleBasedPermission
+from maria_havens_pos.caching import cached_response
+from maria_havens_pos.values_serializers import ValuesListMixin
+from jobqueue.queue import enqueue
 from orders.models import Table
+from . import availability, seating, stats, waitlist
+from .contacts import find_customer
+
+# Largest party a reservation can be made for (see Reservation.party_size)
+MAX_PARTY_SIZE = 20
 
 
 class CustomerViewSet(viewsets.ModelViewSet):
@@ -28,6 +36,20 @@ class CustomerViewSet(viewsets.ModelViewSet):
     ordering_fields = ['first_name', 'last_name', 'total_visits', 'total_spent', 'last_visit']
     ordering = ['last_name', 'first_name']
     
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """Find a guest by phone number or email (indexed exact match)"""
+        phone = request.query_params.get('phone')
+        email = request.query_params.get('email')
+        if not phone and not email:
+            return Response({'error': 'Phone or email required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        customer = find_customer(phone=phone, email=email)
+        if customer is None:
+            return Response({'error': 'Customer not found'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = self.get_serializer(customer)
+        return Response(serializer.data)
+    
     @action(detail=False, methods=['get'])
     def vip(self, request):
         """Get VIP customers"""
@@ -52,14 +74,15 @@ class CustomerViewSet(viewsets.ModelViewSet):
         return Response({'status': 'VIP status removed'})
 
 
-class ReservationViewSet(viewsets.ModelViewSet):
-    queryset = Reservation.objects.select_related('customer', 'table', 'created_by', 'host').prefetch_related('notes', 'history')
+class ReservationViewSet(ValuesListMixin, viewsets.ModelViewSet):
+    queryset = Reservation.objects.select_related('customer', 'table', 'created_by', 'host').prefetch_related('notes__created_by', 'history__performed_by')
     permission_classes = [IsAuthenticated, RoleBasedPermission]
     filter_backends = [SearchFilter, OrderingFilter]
     filterset_fields = ['status', 'date', 'occasion', 'table']
     search_fields = ['reservation_number', 'customer__first_name', 'customer__last_name', 'customer__phone']
     ordering_fields = ['date', 'time', 'created_at', 'party_size']
     ordering = ['date', 'time']
+    values_serializer_class = ReservationSummaryValuesSerializer
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -75,8 +98,8 @@ class ReservationViewSet(viewsets.ModelViewSet):
         reservation = self.get_object()
         if reservation.status == 'pending':
             reservation.status = 'confirmed'
-            reservation.confirmation_sent = True
             reservation.save()
+            enqueue('reservations.send_confirmation', {'reservation_id': reservation.id})
             
             # Create history entry
             ReservationHistory.objects.create(
@@ -104,6 +127,7 @@ class ReservationViewSet(viewsets.ModelViewSet):
                 description=f'Cancelled from {old_status} status',
                 performed_by=request.user
             )
+            waitlist.on_reservation_freed(reservation)
             
             return Response({'status': 'reservation cancelled'})
         return Response({'error': 'Reservation cannot be cancelled'}, status=status.HTTP_400_BAD_REQUEST)
@@ -119,9 +143,30 @@ class ReservationViewSet(viewsets.ModelViewSet):
                 table = get_object_or_404(Table, id=table_id)
                 if table.is_occupied:
                     return Response({'error': 'Table is already occupied'}, status=status.HTTP_400_BAD_REQUEST)
+            elif not reservation.table_id or reservation.table.is_occupied:
+                # No table picked: use the best free table that keeps the rest of the day seatable
+                suggestion = seating.suggest_table(
+                    reservation.date, reservation.time, reservation.party_size,
+                    reservation.duration_hours, reservation.seating_preference,
+                    exclude=reservation.id, exclude_occupied=True
+                )
+                if suggestion:
+                    table = Table.objects.get(id=suggestion.id)
+                elif reservation.table_id:
+                    # Never seat a party at a table someone else is sitting at
+                    return Response(
+                        {'error': f'Table {reservation.table.number} is occupied and no other table is free'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                else:
+                    table = None
+            else:
+                table = reservation.table
+            
+            if table:
                 reservation.table = table
                 table.is_occupied = True
-                table.save()
+                table.save(update_fields=['is_occupied'])
             
             reservation.status = 'seated'
             reservation.seated_at = timezone.now()
@@ -129,10 +174,7 @@ class ReservationViewSet(viewsets.ModelViewSet):
             reservation.save()
             
             # Update customer stats
-            customer = reservation.customer
-            customer.total_visits += 1
-            customer.last_visit = timezone.now()
-            customer.save()
+            stats.record_visit(reservation.customer_id, reservation.seated_at)
             
             # Create history entry
             ReservationHistory.objects.create(
@@ -157,7 +199,7 @@ class ReservationViewSet(viewsets.ModelViewSet):
             # Free table
             if reservation.table:
                 reservation.table.is_occupied = False
-                reservation.table.save()
+                reservation.table.save(update_fields=['is_occupied'])
             
             # Create history entry
             ReservationHistory.objects.create(
@@ -183,6 +225,7 @@ class ReservationViewSet(viewsets.ModelViewSet):
                 action='no_show',
                 performed_by=request.user
             )
+            waitlist.on_reservation_freed(reservation)
             
             return Response({'status': 'marked as no show'})
         return Response({'error': 'Cannot mark as no show'}, status=status.HTTP_400_BAD_REQUEST)
@@ -225,54 +268,174 @@ class ReservationViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
-    def availability(self, request):
-        """Check availability for a specific date and time"""
+    def seating_plan(self, request):
+        """Table assignments for every active reservation on a date"""
         date_str = request.query_params.get('date')
-        time_str = request.query_params.get('time')
-        party_size = request.query_params.get('party_size', 2)
+        try:
+            plan_date = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else timezone.now().date()
+        except ValueError:
+            return Response({'error': 'Invalid date format'}, status=status.HTTP_400_BAD_REQUEST)
         
+        plan = seating.plan_for_date(plan_date)
+        reservation_numbers = dict(
+            Reservation.objects.filter(id__in=list(plan.assignments) + plan.unassigned)
+            .values_list('id', 'reservation_number')
+        )
+        
+        return Response({
+            'date': plan_date,
+            'assignments': [
+                {
+                    'reservation_id': reservation_id,
+                    'reservation_number': reservation_numbers.get(reservation_id),
+                    'table_id': table_id,
+                    'table_number': plan.tables[table_id].number,
+                }
+                for reservation_id, table_id in plan.assignments.items()
+            ],
+            'unassigned': [
+                {'reservation_id': reservation_id, 'reservation_number': reservation_numbers.get(reservation_id)}
+                for reservation_id in plan.unassigned
+            ]
+        })
+    
+    @action(detail=False, methods=['get'])
+    def suggest_table(self, request):
+        """Suggest the best table for a party at a date and time"""
+        date_str = request.query_params.get('date')
+        time_str = request.query_params.get('time')
         if not date_str or not time_str:
             return Response({'error': 'Date and time required'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
             check_date = datetime.strptime(date_str, '%Y-%m-%d').date()
             check_time = datetime.strptime(time_str, '%H:%M').time()
-            party_size = int(party_size)
+            party_size = int(request.query_params.get('party_size', 2))
+            duration_hours = float(request.query_params.get('duration_hours', 2))
         except ValueError:
             return Response({'error': 'Invalid date/time format'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Check existing reservations
-        existing_reservations = Reservation.objects.filter(
-            date=check_date,
-            status__in=['confirmed', 'seated'],
-            time__range=(
-                (datetime.combine(check_date, check_time) - timedelta(hours=2)).time(),
-                (datetime.combine(check_date, check_time) + timedelta(hours=2)).time()
+        if not 0 < duration_hours <= seating.MAX_DURATION_HOURS:
+            return Response(
+                {'error': f'duration_hours must be more than 0 and at most {seating.MAX_DURATION_HOURS}'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        ).count()
         
-        # Get available tables
-        available_tables = Table.objects.filter(
-            is_active=True,
-            capacity__gte=party_size
-        ).exclude(
-            reservations__date=check_date,
-            reservations__status__in=['confirmed', 'seated'],
-            reservations__time__range=(
-                (datetime.combine(check_date, check_time) - timedelta(hours=2)).time(),
-                (datetime.combine(check_date, check_time) + timedelta(hours=2)).time()
-            )
+        table = seating.suggest_table(
+            check_date, check_time, party_size, duration_hours,
+            request.query_params.get('seating_preference', '')
         )
+        if table is None:
+            return Response({'available': False, 'table': None})
+        return Response({'available': True, 'table': table._asdict()})
+    
+    @action(detail=False, methods=['get'])
+    def availability(self, request):
+        """
+        Check availability for a date.
+        
+        With ``time`` the answer is for one party size; without it every
+        quarter hour between ``start`` and ``end`` is returned for all party sizes.
+        """
+        date_str = request.query_params.get('date')
+        time_str = request.query_params.get('time')
+        party_size = request.query_params.get('party_size', 2)
         
+        if not date_str:
+            return Response({'error': 'Date required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            check_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            duration_hours = float(request.query_params.get('duration_hours', 2))
+            if time_str:
+                check_time = datetime.strptime(time_str, '%H:%M').time()
+                party_size = int(party_size)
+            else:
+                start = datetime.strptime(request.query_params.get('start', '17:00'), '%H:%M').time()
+                end = datetime.strptime(request.query_params.get('end', '22:00'), '%H:%M').time()
+        except ValueError:
+            return Response({'error': 'Invalid date/time format'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not 0 < duration_hours <= seating.MAX_DURATION_HOURS:
+            return Response(
+                {'error': f'duration_hours must be more than 0 and at most {seating.MAX_DURATION_HOURS}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        day = availability.for_date(check_date)
+        
+        if time_str:
+            available_tables = day.free_tables(check_time, duration_hours, party_size)
+            return Response({
+                'available': len(available_tables) > 0,
+                'available_tables': len(available_tables),
+                'existing_reservations': day.existing_reservations(check_time, duration_hours)
+            })
+        
+        party_sizes = range(1, day.max_capacity + 1)
+        counts = day.counts(availability.times_between(start, end), party_sizes, duration_hours)
         return Response({
-            'available': available_tables.count() > 0,
-            'available_tables': available_tables.count(),
-            'existing_reservations': existing_reservations
+            'date': check_date,
+            'duration_hours': duration_hours,
+            'slots': [
+                {
+                    'time': slot_time.strftime('%H:%M'),
+                    'available_tables': by_size
+                }
+                for slot_time, by_size in counts.items()
+            ]
+        })
+    
+    @action(detail=False, methods=['get'])
+    def availability_grid(self, request):
+        """Free tables for every date, time and party size in a range"""
+        try:
+            start_date = datetime.strptime(
+                request.query_params.get('start_date') or timezone.now().date().isoformat(), '%Y-%m-%d'
+            ).date()
+            days = int(request.query_params.get('days', 7))
+            start = datetime.strptime(request.query_params.get('start', '17:00'), '%H:%M').time()
+            end = datetime.strptime(request.query_params.get('end', '22:00'), '%H:%M').time()
+            duration_hours = float(request.query_params.get('duration_hours', 2))
+            party_sizes = [int(size) for size in request.query_params.get('party_sizes', '').split(',') if size]
+        except ValueError:
+            return Response({'error': 'Invalid date/time format'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not 1 <= days <= 31:
+            return Response({'error': 'days must be between 1 and 31'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 < duration_hours <= seating.MAX_DURATION_HOURS:
+            return Response(
+                {'error': f'duration_hours must be more than 0 and at most {seating.MAX_DURATION_HOURS}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if any(not 1 <= size <= MAX_PARTY_SIZE for size in party_sizes):
+            return Response(
+                {'error': f'party_sizes must be between 1 and {MAX_PARTY_SIZE}'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        times = availability.times_between(start, end)
+        dates = [start_date + timedelta(days=offset) for offset in range(days)]
+        by_date = {day: availability.for_date(day) for day in dates}
+        if not party_sizes:
+            party_sizes = list(range(1, max(day.max_capacity for day in by_date.values()) + 1))
+        
+        grid = {}
+        for day, day_availability in by_date.items():
+            counts = day_availability.counts(times, party_sizes, duration_hours)
+            grid[day.isoformat()] = [[counts[slot_time][size] for size in party_sizes] for slot_time in times]
+        
+        return cached_response(request, {
+            'start_date': start_date.isoformat(),
+            'days': days,
+            'duration_hours': duration_hours,
+            'times': [slot_time.strftime('%H:%M') for slot_time in times],
+            'party_sizes': party_sizes,
+            'grid': grid
         })
 
 
 class WaitListViewSet(viewsets.ModelViewSet):
-    queryset = WaitList.objects.select_related('customer', 'converted_to_reservation')
+    queryset = WaitList.objects.select_related('customer', 'converted_to_reservation__customer')
     serializer_class = WaitListSerializer
     permission_classes = [IsAuthenticated, RoleBasedPermission]
     filter_backends = [SearchFilter, OrderingFilter]
@@ -287,8 +450,8 @@ class WaitListViewSet(viewsets.ModelViewSet):
         waitlist_entry.notified = True
         waitlist_entry.notified_at = timezone.now()
         waitlist_entry.save()
+        enqueue('reservations.notify_waitlist', {'waitlist_id': waitlist_entry.id})
         
-        # Here you would integrate with email/SMS service
         return Response({'status': 'customer notified'})
     
     @action(detail=True, methods=['post'])
@@ -316,4 +479,18 @@ class WaitListViewSet(viewsets.ModelViewSet):
         return Response({
             'status': 'converted to reservation',
             'reservation_id': reservation.id
-        })
\ No newline at end of file
+        })
+    
+    @action(detail=False, methods=['post'])
+    def match(self, request):
+        """Offer free tables on a date to waiting parties, oldest first"""
+        date_str = request.data.get('date')
+        try:
+            match_date = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else timezone.now().date()
+        except ValueError:
+            return Response({'error': 'Invalid date format'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        convert = str(request.data.get('convert', '')).lower() in ('1', 'true')
+        matched = waitlist.match_date(match_date, convert=convert, user=request.user)
+        serializer = self.get_serializer(matched, many=True)
+        return Response({'matched': serializer.data})
\ No newline at end of file
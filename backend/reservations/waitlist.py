@@ -0,0 +1,168 @@
+from bisect import bisect_right, insort
+from collections import defaultdict, deque
+
+from django.db import transaction
+from django.utils import timezone
+
+from jobqueue.queue import enqueue
+from . import availability
+from .models import Reservation, WaitList
+
+BUCKET_MINUTES = 30
+# A freed slot is offered to parties waiting up to one bucket either side of it
+TOLERANCE_BUCKETS = 1
+DURATION_HOURS = 2
+
+
+def time_bucket(value):
+    return (value.hour * 60 + value.minute) // BUCKET_MINUTES
+
+
+class WaitlistIndex:
+    """
+    Waiting parties keyed by ``(date, time bucket, party_size)``.
+
+    Each key holds a FIFO queue, and every ``(date, bucket)`` keeps a sorted
+    list of the party sizes waiting in it, so the largest party that fits a
+    freed table is found with a bisect rather than a scan.
+    """
+
+    def __init__(self, entries=()):
+        self._queues = defaultdict(deque)
+        self._sizes = defaultdict(list)
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry):
+        slot = (entry.date, time_bucket(entry.time))
+        queue = self._queues[slot + (entry.party_size,)]
+        if not queue:
+            insort(self._sizes[slot], entry.party_size)
+        queue.append(entry)
+
+    def _remove(self, entry):
+        slot = (entry.date, time_bucket(entry.time))
+        queue = self._queues[slot + (entry.party_size,)]
+        queue.remove(entry)
+        if not queue:
+            sizes = self._sizes[slot]
+            del sizes[bisect_right(sizes, entry.party_size) - 1]
+
+    def _candidates(self, res_date, bucket, limit):
+        sizes = self._sizes.get((res_date, bucket), [])
+        for index in range(bisect_right(sizes, limit) - 1, -1, -1):
+            yield from self._queues[(res_date, bucket, sizes[index])]
+
+    def pop_best(self, day, res_time):
+        """
+        Take the best waiting party for a slot freed at ``res_time``.
+
+        Larger parties win (they are the hardest to seat later), then the one
+        waiting longest. Returns ``(entry, table)`` or ``(None, None)``.
+        """
+        free = day.free_tables(res_time, DURATION_HOURS)
+        if not free:
+            return None, None
+        limit = max(table.capacity for table in free)
+
+        best = None
+        bucket = time_bucket(res_time)
+        for offset in range(-TOLERANCE_BUCKETS, TOLERANCE_BUCKETS + 1):
+            for entry in self._candidates(day.date, bucket + offset, limit):
+                if best is not None and entry.party_size < best[0].party_size:
+                    break
+                tables = day.free_tables(entry.time, DURATION_HOURS, entry.party_size)
+                if tables:
+                    if best is None or entry.party_size > best[0].party_size or entry.created_at < best[0].created_at:
+                        best = (entry, tables[0])
+                    break
+
+        if best is None:
+            return None, None
+        self._remove(best[0])
+        return best
+
+
+def _pending_entries(dates):
+    return WaitList.objects.filter(
+        date__in=dates,
+        is_active=True,
+        notified=False,
+        converted_to_reservation__isnull=True
+    ).select_related('customer').order_by('created_at')
+
+
+def fulfil(entry, table=None, convert=False, user=None):
+    """Notify a waiting party, or book them straight in when ``convert`` is set"""
+    now = timezone.now()
+    with transaction.atomic():
+        if convert:
+            entry.converted_to_reservation = Reservation.objects.create(
+                customer=entry.customer,
+                date=entry.date,
+                time=entry.time,
+                party_size=entry.party_size,
+                table_id=table.id if table else None,
+                status='confirmed',
+                created_by=user
+            )
+            entry.is_active = False
+            enqueue('reservations.send_confirmation', {'reservation_id': entry.converted_to_reservation.id})
+        else:
+            enqueue('reservations.notify_waitlist', {'waitlist_id': entry.id})
+        entry.notified = True
+        entry.notified_at = now
+        entry.save()
+    return entry
+
+
+def match_freed(slots, convert=False, user=None):
+    """
+    Offer freed ``(date, time)`` slots to the waitlist in one pass.
+
+    A burst of cancellations costs one query for the waiting entries and one
+    availability lookup per date; tables handed out during the pass are
+    marked busy locally so two parties are never offered the same table.
+    Returns the entries that were matched.
+    """
+    slots = [(res_date, res_time) for res_date, res_time in slots if res_date >= timezone.now().date()]
+    if not slots:
+        return []
+
+    dates = {res_date for res_date, _ in slots}
+    index = WaitlistIndex(_pending_entries(dates))
+    days = {res_date: availability.for_date(res_date) for res_date in dates}
+
+    matched = []
+    for res_date, res_time in sorted(slots):
+        day = days[res_date]
+        entry, table = index.pop_best(day, res_time)
+        if entry is None:
+            continue
+        day.reserve(table.id, entry.time, DURATION_HOURS)
+        matched.append(fulfil(entry, table, convert=convert, user=user))
+    return matched
+
+
+def match_date(res_date, convert=False, user=None):
+    """Sweep every waiting party for ``res_date`` in arrival order"""
+    day = availability.for_date(res_date)
+    matched = []
+    for entry in _pending_entries([res_date]):
+        tables = day.free_tables(entry.time, DURATION_HOURS, entry.party_size)
+        if tables:
+            day.reserve(tables[0].id, entry.time, DURATION_HOURS)
+            matched.append(fulfil(entry, tables[0], convert=convert, user=user))
+    return matched
+
+
+def on_reservation_freed(reservation):
+    """
+    Queue a waitlist match for a cancellation or no-show.
+
+    The match runs in the job worker, so a failure there is retried with
+    backoff instead of turning an already saved cancellation into a 500.
+    """
+    enqueue('reservations.match_waitlist', {
+        'date': reservation.date.isoformat(), 'time': reservation.time.isoformat()
+    })